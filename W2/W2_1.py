@@ -1,6 +1,7 @@
 # LED
-import RPi.GPIO as GPIO
-import time
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "W4"))  # hal.py (IOT_BACKEND=real|sim)
+from hal import GPIO, clock
 LED = 23
 
 GPIO.setmode(GPIO.BCM)
@@ -9,10 +10,10 @@ try:
     while True:
         GPIO.output(LED, GPIO.HIGH)
         print("LED On")
-        time.sleep(1)
+        clock.sleep(1)
         GPIO.output(LED, GPIO.LOW)
         print("LED Off")
-        time.sleep(1)
+        clock.sleep(1)
 except KeyboardInterrupt:
     print("\n Program Terminated")
 
@@ -1,6 +1,7 @@
 # BUTTON
-import RPi.GPIO as GPIO
-import time
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "W4"))  # hal.py (IOT_BACKEND=real|sim)
+from hal import GPIO, clock
 
 LED = 17
 BUTTON = 18  
@@ -12,16 +13,20 @@ def main():
 
     print("START")
 
+    # 버튼 상태가 바뀔 때만 LED/출력 갱신 (엣지 인터럽트, 30ms debounce)
+    def on_edge(channel):
+        if GPIO.input(BUTTON) == GPIO.LOW:   # PUSH
+            GPIO.output(LED, GPIO.HIGH)   # LED ON
+            print("PUSH")
+        else:
+            GPIO.output(LED, GPIO.LOW)    # LED OFF
+            print("RELEASED")
+
+    GPIO.add_event_detect(BUTTON, GPIO.BOTH, callback=on_edge, bouncetime=30)
+
     try:
         while True:
-            if GPIO.input(BUTTON) == GPIO.LOW:   # PUSH
-                GPIO.output(LED, GPIO.HIGH)   # LED ON
-                print("PUSH")
-            else:
-                GPIO.output(LED, GPIO.LOW)    # LED OFF
-                print("RELEASED")
-
-            time.sleep(0.1)  # Delay
+            clock.sleep(1)  # 대기만 (감지는 콜백에서)
 
     except KeyboardInterrupt:
         pass
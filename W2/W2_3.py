@@ -1,6 +1,7 @@
 # DISTANCE
-import RPi.GPIO as GPIO
-import time
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "W4"))  # hal.py (IOT_BACKEND=real|sim)
+from hal import GPIO, clock, bind_ultrasonic
 
 TRIG = 20
 ECHO = 21
@@ -9,24 +10,25 @@ def setup():
     GPIO.setmode(GPIO.BCM)
     GPIO.setup(TRIG, GPIO.OUT)
     GPIO.setup(ECHO, GPIO.IN)
+bind_ultrasonic(TRIG, ECHO)   # sim: TRIG 하강 때 ECHO 펄스 예약 (real 은 아무 일 없음)
 
 def get_distance():
     # TRIG 핀에 10us 펄스 신호 출력
     GPIO.output(TRIG, True)
-    time.sleep(0.00001)  # 10us 펄스
+    clock.sleep(0.00001)  # 10us 펄스
     GPIO.output(TRIG, False)
 
     # ECHO 핀에서 신호 수신 시간 기록
-    start_time = time.time()
-    stop_time = time.time()
+    start_time = clock.time()
+    stop_time = clock.time()
 
     # 신호가 HIGH 될 때까지 대기
     while GPIO.input(ECHO) == 0:
-        start_time = time.time()
+        start_time = clock.time()
 
     # 신호가 LOW 될 때까지 대기
     while GPIO.input(ECHO) == 1:
-        stop_time = time.time()
+        stop_time = clock.time()
 
     # 시간 차이 계산
     elapsed = stop_time - start_time
@@ -41,7 +43,7 @@ def main():
         while True:
             dist = get_distance()
             print(f"{dist:.1f} cm 에 장애물이 있습니다.")
-            time.sleep(1)  # 1초마다 측정
+            clock.sleep(1)  # 1초마다 측정
     except KeyboardInterrupt:
         pass
     finally:
@@ -1,6 +1,7 @@
 # TOUCH
-import RPi.GPIO as GPIO
-import time
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "W4"))  # hal.py (IOT_BACKEND=real|sim)
+from hal import GPIO, clock
 
 TOUCH = 6  # 터치 센서 OUT 핀 연결 (BCM 번호 기준)
 
@@ -10,13 +11,18 @@ def main():
 
     print("터치 센서 감지 시작 (Ctrl+C 종료)")
 
+    # 상태가 바뀔 때만 출력 (엣지 인터럽트, bouncetime=채터링 무시 구간 ms)
+    def on_edge(channel):
+        if GPIO.input(TOUCH) == GPIO.HIGH:
+            print("TOUCH")
+        else:
+            print("RELEASED")
+
+    GPIO.add_event_detect(TOUCH, GPIO.BOTH, callback=on_edge, bouncetime=30)
+
     try:
         while True:
-            if GPIO.input(TOUCH) == GPIO.HIGH:
-                print("TOUCH")
-            else:
-                print("RELEASED")
-            time.sleep(0.5)  # 0.5초마다 상태 출력
+            clock.sleep(1)  # 대기만 (감지는 콜백에서)
     except KeyboardInterrupt:
         pass
     finally:
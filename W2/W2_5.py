@@ -1,11 +1,9 @@
 # DHT11
-import adafruit_dht
-import time
-import board
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "W4"))  # hal.py (IOT_BACKEND=real|sim)
+from hal import DHT11, clock
 
-sensor = adafruit_dht.DHT11
-pin = board.D23
-dht = sensor(pin)
+dht = DHT11(23)
 
 print("Reading DHT... Ctrl+C Stops")
 
@@ -20,7 +18,7 @@ try:
                 print("Can't read Sensor Data")
         except RuntimeError:
             pass
-        time.sleep(2)
+        clock.sleep(2)
 
 except KeyboardInterrupt:
     print("\n Terminating...")
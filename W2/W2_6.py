@@ -1,7 +1,6 @@
-import RPi.GPIO as GPIO
-import time
-import board
-import adafruit_dht
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "W4"))  # hal.py (IOT_BACKEND=real|sim)
+from hal import GPIO, DHT11, clock, bind_ultrasonic
 
 # 핀 설정
 LED_RED = 17
@@ -12,10 +11,8 @@ TRIG = 20
 ECHO = 21
 
 # DHT11 센서 객체 생성 (GPIO23 사용)
-# dht = adafruit_dht.DHT11(board.D23, use_pulseio=False)
-sensor = adafruit_dht.DHT11
-pin = board.D23
-dht = sensor(pin)
+# dht = DHT11(23, use_pulseio=False)
+dht = DHT11(23)
 
 GPIO.setmode(GPIO.BCM)
 GPIO.setup(LED_GREEN, GPIO.OUT)
@@ -24,20 +21,21 @@ GPIO.setup(LED_RED, GPIO.OUT)
 GPIO.setup(TOUCH, GPIO.IN)
 GPIO.setup(TRIG, GPIO.OUT)
 GPIO.setup(ECHO, GPIO.IN)
+bind_ultrasonic(TRIG, ECHO)   # sim: TRIG 하강 때 ECHO 펄스 예약 (real 은 아무 일 없음)
 
 # 초음파 센서 값 출력 함수
 def get_distance():
     GPIO.output(TRIG, False)
-    time.sleep(0.01)
+    clock.sleep(0.01)
 
     GPIO.output(TRIG, True)
-    time.sleep(0.00001)
+    clock.sleep(0.00001)
     GPIO.output(TRIG, False)
 
     while GPIO.input(ECHO) == 0:
-        start = time.time()
+        start = clock.time()
     while GPIO.input(ECHO) == 1:
-        end = time.time()
+        end = clock.time()
 
     duration = end - start
     distance = duration * 17150
@@ -66,7 +64,7 @@ try:
                 GPIO.output(LED_GREEN, False)
                 GPIO.output(LED_YELLOW, False)
                 GPIO.output(LED_RED, False)
-            time.sleep(1)
+            clock.sleep(1)
 
         if system_on:
             
@@ -88,7 +86,7 @@ try:
                 GPIO.output(LED_YELLOW, False)
                 GPIO.output(LED_RED, True)
 
-            time.sleep(1)
+            clock.sleep(1)
 
 except KeyboardInterrupt:
     GPIO.cleanup()
@@ -1,5 +1,7 @@
 from flask import Flask, render_template_string, url_for
-import RPi.GPIO as GPIO
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "W4"))  # hal.py (IOT_BACKEND=real|sim)
+from hal import GPIO
 
 app = Flask(__name__)
 
@@ -1,6 +1,7 @@
 from flask import Flask, render_template_string
-import RPi.GPIO as GPIO
-import time
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "W4"))  # hal.py (IOT_BACKEND=real|sim)
+from hal import GPIO, clock, bind_ultrasonic
 
 app = Flask(__name__)
 
@@ -11,29 +12,30 @@ ECHO = 21
 GPIO.setmode(GPIO.BCM)
 GPIO.setup(TRIG, GPIO.OUT)
 GPIO.setup(ECHO, GPIO.IN)
+bind_ultrasonic(TRIG, ECHO)   # sim: TRIG 하강 때 ECHO 펄스 예약 (real 은 아무 일 없음)
 
 def get_distance():
     """초음파 센서를 이용해 거리(cm) 측정"""
     # Trigger 핀 LOW
     GPIO.output(TRIG, False)
-    time.sleep(0.0002)
+    clock.sleep(0.0002)
 
     # Trigger 핀 HIGH (10us)
     GPIO.output(TRIG, True)
-    time.sleep(0.00001)
+    clock.sleep(0.00001)
     GPIO.output(TRIG, False)
 
     # Echo 핀 HIGH 시작
-    pulse_start = time.time()
+    pulse_start = clock.time()
     timeout = pulse_start + 0.04  # 40ms timeout
-    while GPIO.input(ECHO) == 0 and time.time() < timeout:
-        pulse_start = time.time()
+    while GPIO.input(ECHO) == 0 and clock.time() < timeout:
+        pulse_start = clock.time()
 
     # Echo 핀 HIGH 끝
-    pulse_end = time.time()
+    pulse_end = clock.time()
     timeout = pulse_end + 0.04
-    while GPIO.input(ECHO) == 1 and time.time() < timeout:
-        pulse_end = time.time()
+    while GPIO.input(ECHO) == 1 and clock.time() < timeout:
+        pulse_end = clock.time()
 
     # 펄스 길이 계산
     pulse_duration = pulse_end - pulse_start
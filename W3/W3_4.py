@@ -1,31 +1,46 @@
-from flask import Flask, render_template_string, jsonify
-import adafruit_dht
-import board
-import threading, time, sys
+from flask import Flask, render_template_string, request, Response
+import threading, sys, os, json, logging
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "W4"))  # hal.py, iotlog.py
+from hal import DHT11, clock
+import iotlog
+
+# 로그는 큐에 넣기만 하고 출력은 별도 스레드 (W4 와 같은 iotlog: 터미널/journald 가 느려도 센서 루프/요청 처리가 기다리지 않음)
+# LOG_LEVEL(또는 IOT_LOG_LEVEL)=DEBUG 로 실행하면 값 갱신/요청 처리 로그도 출력
+iotlog.setup(level=os.environ.get("LOG_LEVEL"))
+log = logging.getLogger("W3_4")
 
 app = Flask(__name__)
 
-dht = adafruit_dht.DHT11(board.D23)
+dht = DHT11(23)
 
 # === 공유 변수 ===
 latest_temp = None
 latest_humid = None
+data_version = 0                  # 값이 바뀔 때마다 증가 (ETag)
+BOOT_ID = os.urandom(4).hex()     # 재시작 후 같은 버전 번호와 구분
+_body_cache = (None, b"")         # (ETag, 직렬화된 JSON)
 
 def sensor_loop():
-    global latest_temp, latest_humid
+    global latest_temp, latest_humid, data_version
+    last_error = None
     while True:
         try:
             t = dht.temperature
             h = dht.humidity
             if t is not None and h is not None:
-                latest_temp = t
-                latest_humid = h
-                print(f"[DEBUG] 최신값 업데이트됨: Temp={latest_temp}, Humid={latest_humid}")
+                if (t, h) != (latest_temp, latest_humid):
+                    latest_temp = t
+                    latest_humid = h
+                    data_version += 1
+                log.debug("최신값 업데이트됨: Temp=%s, Humid=%s", latest_temp, latest_humid)
+            last_error = None
         except RuntimeError as e:
-            print(f"[ERROR] RuntimeError 발생: {e}", file=sys.stderr)
+            # DHT CRC/타이밍 오류는 흔함 → 같은 오류가 이어지면 처음 한 번만 WARNING
+            log.log(logging.DEBUG if str(e) == last_error else logging.WARNING, "RuntimeError 발생: %s", e)
+            last_error = str(e)
         except Exception as e:
-            print(f"[ERROR] 기타 예외 발생: {e}", file=sys.stderr)
-        time.sleep(2)
+            log.error("기타 예외 발생: %s", e)
+        clock.sleep(2)
 
 threading.Thread(target=sensor_loop, daemon=True).start()
 
@@ -84,12 +99,24 @@ def home():
 
 @app.route("/sensor_data")
 def sensor_data():
-    print(f"[DEBUG] /sensor_data 요청 처리: latest_temp={latest_temp}, latest_humid={latest_humid}")
-    return jsonify({"temperature": latest_temp, "humidity": latest_humid})
+    global _body_cache
+    # 값이 그대로면 304 (직렬화 생략), 바뀌었을 때만 JSON 을 새로 만듦
+    tag = f"{BOOT_ID}-{data_version}"
+    if request.if_none_match.contains(tag):
+        resp = Response(status=304)
+    else:
+        log.debug("/sensor_data 요청 처리: latest_temp=%s, latest_humid=%s", latest_temp, latest_humid)
+        if _body_cache[0] != tag:
+            _body_cache = (tag, json.dumps({"temperature": latest_temp, "humidity": latest_humid}).encode())
+        resp = Response(_body_cache[1], mimetype="application/json")
+    resp.set_etag(tag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 if __name__ == "__main__":
     try:
-        print("[INFO] Flask 서버 시작...")
+        log.info("Flask 서버 시작...")
         app.run(host="0.0.0.0", port=8080, debug=True, use_reloader=False)
     finally:
         dht.exit()
+        iotlog.shutdown()
@@ -1,8 +1,6 @@
 from flask import Flask, render_template_string, jsonify
-import RPi.GPIO as GPIO
-import adafruit_dht
-import board
-import threading, time
+import threading
+from hal import GPIO, DHT11, clock, bind_ultrasonic
 
 # === Flask 앱 ===
 app = Flask(__name__)
@@ -18,12 +16,13 @@ for pin in LED_PINS:
 TRIG, ECHO = 20, 21
 GPIO.setup(TRIG, GPIO.OUT)
 GPIO.setup(ECHO, GPIO.IN)
+bind_ultrasonic(TRIG, ECHO)   # sim: TRIG 하강 때 ECHO 펄스 예약 (real 은 아무 일 없음)
 
 TOUCH_PIN = 6
 GPIO.setup(TOUCH_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
 
 # === 센서 객체 ===
-dht = adafruit_dht.DHT11(board.D23)
+dht = DHT11(23)
 
 # === 상태 변수 ===
 latest_temp = None
@@ -35,20 +34,20 @@ mode_auto = True         # 기본 Auto 모드
 # === 초음파 센서 읽기 ===
 def get_distance():
     GPIO.output(TRIG, False)
-    time.sleep(0.0002)
+    clock.sleep(0.0002)
     GPIO.output(TRIG, True)
-    time.sleep(0.00001)
+    clock.sleep(0.00001)
     GPIO.output(TRIG, False)
 
-    pulse_start = time.time()
+    pulse_start = clock.time()
     timeout = pulse_start + 0.04
-    while GPIO.input(ECHO) == 0 and time.time() < timeout:
-        pulse_start = time.time()
+    while GPIO.input(ECHO) == 0 and clock.time() < timeout:
+        pulse_start = clock.time()
 
-    pulse_end = time.time()
+    pulse_end = clock.time()
     timeout = pulse_end + 0.04
-    while GPIO.input(ECHO) == 1 and time.time() < timeout:
-        pulse_end = time.time()
+    while GPIO.input(ECHO) == 1 and clock.time() < timeout:
+        pulse_end = clock.time()
 
     pulse_duration = pulse_end - pulse_start
     distance = pulse_duration * 17150
@@ -90,7 +89,7 @@ def sensor_loop():
         except Exception as e:
             print("[ERROR]", e)
 
-        time.sleep(2)
+        clock.sleep(2)
 
 # === 터치센서 Polling 스레드 ===
 def touch_loop():
@@ -102,7 +101,7 @@ def touch_loop():
             mode_auto = not mode_auto
             print(f"[INFO] 터치센서로 모드 전환됨 → {'AUTO' if mode_auto else 'MANUAL'}")
         prev_touch = curr_touch
-        time.sleep(0.05)  # 50ms 간격으로 polling
+        clock.sleep(0.05)  # 50ms 간격으로 polling
 
 # === 백그라운드 스레드 실행 ===
 threading.Thread(target=sensor_loop, daemon=True).start()
@@ -1,9 +1,38 @@
-from flask import Flask, render_template_string, jsonify
+from flask import Flask, render_template_string, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
-import RPi.GPIO as GPIO
-import adafruit_dht, board
-import threading, time
-import mariadb
+from hal import GPIO, DHT11, clock, bind_ultrasonic
+from ultrasonic import UltrasonicSensor
+from buttons import Button
+from filters import make_filter
+from rules import RuleEngine, load_rules
+from actuators import ActuatorBank, DEFERRED, REJECTED
+from scheduler import SensorScheduler, SensorTask
+from push import Broadcaster
+from state_store import StateStore
+from metrics import Registry
+import iotlog
+import wire
+import time, os, json, logging, socket
+from datetime import datetime
+from db_pool import get_pool
+from spool import SensorSpool, SpooledLogWriter, ensure_tables as ensure_spool_tables
+from uploader import SpoolUploader
+from ring_buffer import HistoryCache, NAN
+from fleet import Fleet, FleetPoller, ensure_tables as ensure_fleet_tables, valid_device_id
+import rollup
+import columnar
+from maintenance import MaintenanceLeader
+from retention import RetentionManager
+from downsample import METRIC_COLUMNS, METHODS, parse_time, bucket_seconds, bucketize, lttb, fmt_ts
+
+# 로그는 큐 → 백그라운드 스레드에서 출력 (센서 작업/HTTP 핸들러는 기다리지 않음)
+iotlog.setup()
+log = logging.getLogger("node")
+
+# 이 컨트롤러의 장치 ID (방마다 다르게: IOT_DEVICE_ID=room-101). 기본값은 호스트 이름
+DEVICE_ID = (os.environ.get("IOT_DEVICE_ID") or socket.gethostname().split(".")[0])[:32]
+if not valid_device_id(DEVICE_ID):
+    raise ValueError(f"invalid device id {DEVICE_ID!r} (set IOT_DEVICE_ID=[A-Za-z0-9._-]{{1,32}})")
 
 # =========================
 # DB 설정
@@ -16,52 +45,127 @@ DB_CONFIG = dict(
     database="IOT"
 )
 
+# 공용 커넥션 풀 (writer 1개 + Flask 라우트 동시 요청분 + 관리 담당 잠금 1개)
+db_pool = get_pool(DB_CONFIG, max_size=7, acquire_timeout=3.0)
+
 def get_db():
-    # 간단 커넥션 헬퍼
-    conn = mariadb.connect(**DB_CONFIG)
-    return conn
+    # with get_db() as conn: ... 형태로 풀에서 빌려 쓰고 자동 반납
+    return db_pool.connection()
 
 def db_init():
     # 테이블 없으면 생성
     sql = """
     CREATE TABLE IF NOT EXISTS sensor_log(
         id INT AUTO_INCREMENT PRIMARY KEY,
+        device_id VARCHAR(32) NOT NULL DEFAULT 'default',
         temp  DECIMAL(5,2) NULL,
         humid DECIMAL(5,2) NULL,
         dist  DECIMAL(6,2) NULL,
         dt DATETIME DEFAULT CURRENT_TIMESTAMP
     )
     """
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(sql)
-    conn.commit()
-    cur.close()
-    conn.close()
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute(sql)
+        # 기간 조회(range scan)용 인덱스
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_sensor_log_dt ON sensor_log (dt)")
+        # 장치 컬럼 + 장치별 조회용 (device_id, dt) 인덱스 (기존 테이블 마이그레이션 포함)
+        ensure_fleet_tables(cur)
+        # 1분/1시간 집계 테이블
+        rollup.ensure_tables(cur)
+        # 스풀 재전송 워터마크
+        ensure_spool_tables(cur)
+        conn.commit()
+        cur.close()
+
+# 1분/1시간 집계 (writer 저장 직후 증분 갱신)
+rollups = rollup.RollupManager(get_db, interval=60.0)
+
+# 일 단위 파티션 보존 관리 (30일 경과 파티션은 CSV.gz 로 보관 후 삭제)
+retention = RetentionManager(get_db, keep_days=30,
+                             archive_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive"))
+
+# IOT_INGEST_URL 이 있으면 MariaDB 대신 중앙 수집 게이트웨이(gateway.py)로 압축 배치 업로드.
+# 이 경우 노드는 DB 를 전혀 쓰지 않음: 테이블/집계/보존은 게이트웨이 쪽, 히스토리는 링버퍼에 있는 만큼만
+INGEST_URL = os.environ.get("IOT_INGEST_URL")
+USE_DB = not INGEST_URL
+
+# 로컬 스풀(SQLite WAL)에 먼저 기록 → 재전송기가 MariaDB 로 일괄 전송 (DB 장애 중에도 기록 보존)
+spool = SensorSpool(os.environ.get("IOT_SPOOL")
+                    or os.path.join(os.path.dirname(os.path.abspath(__file__)), "spool", "sensor_log.db"))
+if not USE_DB:
+    log_writer = SpoolUploader(spool, INGEST_URL, DEVICE_ID, batch_size=20, flush_interval=30.0)
+else:
+    log_writer = SpooledLogWriter(spool, db_pool.acquire, db_pool.release,
+                                  batch_size=20, flush_interval=30.0, on_flush=rollups.notify,
+                                  device_id=DEVICE_ID)
+
+# 최근 저장값 링버퍼 (3초 주기 기준 약 30분)
+history_cache = HistoryCache(capacity=600)
+
+# =========================
+# 지표 (/metrics, Prometheus 텍스트 형식)
+# =========================
+metrics = Registry()
+DHT_SECONDS = metrics.histogram("iot_dht_read_seconds", "DHT11 read attempt latency")
+DIST_SECONDS = metrics.histogram("iot_distance_read_seconds", "Ultrasonic measurement latency")
+DB_INSERT_SECONDS = metrics.histogram("iot_db_insert_seconds", "db_insert latency (spool append)")
+DB_LAST_N_SECONDS = metrics.histogram("iot_db_last_n_seconds", "db_last_n query latency")
+TASK_SECONDS = metrics.histogram("iot_task_duration_seconds", "Sensor task run time incl. retries",
+                                 labels=("task",))
+HTTP_SECONDS = metrics.histogram("iot_http_request_seconds", "HTTP handler latency", labels=("route",))
+HTTP_RESPONSES = metrics.counter("iot_http_responses_total", "HTTP responses", labels=("route", "code"))
 
 def db_insert(temp, humid, dist):
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO sensor_log (temp, humid, dist) VALUES (%s, %s, %s)",
-        (None if temp is None else float(temp),
-         None if humid is None else float(humid),
-         None if dist is None else float(dist))
-    )
-    conn.commit()
-    cur.close()
-    conn.close()
-
-def db_last_n(n=10):
-    # 최근 n개 (최신→과거) 반환
-    conn = get_db()
-    cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM sensor_log ORDER BY id DESC LIMIT %s", (n,))
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
+    # 스풀에 적재만 하고 바로 반환 (DB가 느려도 센서 루프는 계속 진행)
+    t0 = time.perf_counter()
+    now = datetime.now()
+    log_writer.submit(temp, humid, dist, dt=now)
+    history_cache.append(now.timestamp(), temp=temp, humid=humid, dist=dist)
+    DB_INSERT_SECONDS.observe(time.perf_counter() - t0)
+
+@DB_LAST_N_SECONDS.timed
+def db_last_n(n=10, device_id=None):
+    # 장치의 최근 n개 (최신→과거) 반환. (device_id, dt) 인덱스를 역순으로 n개만 읽음
+    with get_db() as conn:
+        cur = conn.cursor(dictionary=True)
+        cur.execute("SELECT * FROM sensor_log WHERE device_id = %s ORDER BY dt DESC, id DESC LIMIT %s",
+                    (device_id or DEVICE_ID, n))
+        rows = cur.fetchall()
+        cur.close()
     return rows
 
+def db_last_n_columns(metric, n=10, device_id=None):
+    # db_last_n 의 열 버전: 메트릭 열 하나만 읽어 (int64 ts, float32 값) 배열로 (NumPy 필요)
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute(columnar.last_n_sql(metric), (device_id or DEVICE_ID, n))
+        rows = cur.fetchall()
+        cur.close()
+    return columnar.from_rows(rows)
+
+def db_range_buckets(metric, start, end, bucket_sec, device_id=None):
+    # [start, end) 구간 버킷 집계. 해상도가 허용하면 1시간/1분 집계 테이블에서 읽음
+    sql, bucket_sec = rollup.range_bucket_query(metric, bucket_sec)
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute(sql, (bucket_sec, device_id or DEVICE_ID, start, end))
+        rows = cur.fetchall()
+        cur.close()
+    return bucket_sec, [(int(b) * bucket_sec, lo, hi, avg, cnt) for b, lo, hi, avg, cnt in rows]
+
+def db_range_raw(metric, start, end, device_id=None):
+    # [start, end) 구간 원본 (ts, value) 오름차순
+    col = metric if metric in METRIC_COLUMNS else "dist"
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute(f"SELECT UNIX_TIMESTAMP(dt), {col} FROM sensor_log "
+                    "WHERE device_id = %s AND dt >= %s AND dt < %s ORDER BY dt",
+                    (device_id or DEVICE_ID, start, end))
+        rows = cur.fetchall()
+        cur.close()
+    return [(float(t), None if v is None else float(v)) for t, v in rows]
+
 # =========================
 # Flask & GPIO 설정
 # =========================
@@ -72,117 +176,344 @@ GPIO.setwarnings(False)
 GPIO.setmode(GPIO.BCM)
 
 LED_PINS = [17, 27, 22]  # LED1=에어컨, LED2=히터, LED3=제습기
-for pin in LED_PINS:
-    GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+# 출력 핀은 관리자만 씀 (상태가 바뀔 때만 GPIO.output, AUTO/MANUAL 쓰기 직렬화, 최소 유지 시간)
+# 실제 출력이 바뀌면 store.led_status 갱신 → /status, /events 에 반영
+ACTUATOR_DWELL = 2.0     # 초. 수동 연타/모드 전환 직후에도 릴레이가 이보다 빨리 바뀌지 않음
+actuators = ActuatorBank(
+    GPIO,
+    [dict(name=name, pin=pin, min_on=ACTUATOR_DWELL, min_off=ACTUATOR_DWELL)
+     for name, pin in zip(("aircon", "heater", "dehumidifier"), LED_PINS)],
+    clock, owner="auto",
+    on_change=lambda: store.update(led_status=actuators.states()),
+)
 
 TRIG, ECHO = 20, 21
 GPIO.setup(TRIG, GPIO.OUT)
 GPIO.setup(ECHO, GPIO.IN)
+bind_ultrasonic(TRIG, ECHO)  # sim 백엔드: TRIG 펄스에 맞춰 ECHO 생성
+sonar = UltrasonicSensor(GPIO, TRIG, ECHO, clock)
 
 TOUCH_PIN = 6
 GPIO.setup(TOUCH_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+touch = Button(GPIO, TOUCH_PIN, clock, active_low=True, debounce=0.03)  # 엣지 인터럽트 + debounce
+
+dht = DHT11(23, use_pulseio=False)
+
+# 센서 필터 설정 (드라이버 → 필터 → 제어/DB)
+FILTER_CONFIG = dict(
+    temp=dict(kind="median", window=5, reject=5.0),
+    humid=dict(kind="median", window=5, reject=15.0),
+    dist=dict(kind="median", window=5, reject=50.0, alpha=0.5),  # 가짜 반사 제거 후 EMA
+)
+sensor_filters = {k: make_filter(v) for k, v in FILTER_CONFIG.items()}
+# 거리는 10 Hz 로 읽히므로 이 폭(cm) 안의 흔들림은 게시하지 않음 → 정지 상태에서 /status ETag 유지 (304)
+DIST_DEADBAND = 1.0
+
+# AUTO 모드 규칙 (IOT_RULES=<json 경로> 로 교체 가능). 히스테리시스/최소 유지 시간으로 채터링 방지
+AUTO_RULES = [
+    dict(name="aircon", output=0, input="temperature", on_above=25, deadband=1.0,
+         min_on=10, min_off=10, priority=2, group="hvac"),
+    dict(name="heater", output=1, input="temperature", on_below=18, deadband=1.0,
+         min_on=10, min_off=10, priority=1, group="hvac"),
+    dict(name="dehumidifier", output=2, input="humidity", on_above=40, deadband=3.0,
+         min_on=10, min_off=10),
+]
+auto_rules = RuleEngine.from_config(
+    load_rules(os.environ["IOT_RULES"]) if os.environ.get("IOT_RULES") else AUTO_RULES, len(LED_PINS))
+
+# 공유 상태 (센서 작업/터치/HTTP 핸들러 공용, 읽기는 잠금 없는 스냅샷)
+store = StateStore(
+    temperature=None, humidity=None, distance=None,   # 필터값
+    raw_temp=None, raw_humid=None, raw_dist=None,     # 드라이버 원본값
+    led_status=(0, 0, 0),
+    auto_mode=True,
+)
+
+# 장치별 메모리 상태 (이 컨트롤러 + sensor_log 에 기록하는 다른 방 컨트롤러들)
+fleet = Fleet(history_capacity=200, offline_after=60.0)
+local_device = fleet.add_local(DEVICE_ID, store, history_cache)
+fleet_poller = FleetPoller(get_db, fleet, interval=5.0)
+
+# 집계/보존/fleet 폴링은 같은 DB 를 쓰는 노드·게이트웨이 중 선출된 1곳에서만 (maintenance.py)
+#   IOT_MAINTENANCE=auto (기본: 선출에 참여) | off (이 노드는 참여 안 함 → /fleet 은 이 장치만)
+MAINTENANCE = os.environ.get("IOT_MAINTENANCE", "auto")
+
+def start_maintenance():
+    retention.ensure_partitioned()
+    rollups.start()  # 시작 시 밀린 구간부터 따라잡음
+    retention.start()
+    fleet_poller.start()  # 첫 회차에 장치별 최신 행으로 채움
+
+def stop_maintenance():
+    rollups.stop()
+    retention.stop()
+    fleet_poller.stop()
+
+maintenance = MaintenanceLeader(db_pool, start_maintenance, stop_maintenance)
+
+def status_payload(snap, device_id=DEVICE_ID):
+    return {
+        "device_id": device_id,
+        "temperature": snap.temperature,
+        "humidity": snap.humidity,
+        "distance": snap.distance,
+        "led_status": None if snap.led_status is None else list(snap.led_status),
+        "auto_mode": snap.auto_mode,
+        "raw": {"temp": snap.get("raw_temp"), "humid": snap.get("raw_humid"), "dist": snap.get("raw_dist")},
+        "version": snap.version,
+    }
+
+# ---- 직렬화된 응답 캐시 (버전이 같으면 JSON 을 다시 만들지 않음)
+# /status 본문은 장치/인코딩마다 최신 버전 1개 (DeviceState.status_cache)
+_history_bodies = {}         # (device_id, metric, n, 인코딩) -> (ETag, 본문 bytes, 최신 ts)
+HISTORY_SETTLE = 120         # 이 시간(초)보다 오래된 구간은 writer flush/집계가 끝나 더 바뀌지 않음
+
+def to_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+def status_body(snap, tag, dev=None, mimetype=wire.JSON):
+    dev = dev or local_device
+    cached = dev.status_cache.get(mimetype)
+    if cached is None or cached[0] != tag:
+        payload = status_payload(snap, dev.device_id)
+        body = to_json(payload) if mimetype == wire.JSON else wire.pack_status(payload)
+        cached = dev.status_cache[mimetype] = (tag, body)
+    return cached[1]
+
+def history_tag(metric, n, dev=None, mimetype=wire.JSON):
+    dev = dev or local_device
+    return wire.etag(f"{dev.store.epoch}-h{dev.history.version}-{metric}-{n}", mimetype)
+
+def history_cached(metric, n, tag, dev=None, mimetype=wire.JSON):
+    """링버퍼 응답 (ETag, 본문 bytes, 최신 ts). 버퍼에 n개가 없으면 None → DB 조회"""
+    dev = dev or local_device
+    key = (dev.device_id, metric, n, mimetype)
+    entry = _history_bodies.get(key)
+    if entry is None or entry[0] != tag:
+        if mimetype == wire.JSON and columnar.np is not None:
+            # 링버퍼 열 → 한 번에 JSON (행마다 dict/strftime 없음)
+            cols = dev.history.last_columns(metric, n)
+            if cols is None:
+                return None
+            body = columnar.to_json(columnar.np.asarray(cols[0], columnar.np.int64), cols[1])
+            newest = cols[0][0]
+        elif mimetype == wire.JSON:
+            cached = dev.history.last_n(metric, n)
+            if cached is None:
+                return None
+            body = to_json([
+                {"dt": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)), "value": v}
+                for ts, v in cached
+            ])
+            newest = cached[0][0]
+        else:
+            # 바이너리는 링버퍼 열을 그대로 변환 (행마다 dict/문자열 없음)
+            cols = dev.history.last_columns(metric, n)
+            if cols is None:
+                return None
+            body = wire.pack_history(mimetype, metric, *cols)
+            newest = cols[0][0]
+        if len(_history_bodies) >= 256:
+            _history_bodies.clear()
+        entry = _history_bodies[key] = (tag, body, newest)
+    return entry
+
+def history_fallback(metric, n, dev=None, mimetype=wire.JSON):
+    """링버퍼에 n개가 없을 때 → (본문 bytes, 최신 ts 또는 None).
+    DB 모드는 DB 조회(블로킹), 업로드 모드는 링버퍼에 있는 만큼만"""
+    dev = dev or local_device
+    if USE_DB:
+        return history_from_db(metric, n, dev.device_id, mimetype)
+    k = min(n, dev.history.count(metric))
+    if k == 0:
+        return (b"[]" if mimetype == wire.JSON else wire.pack_history(mimetype, metric, [], [])), None
+    _, body, newest = history_cached(metric, k, history_tag(metric, k, dev, mimetype), dev, mimetype)
+    return body, newest
+
+def ring_range_raw(metric, start, end):
+    """링버퍼의 [start, end) 구간 (ts, value) 오름차순 (업로드 모드의 /history_range)"""
+    cols = history_cache.last_columns(metric, history_cache.count(metric))
+    if not cols:
+        return []
+    lo, hi = start.timestamp(), end.timestamp()
+    return [(t, None if v != v else v) for t, v in zip(reversed(cols[0]), reversed(cols[1])) if lo <= t < hi]
+
+def range_raw(metric, start, end, device_id=None):
+    if USE_DB:
+        return db_range_raw(metric, start, end, device_id)
+    return ring_range_raw(metric, start, end)
+
+def range_buckets(metric, start, end, bucket_sec, device_id=None):
+    if USE_DB:
+        return db_range_buckets(metric, start, end, bucket_sec, device_id)
+    return bucket_sec, bucketize(ring_range_raw(metric, start, end), bucket_sec)
+
+def history_from_db(metric, n, device_id=None, mimetype=wire.JSON):
+    """DB 최근 n개 → (본문 bytes, 최신 ts 또는 None). 블로킹"""
+    if columnar.np is not None:
+        ts, vals = db_last_n_columns(metric, n, device_id)  # 메트릭 열만, dt DESC n개
+        newest = float(ts[0]) if len(ts) else None
+        if mimetype == wire.JSON:
+            return columnar.to_json(ts, vals), newest
+        return wire.pack_history(mimetype, metric, ts, vals), newest
+    rows = db_last_n(n, device_id)  # dt DESC n개
+    newest = rows[0]["dt"].timestamp() if rows else None
+    if mimetype != wire.JSON:
+        ts = [r["dt"].timestamp() for r in rows]
+        vals = [NAN if r[metric] is None else float(r[metric]) for r in rows]
+        return wire.pack_history(mimetype, metric, ts, vals), newest
+    out = []
+    for r in rows:
+        v = r[metric]
+        out.append({"dt": r["dt"].strftime("%Y-%m-%d %H:%M:%S"),
+                    "value": None if v is None else float(v)})
+    return to_json(out), newest
+
+# 상태 변경 푸시 (/events, 값이 바뀐 키만 전송)
+broadcaster = Broadcaster(heartbeat=15.0, min_interval=0.1)
+
+def push_state(snap, delta):
+    broadcaster.publish(
+        temperature=snap.temperature,
+        humidity=snap.humidity,
+        distance=snap.distance,
+        led_status=list(snap.led_status),
+        auto_mode=snap.auto_mode,
+    )
+
+store.listen(push_state)
+
+def follow_mode(snap, delta):
+    # 모드가 바뀌면 (웹/터치 어느 쪽이든) 출력 제어권도 같이 넘김
+    if "auto_mode" in delta:
+        actuators.set_owner("auto" if snap.auto_mode else "manual")
+
+store.listen(follow_mode)
+
+@DHT_SECONDS.timed
+def read_dht():
+    """DHT11 1회 읽기. 타이밍/CRC 오류는 RuntimeError → 스케줄러가 재시도"""
+    t = dht.temperature
+    h = dht.humidity
+    if t is None and h is None:
+        raise RuntimeError("DHT returned no data")
+    return t, h
+
+def _filtered(name, v):
+    f = sensor_filters[name].update(v)
+    return None if f is None else round(f, 2)
+
+# ---- 센서별 상태 슬롯 게시 (각 작업은 자기 값만 갱신)
+def publish_dht(result):
+    t, h = result
+    changes = dict(temperature=_filtered("temp", t), humidity=_filtered("humid", h))
+    if t is not None:
+        changes["raw_temp"] = t
+    if h is not None:
+        changes["raw_humid"] = h
+    store.update(**changes)
+
+def publish_dist(d):
+    # 엣지 인터럽트로 측정한 거리 (실패 시 EchoTimeout → 이전 값 유지)
+    # 필터값이 DIST_DEADBAND 이상 움직였을 때만 게시, raw_dist 는 그때의 측정값
+    f = _filtered("dist", d)
+
+    def changes(snap):
+        if f is not None and snap.distance is not None and abs(f - snap.distance) < DIST_DEADBAND:
+            return None
+        return dict(distance=f, raw_dist=round(d, 1))
+
+    store.update_with(changes)
+
+def auto_control():
+    """제어 주기. 보류된 전환 적용 후, AUTO 모드면 규칙 엔진이 돌려준 전환만 출력 관리자에 요청"""
+    actuators.tick()
+    snap = store.snapshot()
+    if not snap.auto_mode:
+        return
+    desired = actuators.desired()
+    if desired != auto_rules.outputs():
+        auto_rules.sync(desired)  # MANUAL 에서 바뀐 출력부터 맞춤
+    changes = auto_rules.evaluate({"temperature": snap.temperature, "humidity": snap.humidity}, clock.time())
+    if changes:
+        actuators.apply(changes, "auto")  # 그 사이 MANUAL 로 바뀌었으면 관리자가 거절
 
-dht = adafruit_dht.DHT11(board.D23, use_pulseio=False)
-
-latest_temp = None
-latest_humid = None
-latest_dist = None
-led_status = [0, 0, 0]
-mode_auto = True
-
-def get_distance():
-    GPIO.output(TRIG, False)
-    time.sleep(0.0002)
-    GPIO.output(TRIG, True)
-    time.sleep(0.00001)
-    GPIO.output(TRIG, False)
-
-    pulse_start = time.time()
-    timeout = pulse_start + 0.04
-    while GPIO.input(ECHO) == 0 and time.time() < timeout:
-        pulse_start = time.time()
-
-    pulse_end = time.time()
-    timeout = pulse_end + 0.04
-    while GPIO.input(ECHO) == 1 and time.time() < timeout:
-        pulse_end = time.time()
-
-    distance = (pulse_end - pulse_start) * 17150
-    return round(distance, 2)
-
-def _read_dht(max_retries: int = 3):
-    """DHT11 읽기 재시도. 성공 시 (t, h), 실패 시 (None, None) 반환"""
-    for _ in range(max_retries):
-        try:
-            t = dht.temperature
-            h = dht.humidity
-            if t is not None or h is not None:
-                return t, h
-        except RuntimeError:
-            # 흔한 타이밍/CRC 오류, 잠시 대기 후 재시도
-            time.sleep(0.2)
-        except Exception as e:
-            print("[DHT ERROR]", e)
-            break
-    return None, None
-
-
-def sensor_loop():
-    """주기적으로 센서 갱신, 주기적 DB 저장"""
-    global latest_temp, latest_humid, latest_dist, led_status, mode_auto
-    t0 = time.time()
-    while True:
-        try:
-            # 온습도 (재시도 포함), 각각 독립 갱신
-            t, h = _read_dht()
-            if t is not None:
-                latest_temp = t
-            if h is not None:
-                latest_humid = h
-
-            # 거리
-            d = get_distance()
-            latest_dist = d
-
-            # Auto 제어
-            if mode_auto:
-                # 에어컨
-                if latest_temp is not None and latest_temp >= 25:
-                    GPIO.output(LED_PINS[0], GPIO.HIGH); led_status[0] = 1
-                else:
-                    GPIO.output(LED_PINS[0], GPIO.LOW); led_status[0] = 0
-                # 히터
-                if latest_temp is not None and latest_temp <= 18:
-                    GPIO.output(LED_PINS[1], GPIO.HIGH); led_status[1] = 1
-                else:
-                    GPIO.output(LED_PINS[1], GPIO.LOW); led_status[1] = 0
-                # 제습기
-                if latest_humid is not None and latest_humid >= 40:
-                    GPIO.output(LED_PINS[2], GPIO.HIGH); led_status[2] = 1
-                else:
-                    GPIO.output(LED_PINS[2], GPIO.LOW); led_status[2] = 0
-
-            # 3초 주기 DB 저장
-            if time.time() - t0 >= 3.0:
-                db_insert(latest_temp, latest_humid, latest_dist)
-                t0 = time.time()
-
-        except Exception as e:
-            print("[ERROR]", e)
-
-        # DHT11 권장 2초 이상 간격
-        time.sleep(2.2)
-
-def touch_loop():
-    global mode_auto
-    prev_touch = GPIO.input(TOUCH_PIN)
-    while True:
-        curr_touch = GPIO.input(TOUCH_PIN)
-        if prev_touch == 1 and curr_touch == 0:
-            mode_auto = not mode_auto
-            print(f"[INFO] 터치센서 모드 → {'AUTO' if mode_auto else 'MANUAL'}")
-        prev_touch = curr_touch
-        time.sleep(0.05)
+def manual_control(led_id, state):
+    """MANUAL 모드에서 출력 1개 요청 → actuators 결과 (APPLIED/UNCHANGED/DEFERRED/REJECTED), 없는 출력은 None"""
+    if not 0 <= led_id < len(actuators):
+        return None
+    return actuators.request(led_id, state == 1, "manual")
+
+def control_reply(result):
+    """manual_control 결과 → (HTTP 상태, JSON 본문 또는 None). Flask/ASGI 공용"""
+    if result is None:
+        return 404, {"error": "unknown output"}
+    if result == REJECTED:
+        return 409, {"error": "outputs are under AUTO control"}
+    if result == DEFERRED:
+        return 202, {"result": result, "outputs": actuators.stats()["outputs"]}
+    return 204, None
+
+def set_auto_mode(auto, source):
+    snap = store.update(auto_mode=auto)
+    log.info("%s 모드 → %s", source, "AUTO" if snap.auto_mode else "MANUAL")
+    return snap
+
+def log_reading():
+    snap = store.snapshot()
+    db_insert(snap.temperature, snap.humidity, snap.distance)
+
+# 센서별 주기/마감/재시도 정책 (느린 DHT 가 거리 측정/침입 감지를 막지 않도록 분리)
+sampler = SensorScheduler(clock)
+sampler.add(SensorTask("dht", read_dht, period=2.2, publish=publish_dht,
+                       retries=2, retry_delay=0.2, retry_on=(RuntimeError,)))  # DHT11 최소 2초
+sampler.add(SensorTask("distance", DIST_SECONDS.timed(sonar.read), period=0.1, publish=publish_dist,
+                       deadline=0.09))  # 10 Hz
+sampler.add(SensorTask("control", auto_control, period=0.5))
+sampler.add(SensorTask("log", log_reading, period=3.0))  # 3초 주기 DB 저장
+for _task in sampler.tasks.values():
+    _task.timer = TASK_SECONDS.labels(_task.name)
+
+# ---- 다른 객체가 이미 세는 값은 스크레이프 때만 읽음
+def _task_stat(key):
+    return lambda: {name: getattr(t, key) for name, t in sampler.tasks.items()}
+
+metrics.collect("iot_task_runs_total", "Sensor task runs", _task_stat("runs"), labels=("task",))
+metrics.collect("iot_task_errors_total", "Sensor task failed runs", _task_stat("errors"), labels=("task",))
+metrics.collect("iot_task_retries_total", "Sensor task retries (DHT CRC/timing)", _task_stat("retried"),
+                labels=("task",))
+metrics.collect("iot_task_overruns_total", "Sensor task runs over deadline", _task_stat("overruns"),
+                labels=("task",))
+metrics.collect("iot_task_skipped_total", "Sensor task periods skipped", _task_stat("skipped"),
+                labels=("task",))
+metrics.collect("iot_distance_timeouts_total", "Ultrasonic echo timeouts", lambda: sonar.timeouts)
+metrics.gauge("iot_spool_pending_rows", "Rows waiting in the local spool", lambda: len(spool))
+metrics.collect("iot_spool_written_total", "Rows drained to MariaDB", lambda: log_writer.written)
+metrics.collect("iot_spool_errors_total", "Failed drain attempts", lambda: log_writer.errors)
+metrics.gauge("iot_db_pool_connections", "DB pool connections by state",
+              lambda: {(k,): v for k, v in db_pool.metrics().items() if k in ("idle", "in_use", "max_size")},
+              labels=("state",))
+metrics.collect("iot_db_pool_waits_total", "Acquires that had to wait", lambda: db_pool.waits)
+metrics.collect("iot_db_pool_timeouts_total", "Acquires that timed out", lambda: db_pool.timeouts)
+metrics.collect("iot_log_records_total", "Log records by outcome",
+                lambda: {k: v for k, v in iotlog.stats().items() if k != "queued"}, labels=("outcome",))
+metrics.gauge("iot_fleet_devices", "Known devices by state",
+              lambda: {"online": sum(d["online"] for d in fleet.summary()["devices"]), "total": len(fleet)},
+              labels=("state",))
+metrics.gauge("iot_maintenance_leader", "1 if this node runs DB maintenance", lambda: int(maintenance.leader))
+metrics.gauge("iot_sse_clients", "Connected /events clients", lambda: broadcaster.stats()["clients"])
+metrics.collect("iot_actuator_writes_total", "GPIO output writes (transitions only)", lambda: actuators.writes)
+metrics.collect("iot_actuator_requests_total", "Output requests by outcome",
+                lambda: {"coalesced": actuators.coalesced, "deferred": actuators.deferred,
+                         "rejected": actuators.rejected}, labels=("outcome",))
+metrics.collect("iot_history_cache_lookups_total", "Ring buffer lookups by result",
+                lambda: {"hit": history_cache.hits, "miss": history_cache.misses}, labels=("result",))
+
+def toggle_mode(event=None):
+    # 터치 눌림 즉시 AUTO/MANUAL 전환 (GPIO 엣지 콜백에서 호출)
+    snap = store.update_with(lambda s: {"auto_mode": not s.auto_mode})
+    log.info("터치센서 모드 → %s", "AUTO" if snap.auto_mode else "MANUAL")
+    return snap
 
 # -------------------- HTML (대시보드) --------------------
 HTML_TEMPLATE = """
@@ -264,9 +595,15 @@ button { padding:10px 16px; margin:4px; border-radius:8px; }
 <script>
 let autoMode = true;
 
+let live = {};
+
 async function fetchData() {
     const r = await fetch("/status");
-    const data = await r.json();
+    live = await r.json();
+    render(live);
+}
+
+function render(data) {
     document.getElementById("temp").innerText  = data.temperature ?? "--";
     document.getElementById("humid").innerText = data.humidity ?? "--";
     document.getElementById("dist").innerText  = data.distance ?? "--";
@@ -293,18 +630,36 @@ async function fetchData() {
     else document.getElementById("alert-box").innerHTML = "";
 }
 
+// 204 적용, 202 최소 유지 시간 뒤 적용 예정, 409 AUTO 모드 (다른 곳에서 바뀐 경우)
 async function controlDevice(id, state) {
-    if (!autoMode) { await fetch(`/control/${id}/${state}`); fetchData(); }
-    else alert("AUTO 모드에서는 수동 제어 불가!");
+    if (autoMode) { alert("AUTO 모드에서는 수동 제어 불가!"); return; }
+    const r = await fetch(`/control/${id}/${state}`);
+    if (r.status === 202) alert("최소 유지 시간이 지나면 적용됩니다.");
+    else if (r.status === 409) { alert("AUTO 모드에서는 수동 제어 불가!"); fetchData(); }
+    else if (!r.ok) alert(`제어 실패 (${r.status})`);
+    if (pollTimer) fetchData();
 }
 
 async function setMode(mode) {
     autoMode = mode;
     await fetch(`/set_mode/${mode ? 1 : 0}`);
-    fetchData();
+    if (pollTimer) fetchData();
 }
 
-setInterval(fetchData, 2000);
+// 서버 푸시(SSE)로 변경분만 수신, 연결이 안 되면 2초 polling 으로 대체
+let pollTimer = null;
+function startPolling() { if (!pollTimer) pollTimer = setInterval(fetchData, 2000); }
+if (window.EventSource) {
+    const es = new EventSource("/events");
+    es.onmessage = (e) => {
+        live = Object.assign(live, JSON.parse(e.data));
+        render(live);
+        if (pollTimer) { clearInterval(pollTimer); pollTimer = null; }
+    };
+    es.onerror = () => startPolling();
+} else {
+    startPolling();
+}
 fetchData();
 </script>
 </body>
@@ -331,21 +686,40 @@ button { padding:8px 12px; border-radius:8px; }
   <h2>{{title}}</h2>
 
   {% if chart %}
+    <div>
+      <button onclick="load(0)">최근 10개</button>
+      <button onclick="load(3600)">1시간</button>
+      <button onclick="load(86400)">1일</button>
+      <button onclick="load(7*86400)">7일</button>
+    </div>
     <canvas id="cv" width="800" height="360"></canvas>
     <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
     <script>
-      (async ()=>{
-        const r = await fetch("{{data_api}}");
-        const rows = await r.json();  // 최신→과거
-        const labels = rows.map(r=>r.dt).reverse();
-        const values = rows.map(r=>Number(r.value)).reverse();
+      let chart = null;
+      async function load(rangeSec){
+        let labels, values;
+        if (!rangeSec) {
+          const r = await fetch("{{data_api}}");
+          const rows = await r.json();  // 최신→과거
+          labels = rows.map(r=>r.dt).reverse();
+          values = rows.map(r=>Number(r.value)).reverse();
+        } else {
+          // 기간 조회는 서버에서 다운샘플링 (점 개수 고정)
+          const to = Math.floor(Date.now()/1000);
+          const r = await fetch(`/history_range?metric={{metric}}&from=${to-rangeSec}&to=${to}&max_points=300`);
+          const data = await r.json();
+          labels = data.points.map(p=>p.dt);
+          values = data.points.map(p=>p.value);
+        }
+        if (chart) chart.destroy();
         const ctx = document.getElementById('cv').getContext('2d');
-        new Chart(ctx, {
+        chart = new Chart(ctx, {
           type:'line',
           data:{ labels, datasets:[{ label:'{{ylabel}}', data: values, fill:false }] },
           options:{ responsive:false }
         });
-      })();
+      }
+      load(0);
     </script>
   {% else %}
     <table>
@@ -376,76 +750,300 @@ button { padding:8px 12px; border-radius:8px; }
 # =========================
 # 라우트
 # =========================
+@app.before_request
+def _request_started():
+    request.environ["iot.t0"] = time.perf_counter()
+
+@app.after_request
+def _request_finished(resp):
+    # 라우트 패턴 단위로 기록 (/control/<int:led_id>/<int:state> 등 → 라벨 수 고정)
+    t0 = request.environ.get("iot.t0")
+    if t0 is not None:
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        HTTP_SECONDS.labels(route).observe(time.perf_counter() - t0)
+        HTTP_RESPONSES.labels(route, resp.status_code).inc()
+    return resp
+
+@app.route("/metrics")
+def metrics_text():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route("/")
 def home():
     return render_template_string(HTML_TEMPLATE)
 
+def _device_or_404(device_id):
+    dev = fleet.get(device_id)
+    if dev is None:
+        return None, (jsonify({"error": f"unknown device: {device_id}"}), 404)
+    return dev, None
+
 @app.route("/status")
 def status():
-    return jsonify({
-        "temperature": latest_temp,
-        "humidity": latest_humid,
-        "distance": latest_dist,
-        "led_status": led_status,
-        "auto_mode": mode_auto
-    })
+    return _status_response(local_device)
+
+@app.route("/d/<device_id>/status")
+def device_status(device_id):
+    dev, err = _device_or_404(device_id)
+    return err or _status_response(dev)
+
+def _status_response(dev):
+    # 한 시점의 스냅샷으로 응답. ETag(epoch-version) 가 같으면 직렬화 없이 304
+    # Accept: application/msgpack 이면 같은 내용을 MessagePack 으로 (ETag 는 인코딩별)
+    mimetype = wire.negotiate(request.headers.get("Accept"), wire.STATUS_TYPES)
+    snap = dev.store.snapshot()
+    tag = wire.etag(dev.store.etag(snap), mimetype)
+    if request.if_none_match.contains(tag):
+        resp = Response(status=304)
+    else:
+        resp = Response(status_body(snap, tag, dev, mimetype), mimetype=mimetype)
+    resp.set_etag(tag)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.vary.add("Accept")
+    return resp
+
+@app.route("/fleet")
+def fleet_summary():
+    # 전체 장치 요약 - 메모리 상태만 사용 (장치 수만큼 DB 조회하지 않음)
+    resp = Response(fleet.summary_body(), mimetype="application/json")
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+@app.route("/events")
+def events():
+    # SSE: 첫 이벤트는 전체 상태, 이후 변경분만. 15초마다 heartbeat
+    sub = broadcaster.subscribe()
+    if sub is None:
+        return jsonify({"error": "too many clients"}), 503
+    return Response(stream_with_context(broadcaster.stream(sub)),
+                    mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/scheduler")
+def scheduler_stats():
+    # 센서 작업별 실행/지터/overrun 통계
+    return jsonify(sampler.stats())
 
 @app.route("/control/<int:led_id>/<int:state>")
 def control(led_id, state):
-    global led_status
-    if not mode_auto and 0 <= led_id < 3:
-        GPIO.output(LED_PINS[led_id], GPIO.HIGH if state == 1 else GPIO.LOW)
-        led_status[led_id] = state
-    return ("", 204)
+    # 204 적용(또는 이미 그 상태), 202 최소 유지 시간 뒤 적용 예정, 409 AUTO 모드
+    code, body = control_reply(manual_control(led_id, state))
+    return (jsonify(body), code) if body is not None else ("", code)
+
+@app.route("/actuators")
+def actuator_stats():
+    # 출력별 요청/실제 상태 + 최근 전환 기록
+    return jsonify(actuators.stats())
 
 @app.route("/set_mode/<int:mode>")
 def set_mode(mode):
-    global mode_auto
-    mode_auto = (mode == 1)
-    print(f"[INFO] 웹 모드 → {'AUTO' if mode_auto else 'MANUAL'}")
+    set_auto_mode(mode == 1, "웹")
     return ("", 204)
 
-# ---- 최근 10개 JSON (그래프/리스트 공용 API)
+# ---- 장치 지정 제어: GPIO 는 각 방의 컨트롤러만 만질 수 있음
+def _local_or_error(device_id):
+    dev, err = _device_or_404(device_id)
+    if err is None and not dev.local:
+        err = jsonify({"error": f"device {device_id} is controlled by its own node"}), 409
+    return err
+
+@app.route("/d/<device_id>/control/<int:led_id>/<int:state>")
+def device_control(device_id, led_id, state):
+    return _local_or_error(device_id) or control(led_id, state)
+
+@app.route("/d/<device_id>/set_mode/<int:mode>")
+def device_set_mode(device_id, mode):
+    return _local_or_error(device_id) or set_mode(mode)
+
+# ---- 최근 n개 JSON (그래프/리스트 공용 API, 기본 10개)
 @app.route("/history_data/<metric>")
 def history_data(metric):
-    rows = db_last_n(10)  # id DESC 10개
-    out = []
-    for r in rows:
-        if metric == "temp":
-            v = r["temp"]
-        elif metric == "humid":
-            v = r["humid"]
-        else:
-            v = r["dist"]
-        out.append({"dt": r["dt"].strftime("%Y-%m-%d %H:%M:%S"), "value": v})
-    return jsonify(out)
+    return _history_response(local_device, metric)
+
+@app.route("/d/<device_id>/history_data/<metric>")
+def device_history_data(device_id, metric):
+    dev, err = _device_or_404(device_id)
+    return err or _history_response(dev, metric)
+
+def _history_response(dev, metric):
+    if metric not in ("temp", "humid"):
+        metric = "dist"
+    n = max(1, min(request.args.get("n", 10, type=int), 1000))
+    # Accept 로 JSON / 열 형식 바이너리 / MessagePack 선택 (형식은 wire.py)
+    mimetype = wire.negotiate(request.headers.get("Accept"), wire.HISTORY_TYPES)
+
+    # 링버퍼 응답은 버퍼 버전으로 ETag → 새 행이 없으면 304, 같은 요청은 직렬화 결과 재사용
+    tag = history_tag(metric, n, dev, mimetype)
+    if request.if_none_match.contains(tag):
+        resp = Response(status=304)
+        resp.set_etag(tag)
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.vary.add("Accept")
+        return resp
+
+    entry = history_cached(metric, n, tag, dev, mimetype)
+    if entry is not None:
+        resp = Response(entry[1], mimetype=mimetype)
+        resp.set_etag(tag)
+        resp.last_modified = int(entry[2])
+    else:
+        body, newest = history_fallback(metric, n, dev, mimetype)
+        resp = Response(body, mimetype=mimetype)
+        if newest is not None:
+            resp.last_modified = int(newest)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.vary.add("Accept")
+    return resp
+
+# ---- 기간 조회 + 다운샘플링 (응답 크기는 max_points 이하로 고정)
+# /history_range?metric=temp&from=<epoch|datetime>&to=...&max_points=300&method=avg|minmax|lttb
+def _arg_int(args, name, default):
+    try:
+        return int(args.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+def range_request(args):
+    """쿼리 인자 → (None, 조회 dict) 또는 ((HTTP 상태, 오류 본문), None). Flask/ASGI 공용"""
+    metric = args.get("metric", "temp")
+    if metric not in METRIC_COLUMNS:
+        return (400, {"error": f"unknown metric: {metric}"}), None
+    device_id = args.get("device", DEVICE_ID)
+    if not valid_device_id(device_id):
+        return (400, {"error": f"invalid device: {device_id}"}), None
+    if not USE_DB and device_id != DEVICE_ID:
+        return (404, {"error": f"unknown device: {device_id}"}), None  # 업로드 모드는 이 장치 링버퍼만
+    try:
+        end = parse_time(args.get("to"), datetime.now())
+        start = parse_time(args.get("from"), datetime.fromtimestamp(end.timestamp() - 86400))
+    except ValueError as e:
+        return (400, {"error": str(e)}), None
+    if start >= end:
+        return (400, {"error": "'from' must be earlier than 'to'"}), None
+    method = args.get("method", "avg")
+    if method not in METHODS:
+        return (400, {"error": f"unknown method: {method} (one of {', '.join(METHODS)})"}), None
+    return None, dict(
+        metric=metric, device_id=device_id, start=start, end=end,
+        max_points=max(10, min(_arg_int(args, "max_points", 300), 2000)),
+        method=method,
+        # 정착된 과거 구간은 내용이 고정 → Last-Modified=to, 브라우저/프록시 캐시 허용
+        settled=end.timestamp() <= time.time() - HISTORY_SETTLE,
+    )
+
+def range_body(q):
+    """range_request 의 조회 dict → 응답 dict. 블로킹 (DB)"""
+    metric, start, end, device_id = q["metric"], q["start"], q["end"], q["device_id"]
+    if q["method"] == "lttb":
+        pts = lttb(range_raw(metric, start, end, device_id), q["max_points"])
+        points = [{"dt": fmt_ts(t), "value": round(v, 2)} for t, v in pts]
+        bucket = None
+    else:
+        bucket, buckets = range_buckets(metric, start, end, bucket_seconds(start, end, q["max_points"]),
+                                        device_id)
+        points = []
+        for ts, lo, hi, avg, cnt in buckets:
+            p = {"dt": fmt_ts(ts), "value": None if avg is None else round(float(avg), 2)}
+            if q["method"] == "minmax":
+                p["min"] = None if lo is None else float(lo)
+                p["max"] = None if hi is None else float(hi)
+            p["count"] = int(cnt)
+            points.append(p)
+    return {
+        "device_id": device_id,
+        "metric": metric,
+        "from": start.strftime("%Y-%m-%d %H:%M:%S"),
+        "to": end.strftime("%Y-%m-%d %H:%M:%S"),
+        "method": q["method"],
+        "bucket_sec": bucket,
+        "points": points,
+    }
+
+def range_cache_headers(q):
+    """(Last-Modified epoch 초, Cache-Control). 정착 구간이면 If-Modified-Since 로 304 가능"""
+    if q["settled"]:
+        return int(q["end"].timestamp()), "public, max-age=3600"
+    return int(time.time()), "no-cache"
+
+@app.route("/history_range")
+def history_range():
+    err, q = range_request(request.args)
+    if err is not None:
+        return jsonify(err[1]), err[0]
+    last_modified, cache_control = range_cache_headers(q)
+    since = request.if_modified_since
+    if q["settled"] and since is not None and since.timestamp() >= last_modified:
+        resp = Response(status=304)
+    else:
+        resp = jsonify(range_body(q))
+    resp.last_modified = last_modified
+    resp.headers["Cache-Control"] = cache_control
+    return resp
 
 # ---- 페이지 (리스트/그래프)
+def history_page(metric, chart):
+    """최근 10개 리스트(chart=False) 또는 그래프 페이지 HTML. 없는 메트릭은 None (Flask/ASGI 공용)"""
+    ylabel = dict(temp="온도(℃)", humid="습도(%)", dist="거리(cm)").get(metric)
+    if ylabel is None:
+        return None
+    with app.app_context():
+        return render_template_string(
+            HISTORY_TEMPLATE,
+            title=f"{ylabel} 최근 10개",
+            ylabel=ylabel,
+            data_api=f"/history_data/{metric}",
+            metric=metric,
+            chart=chart
+        )
+
 @app.route("/history/<metric>")
 def history(metric):
-    view = "chart" if (('chart' in str(getattr(app, 'request_class').args)) or ('chart' in str(getattr(app, 'request_class').environ))) else None
-    # 간단 처리: 쿼리스트링 ?view=chart 여부는 Jinja에서 직접 못 보므로 아래처럼 사용
-    # Flask 공식 방식으로는 request.args.get('view')가 맞지만, 템플릿 문자열만 쓰는 제약에서 간단화
-
-    ylabel = dict(temp="온도(℃)", humid="습도(%)", dist="거리(cm)")[metric]
-    title = f"{ylabel} 최근 10개"
-    chart = ("chart" in (app.request_class.environ.get('QUERY_STRING','')))  # 정상 처리
-    return render_template_string(
-        HISTORY_TEMPLATE,
-        title=title,
-        ylabel=ylabel,
-        data_api=f"/history_data/{metric}",
-        chart=chart
-    )
+    # ?view=chart 면 그래프, 아니면 리스트
+    html = history_page(metric, request.args.get("view") == "chart")
+    if html is None:
+        return jsonify({"error": f"unknown metric: {metric}"}), 404
+    return html
 
 # =========================
 # 메인
 # =========================
+def start_node(run_sensors=True):
+    """센서/DB 백그라운드 작업 시작 (이 프로세스가 하드웨어를 소유).
+
+    run_sensors=False 면 DB 쪽만 시작 (asyncio 런타임이 센서 작업을 직접 돌릴 때)
+    업로드 모드(IOT_INGEST_URL)는 DB 작업 없이 스풀 업로더만 시작
+    """
+    if USE_DB:
+        db_init()
+        history_cache.warm(db_last_n(history_cache.capacity))
+    log_writer.start()
+    if USE_DB and MAINTENANCE != "off":
+        maintenance.start()  # 담당으로 선출되면 파티션 확인 후 집계/보존/fleet 폴링 시작
+    if run_sensors:
+        sampler.start()
+        touch.on("press", toggle_mode)
+        touch.start()
+
+def stop_node():
+    sampler.stop()
+    touch.stop()
+    log_writer.stop()  # 남은 행 flush (실패분은 스풀에 남아 다음 실행 때 전송)
+    spool.close()
+    maintenance.stop()  # 담당이었다면 작업 중지 후 잠금 반납
+    log.info("AUTO rules %s", auto_rules.stats())
+    log.info("actuators %s", {k: v for k, v in actuators.stats().items() if k != "history"})
+    log.info("DB writer %s", log_writer.stats())
+    log.info("DB pool %s", db_pool.metrics())
+    db_pool.close()
+    actuators.all_off()
+    GPIO.cleanup()
+    iotlog.shutdown()  # 큐에 남은 로그 출력
+
 if __name__ == "__main__":
+    # 개발용 단일 프로세스 서버. 여러 워커로 서비스하려면 serve.py 사용
     try:
-        db_init()
-        threading.Thread(target=sensor_loop, daemon=True).start()
-        threading.Thread(target=touch_loop, daemon=True).start()
+        start_node()
+        log.info("listening on 0.0.0.0:8080")
         app.run(host="0.0.0.0", port=8080, debug=False)
     finally:
-        GPIO.cleanup()
+        stop_node()
@@ -0,0 +1,161 @@
+import logging, threading, time
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+# =========================
+# 출력 핀(에어컨/히터/제습기) 관리자 - 모든 GPIO.output 은 여기서만
+# =========================
+# - 핀마다 desired(요청된 상태) / actual(실제로 쓴 상태) 를 따로 가짐
+# - 상태가 실제로 바뀔 때만 GPIO.output (같은 값 반복 쓰기 없음)
+# - 하나의 잠금으로 제어 루프(AUTO)와 HTTP/터치(MANUAL) 쓰기를 직렬화
+# - owner: 지금 출력을 바꿀 수 있는 쪽 ("auto" | "manual"). 다른 쪽 요청은 잠금 안에서 거절
+#   → 모드가 바뀌는 순간 계산 중이던 AUTO 결과가 MANUAL 요청을 덮어쓰는 깜빡임 없음
+# - 최소 유지 시간(min_on/min_off): 너무 빨리 온 전환은 보류 → tick() 에서 시간이 되면 적용
+# - 전환 기록은 최근 history 개 (시각, 출력, 상태, 요청 측, 보류된 시간)
+APPLIED = "applied"        # 바로 씀
+UNCHANGED = "unchanged"    # 이미 그 상태 (쓰기 없음)
+DEFERRED = "deferred"      # 최소 유지 시간 때문에 보류 (tick 에서 적용)
+REJECTED = "rejected"      # owner 가 아닌 쪽의 요청
+
+
+class Output:
+    def __init__(self, name, pin, min_on=0.0, min_off=0.0):
+        self.name = name
+        self.pin = pin
+        self.min_on = min_on
+        self.min_off = min_off
+        self.actual = False
+        self.desired = False
+        self.changed_at = float("-inf")
+        self.requested_at = None     # 보류 중인 요청 시각
+        self.source = None           # 보류 중인 요청 측
+
+    def ready_at(self):
+        """desired 로 바꿀 수 있는 가장 이른 시각"""
+        return self.changed_at + (self.min_on if self.actual else self.min_off)
+
+
+class ActuatorBank:
+    """출력 핀 묶음. on_change() 는 실제 출력이 바뀐 뒤 (잠금 밖에서) 호출 → states() 로 현재값 읽기"""
+
+    def __init__(self, gpio, outputs, clock=time, owner="auto", history=200, on_change=None):
+        self.gpio = gpio
+        self.outputs = [Output(**spec) for spec in outputs]
+        self.clock = clock
+        self.owner = owner
+        self.on_change = on_change
+        self.history = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.writes = 0            # 실제 GPIO.output 호출 수
+        self.coalesced = 0         # 이미 같은 상태라 쓰지 않은 요청
+        self.deferred = 0
+        self.rejected = 0
+        for out in self.outputs:
+            gpio.setup(out.pin, gpio.OUT, initial=gpio.LOW)
+
+    def __len__(self):
+        return len(self.outputs)
+
+    def states(self):
+        return tuple(int(o.actual) for o in self.outputs)
+
+    def desired(self):
+        return tuple(int(o.desired) for o in self.outputs)
+
+    # ---- 요청 ----
+    def set_owner(self, owner):
+        """출력 제어권 변경. 이전 owner 의 보류 요청은 취소 (desired = actual)"""
+        with self._lock:
+            if owner == self.owner:
+                return
+            self.owner = owner
+            for o in self.outputs:
+                o.desired = o.actual
+                o.requested_at = o.source = None
+
+    def request(self, index, on, source):
+        """출력 1개 요청 → APPLIED/UNCHANGED/DEFERRED/REJECTED"""
+        return self.apply([(index, on)], source)[0]
+
+    def apply(self, changes, source):
+        """[(index, on), ...] 을 한 번의 잠금 안에서 처리. 결과 목록은 changes 순서"""
+        now = self.clock.time()
+        results = []
+        with self._lock:
+            for index, on in changes:
+                self.requests += 1
+                if source != self.owner:
+                    self.rejected += 1
+                    results.append(REJECTED)
+                    continue
+                o = self.outputs[index]
+                on = bool(on)
+                o.desired = on
+                if on == o.actual:
+                    o.requested_at = o.source = None   # 보류 중이던 반대 요청도 취소
+                    self.coalesced += 1
+                    results.append(UNCHANGED)
+                elif now < o.ready_at():
+                    if o.requested_at is None:
+                        o.requested_at = now
+                        self.deferred += 1
+                    o.source = source
+                    results.append(DEFERRED)
+                else:
+                    o.source = source
+                    self._write(o, now)
+                    results.append(APPLIED)
+        if APPLIED in results and self.on_change is not None:
+            self.on_change()
+        return results
+
+    def tick(self):
+        """보류된 전환 중 최소 유지 시간이 지난 것 적용 (제어 주기마다 호출). 적용 수 반환"""
+        now = self.clock.time()
+        n = 0
+        with self._lock:
+            for o in self.outputs:
+                if o.desired != o.actual and now >= o.ready_at():
+                    self._write(o, now)
+                    n += 1
+        if n and self.on_change is not None:
+            self.on_change()
+        return n
+
+    def _write(self, o, now):
+        # 잠금 안에서만 호출
+        self.gpio.output(o.pin, self.gpio.HIGH if o.desired else self.gpio.LOW)
+        self.writes += 1
+        o.actual = o.desired
+        o.changed_at = now
+        waited = 0.0 if o.requested_at is None else now - o.requested_at
+        self.history.append(dict(ts=now, output=o.name, on=o.actual, source=o.source,
+                                 deferred_sec=round(waited, 3)))
+        o.requested_at = o.source = None
+        log.info("%s → %s (%s%s)", o.name, "ON" if o.actual else "OFF", self.history[-1]["source"],
+                 f", {waited:.1f}s 보류" if waited else "")
+
+    def all_off(self):
+        """종료 시 모든 출력 끄기 (owner/최소 유지 시간 무시)"""
+        now = self.clock.time()
+        with self._lock:
+            for o in self.outputs:
+                o.desired = o.actual
+                if o.actual:
+                    o.desired, o.requested_at, o.source = False, None, "shutdown"
+                    self._write(o, now)
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                owner=self.owner, requests=self.requests, writes=self.writes, coalesced=self.coalesced,
+                deferred=self.deferred, rejected=self.rejected,
+                outputs=[dict(name=o.name, pin=o.pin, actual=int(o.actual), desired=int(o.desired),
+                              ready_in=max(0.0, round(o.ready_at() - self.clock.time(), 1))
+                              if o.desired != o.actual else 0.0)
+                         for o in self.outputs],
+                history=list(self.history),
+            )
@@ -0,0 +1,355 @@
+import asyncio, json, re, time
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import parse_qs
+
+import W4_shin as node
+from db_pool import AsyncPool
+from push import AsyncSubscriber
+from scheduler import AsyncSensorScheduler, SensorTask
+import wire
+
+# =========================
+# asyncio 런타임 + ASGI 앱
+# =========================
+# 실행: uvicorn asgi_app:app --host 0.0.0.0 --port 8080   (워커 1개 - 이 프로세스가 GPIO 소유)
+#   - 센서 작업: 코루틴. 초음파는 엣지 콜백 Future 를 await, DHT 읽기는 executor 스레드
+#   - DB: AsyncPool (블로킹 드라이버를 풀 크기만큼의 스레드에서 실행)
+#   - /events: 연결당 스레드가 없는 SSE → 유휴 스트리밍 클라이언트가 늘어도 스레드 수 그대로
+# 라우트 로직/상태/캐시는 W4_shin 과 공용 (Flask 앱과 같은 응답)
+SSE_MAX_CLIENTS = 5000
+
+node.broadcaster.max_clients = SSE_MAX_CLIENTS
+apool = AsyncPool(node.db_pool)
+
+
+async def read_distance():
+    # 트리거 후 바로 반환되는 Future 를 await → 측정 중 이벤트 루프는 다른 일 처리
+    with node.DIST_SECONDS.time():
+        return await asyncio.wrap_future(node.sonar.measure())
+
+
+# 센서 작업 정의는 W4_shin 과 같고 거리 측정만 코루틴으로 교체
+runtime = AsyncSensorScheduler(node.clock)
+for _task in node.sampler.tasks.values():
+    runtime.add(_task)
+_dist = SensorTask("distance", read_distance, period=0.1, publish=node.publish_dist, deadline=0.09)
+_dist.timer = node.TASK_SECONDS.labels(_dist.name)
+runtime.add(_dist)
+
+
+async def touch_task(queue):
+    # 터치 이벤트를 asyncio 큐로 받아 처리 (엣지 콜백 → 이벤트 루프, 폴링 없음)
+    while True:
+        ev = await queue.get()
+        if ev.kind == "press":
+            node.toggle_mode(ev)
+
+
+_background = []
+
+
+async def startup():
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, node.start_node, False)  # DB 준비/writer/집계 (블로킹)
+    runtime.start()
+    touch_events = asyncio.Queue()
+    node.touch.subscribe(touch_events, loop)
+    node.touch.start()
+    _background.append(loop.create_task(touch_task(touch_events), name="touch"))
+
+
+async def shutdown():
+    await runtime.stop()
+    for t in _background:
+        t.cancel()
+    await asyncio.gather(*_background, return_exceptions=True)
+    _background.clear()
+    await asyncio.get_running_loop().run_in_executor(None, node.stop_node)
+    apool.close()
+
+
+# ---- 요청/응답 헬퍼 ----
+class Request:
+    def __init__(self, scope, receive):
+        self.scope = scope
+        self.receive = receive
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        self.args = {k: v[0] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+
+    def arg_int(self, name, default):
+        try:
+            return int(self.args.get(name, default))
+        except ValueError:
+            return default
+
+    def modified_since(self):
+        """If-Modified-Since → epoch 초 (없거나 형식 오류면 None)"""
+        header = self.headers.get("if-modified-since")
+        try:
+            return parsedate_to_datetime(header).timestamp() if header else None
+        except (TypeError, ValueError):
+            return None
+
+    def etag_matches(self, tag):
+        header = self.headers.get("if-none-match")
+        if not header:
+            return False
+        if header.strip() == "*":
+            return True
+        return any(t.strip().removeprefix("W/").strip('"') == tag for t in header.split(","))
+
+
+async def respond(send, status, body=b"", content_type="application/json", headers=()):
+    hdrs = [(b"access-control-allow-origin", b"*")]
+    empty = status in (204, 304)
+    if not empty:
+        hdrs.append((b"content-type", content_type.encode()))
+        hdrs.append((b"content-length", str(len(body)).encode()))
+    hdrs += [(k.lower().encode(), v.encode()) for k, v in headers]
+    await send({"type": "http.response.start", "status": status, "headers": hdrs})
+    await send({"type": "http.response.body", "body": b"" if empty else body})
+
+
+# ---- 라우트 (Flask 앱과 같은 경로/응답) ----
+async def home(req, send):
+    await respond(send, 200, node.HTML_TEMPLATE.encode(), "text/html; charset=utf-8")
+
+
+def device(device_id):
+    return node.local_device if device_id is None else node.fleet.get(device_id)
+
+
+async def unknown_device(send, device_id):
+    await respond(send, 404, json.dumps({"error": f"unknown device: {device_id}"}).encode())
+
+
+async def status(req, send, device_id=None):
+    dev = device(device_id)
+    if dev is None:
+        return await unknown_device(send, device_id)
+    mimetype = wire.negotiate(req.headers.get("accept"), wire.STATUS_TYPES)
+    snap = dev.store.snapshot()
+    tag = wire.etag(dev.store.etag(snap), mimetype)
+    headers = [("ETag", f'"{tag}"'), ("Cache-Control", "no-cache"), ("Vary", "Accept")]
+    if req.etag_matches(tag):
+        await respond(send, 304, headers=headers)
+    else:
+        await respond(send, 200, node.status_body(snap, tag, dev, mimetype), mimetype, headers=headers)
+
+
+async def fleet_summary(req, send):
+    await respond(send, 200, node.fleet.summary_body(), headers=[("Cache-Control", "no-cache")])
+
+
+async def control(req, send, led_id, state):
+    code, body = node.control_reply(node.manual_control(int(led_id), int(state)))
+    await respond(send, code, b"" if body is None else json.dumps(body).encode())
+
+
+async def local_or_error(send, device_id):
+    # GPIO 는 각 방의 컨트롤러만 만질 수 있음 → 원격 장치는 409
+    dev = device(device_id)
+    if dev is None:
+        await unknown_device(send, device_id)
+    elif not dev.local:
+        await respond(send, 409, json.dumps(
+            {"error": f"device {device_id} is controlled by its own node"}).encode())
+    else:
+        return False
+    return True
+
+
+async def device_control(req, send, device_id, led_id, state):
+    if not await local_or_error(send, device_id):
+        await control(req, send, led_id, state)
+
+
+async def device_set_mode(req, send, device_id, mode):
+    if not await local_or_error(send, device_id):
+        await set_mode(req, send, mode)
+
+
+async def actuator_stats(req, send):
+    await respond(send, 200, json.dumps(node.actuators.stats()).encode())
+
+
+async def set_mode(req, send, mode):
+    node.set_auto_mode(int(mode) == 1, "웹")
+    await respond(send, 204)
+
+
+async def history_data(req, send, metric, device_id=None):
+    dev = device(device_id)
+    if dev is None:
+        return await unknown_device(send, device_id)
+    if metric not in ("temp", "humid"):
+        metric = "dist"
+    n = max(1, min(req.arg_int("n", 10), 1000))
+    mimetype = wire.negotiate(req.headers.get("accept"), wire.HISTORY_TYPES)
+
+    tag = node.history_tag(metric, n, dev, mimetype)
+    if req.etag_matches(tag):
+        await respond(send, 304, headers=[("ETag", f'"{tag}"'), ("Cache-Control", "no-cache"),
+                                          ("Vary", "Accept")])
+        return
+    entry = node.history_cached(metric, n, tag, dev, mimetype)
+    if entry is not None:
+        _, body, newest = entry
+        headers = [("ETag", f'"{tag}"')]
+    else:
+        body, newest = await apool.call(node.history_fallback, metric, n, dev, mimetype)
+        headers = []
+    if newest is not None:
+        headers.append(("Last-Modified", formatdate(int(newest), usegmt=True)))
+    headers += [("Cache-Control", "no-cache"), ("Vary", "Accept")]
+    await respond(send, 200, body, mimetype, headers=headers)
+
+
+async def history_range(req, send):
+    err, q = node.range_request(req.args)
+    if err is not None:
+        return await respond(send, err[0], json.dumps(err[1]).encode())
+    last_modified, cache_control = node.range_cache_headers(q)
+    headers = [("Last-Modified", formatdate(last_modified, usegmt=True)), ("Cache-Control", cache_control)]
+    since = req.modified_since()
+    if q["settled"] and since is not None and since >= last_modified:
+        return await respond(send, 304, headers=headers)
+    body = await apool.call(node.range_body, q)
+    await respond(send, 200, json.dumps(body).encode(), headers=headers)
+
+
+async def history_page(req, send, metric):
+    html = node.history_page(metric, req.args.get("view") == "chart")
+    if html is None:
+        return await respond(send, 404, json.dumps({"error": f"unknown metric: {metric}"}).encode())
+    await respond(send, 200, html.encode(), "text/html; charset=utf-8")
+
+
+async def metrics_text(req, send):
+    await respond(send, 200, node.metrics.render(), node.metrics.CONTENT_TYPE)
+
+
+async def device_status(req, send, device_id):
+    await status(req, send, device_id)
+
+
+async def device_history_data(req, send, device_id, metric):
+    await history_data(req, send, metric, device_id)
+
+
+async def scheduler_stats(req, send):
+    await respond(send, 200, json.dumps(runtime.stats()).encode())
+
+
+async def events(req, send):
+    sub = node.broadcaster.subscribe(AsyncSubscriber(asyncio.get_running_loop()))
+    if sub is None:
+        await respond(send, 503, b'{"error":"too many clients"}')
+        return
+
+    async def watch_disconnect():
+        while (await req.receive())["type"] != "http.disconnect":
+            pass
+        sub.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    await send({"type": "http.response.start", "status": 200, "headers": [
+        (b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"),
+        (b"x-accel-buffering", b"no"), (b"access-control-allow-origin", b"*")]})
+    try:
+        async for chunk in node.broadcaster.astream(sub):
+            await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    except OSError:
+        pass
+    finally:
+        watcher.cancel()
+        node.broadcaster.unsubscribe(sub)
+
+
+# (경로 정규식, Flask 라우트 규칙, 핸들러) - 지표 라벨은 Flask 와 같은 규칙 문자열 (대시보드/알림 공용)
+ROUTES = [
+    (re.compile(r"/"), "/", home),
+    (re.compile(r"/status"), "/status", status),
+    (re.compile(r"/events"), "/events", events),
+    (re.compile(r"/scheduler"), "/scheduler", scheduler_stats),
+    (re.compile(r"/actuators"), "/actuators", actuator_stats),
+    (re.compile(r"/metrics"), "/metrics", metrics_text),
+    (re.compile(r"/control/(\d+)/(\d+)"), "/control/<int:led_id>/<int:state>", control),
+    (re.compile(r"/set_mode/(\d+)"), "/set_mode/<int:mode>", set_mode),
+    (re.compile(r"/history_data/(\w+)"), "/history_data/<metric>", history_data),
+    (re.compile(r"/history_range"), "/history_range", history_range),
+    (re.compile(r"/history/(\w+)"), "/history/<metric>", history_page),
+    (re.compile(r"/fleet"), "/fleet", fleet_summary),
+    (re.compile(r"/d/([\w.-]+)/status"), "/d/<device_id>/status", device_status),
+    (re.compile(r"/d/([\w.-]+)/history_data/(\w+)"), "/d/<device_id>/history_data/<metric>", device_history_data),
+    (re.compile(r"/d/([\w.-]+)/control/(\d+)/(\d+)"), "/d/<device_id>/control/<int:led_id>/<int:state>", device_control),
+    (re.compile(r"/d/([\w.-]+)/set_mode/(\d+)"), "/d/<device_id>/set_mode/<int:mode>", device_set_mode),
+]
+
+
+async def lifespan(receive, send):
+    while True:
+        msg = await receive()
+        if msg["type"] == "lifespan.startup":
+            try:
+                await startup()
+            except Exception as e:
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif msg["type"] == "lifespan.shutdown":
+            await shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+    req = Request(scope, receive)
+    for pattern, rule, handler in ROUTES:
+        m = pattern.fullmatch(req.path)
+        if m:
+            if req.method not in ("GET", "HEAD"):
+                return await _counted(send, "unmatched",
+                                      lambda s: respond(s, 405, b'{"error":"method not allowed"}'))
+
+            def call(s):
+                return handler(req, s, *m.groups())
+
+            if handler is events:   # 스트림은 연결 시간이 곧 처리 시간이 아니므로 응답 수만
+                return await _counted(send, rule, call)
+            t0 = time.perf_counter()
+            try:
+                return await _counted(send, rule, call)
+            finally:
+                node.HTTP_SECONDS.labels(rule).observe(time.perf_counter() - t0)
+    await _counted(send, "unmatched", lambda s: respond(s, 404, b'{"error":"not found"}'))
+
+
+async def _counted(send, rule, call):
+    """call(send) 실행 + 응답 시작 메시지의 상태 코드로 HTTP_RESPONSES 기록 (Flask after_request 와 같은 라벨)"""
+    code = 500
+
+    async def send_status(msg):
+        nonlocal code
+        if msg["type"] == "http.response.start":
+            code = msg["status"]
+        await send(msg)
+
+    try:
+        return await call(send_status)
+    finally:
+        node.HTTP_RESPONSES.labels(rule, code).inc()
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("uvicorn 이 필요합니다: pip install uvicorn")
+    uvicorn.run(app, host="0.0.0.0", port=8080, workers=1, log_level="warning")
@@ -0,0 +1,110 @@
+# 출력 핀 쓰기 비교: 직접 GPIO.output (기존) vs ActuatorBank
+#   - 제어 루프 스레드: AUTO 모드면 --period 마다 규칙 결과(임계값 부근에서 흔들리는 온도)를 씀
+#   - HTTP 스레드: 모드를 MANUAL 로 바꾸고 수동 요청을 연달아 보낸 뒤 다시 AUTO (웹/앱 사용자 흉내)
+#   - writes  : GPIO.output 호출 수 (syscall)
+#   - flicker : 같은 핀이 --dwell 초 안에 다시 바뀐 횟수 (릴레이 깜빡임)
+# 사용: python bench_actuators.py --seconds 3 --period 0.005 --dwell 0.05
+import argparse, random, threading, time
+
+from actuators import ActuatorBank
+
+PINS = [17, 27, 22]
+
+
+class RecordingGPIO:
+    OUT, LOW, HIGH = 0, 0, 1
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.level = {}
+        self.changed = {}
+        self.flicker = 0
+
+    def setup(self, pin, direction, initial=0):
+        self.level[pin] = initial
+
+    def output(self, pin, value):
+        now = time.monotonic()
+        with self.lock:
+            self.writes += 1
+            if self.level.get(pin) != value:
+                if now - self.changed.get(pin, -1e9) < self.dwell:
+                    self.flicker += 1
+                self.level[pin] = value
+                self.changed[pin] = now
+
+
+def auto_outputs(i):
+    # 25℃ 임계값 부근에서 흔들리는 온도 → 에어컨/제습기가 자주 바뀌려고 함
+    temp = 25 + (1 if i % 7 < 3 else -1) * random.random()
+    return [int(temp >= 25), 0, int(i % 5 < 2)]
+
+
+def run(args, use_bank):
+    gpio = RecordingGPIO()
+    gpio.dwell = args.dwell
+    auto = [True]
+    stop = threading.Event()
+
+    if use_bank:
+        bank = ActuatorBank(gpio, [dict(name=str(p), pin=p, min_on=args.dwell, min_off=args.dwell)
+                                   for p in PINS], time)
+
+    def control_loop():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            if use_bank:
+                bank.tick()
+                if auto[0]:
+                    bank.apply(list(enumerate(auto_outputs(i))), "auto")
+            elif auto[0]:
+                for pin, on in zip(PINS, auto_outputs(i)):
+                    gpio.output(pin, on)            # 기존: 매 주기 3개 모두
+            time.sleep(args.period)
+
+    def http_client():
+        rnd = random.Random(1)
+        while not stop.is_set():
+            time.sleep(args.period * 20)
+            auto[0] = False
+            if use_bank:
+                bank.set_owner("manual")
+            for _ in range(5):
+                led, on = rnd.randrange(3), rnd.randrange(2)
+                if use_bank:
+                    bank.request(led, on, "manual")
+                else:
+                    gpio.output(PINS[led], on)
+                time.sleep(args.period)
+            if use_bank:
+                bank.set_owner("auto")
+            auto[0] = True
+
+    threads = [threading.Thread(target=control_loop), threading.Thread(target=http_client)]
+    for th in threads:
+        th.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for th in threads:
+        th.join()
+    return gpio
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--period", type=float, default=0.005)
+    ap.add_argument("--dwell", type=float, default=0.05)
+    args = ap.parse_args()
+
+    print(f"{'mode':>8} {'writes':>8} {'flicker':>8}")
+    for name, use_bank in (("direct", False), ("bank", True)):
+        random.seed(0)
+        g = run(args, use_bank)
+        print(f"{name:>8} {g.writes:>8} {g.flicker:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# /history_data DB 경로 직렬화 비교: 기존 행 단위 루프 vs 열 단위(NumPy, columnar.py)
+#   - loop    : SELECT * dictionary 커서 행(dict, Decimal, datetime) → 행마다 dict + strftime → json.dumps
+#   - columnar: 메트릭 열만 (UNIX_TIMESTAMP, DOUBLE) 튜플 행 → 배열 2개 → 고정 폭 JSON 한 번에
+#   - columnar+bin: 같은 배열 → application/vnd.iot.columnar (wire.py)
+# 커서가 돌려주는 행 목록은 미리 만들어 두고 (DB/네트워크 제외) 그 뒤 처리 시간만 측정
+# 사용: python bench_history.py --sizes 10000 100000 1000000
+import argparse, json, random, time
+from datetime import datetime
+from decimal import Decimal
+
+import columnar
+import wire
+
+
+def make_rows(n):
+    rnd = random.Random(n)
+    now = int(time.time())
+    dict_rows, tuple_rows = [], []
+    for i in range(n):
+        ts = now - i * 3
+        t = None if i % 100 == 0 else round(rnd.uniform(18, 30), 2)
+        dict_rows.append({"id": n - i, "device_id": "room-101", "temp": None if t is None else Decimal(f"{t:.2f}"),
+                          "humid": Decimal("41.00"), "dist": Decimal("120.50"), "dt": datetime.fromtimestamp(ts)})
+        tuple_rows.append((ts, t))
+    return dict_rows, tuple_rows
+
+
+def loop(rows, metric="temp"):
+    # W4_shin.history_from_db 의 기존 경로
+    out = []
+    for r in rows:
+        v = r[metric]
+        out.append({"dt": r["dt"].strftime("%Y-%m-%d %H:%M:%S"),
+                    "value": None if v is None else float(v)})
+    return json.dumps(out, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - t)
+    return best, body
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'rows':>9} {'path':>14} {'ms':>9} {'bytes':>10} {'x faster':>9}")
+    for n in args.sizes:
+        dict_rows, tuple_rows = make_rows(n)
+        base = None
+        for name, fn in (
+            ("loop", lambda: loop(dict_rows)),
+            ("columnar", lambda: columnar.to_json(*columnar.from_rows(tuple_rows))),
+            ("columnar+bin", lambda: wire.pack_history(wire.COLUMNAR, "temp", *columnar.from_rows(tuple_rows))),
+        ):
+            sec, body = best_of(fn, args.repeat)
+            base = base or sec
+            print(f"{n:>9} {name:>14} {sec * 1000:>9.1f} {len(body):>10} {base / sec:>9.1f}")
+        check = json.loads(columnar.to_json(*columnar.from_rows(tuple_rows[:1000])))
+        assert [p["dt"] for p in check] == [p["dt"] for p in json.loads(loop(dict_rows[:1000]))]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# 수집 게이트웨이 부하 생성기: 장치 N대가 동시에 배치 업로드 (gateway.py 가 떠 있어야 함)
+#   - 장치마다 스레드 1개, 배치 크기 --rows, 업로드 사이 --interval 초
+#   - --resend 비율만큼 직전 배치를 다시 보냄 (응답 유실 후 재전송 흉내 → 중복 제거 확인)
+#   - 결과: 요청/초, 행/초, 응답 지연 p50/p99, 행당 전송 바이트, 게이트웨이가 센 중복 행 수
+# 사용: python bench_ingest.py --url http://localhost:8090/ingest --devices 50 --rows 100 --seconds 20
+import argparse, json, os, random, statistics, threading, time, urllib.error, urllib.request
+
+from ingest import encode_batch
+
+
+def post(url, body):
+    req = urllib.request.Request(url, data=body, method="POST", headers={
+        "Content-Type": "application/json", "Content-Encoding": "gzip"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def device(args, idx, deadline, out):
+    device_id = f"bench-{idx:03d}"
+    stream = os.urandom(8).hex()
+    rnd = random.Random(idx)
+    seq = 0
+    last = None
+    while time.monotonic() < deadline:
+        if last is not None and rnd.random() < args.resend:
+            body, n = last
+        else:
+            now = time.time()
+            rows = []
+            for k in range(args.rows):
+                seq += 1
+                rows.append([seq, round(now - (args.rows - k) * 3.0, 3), round(rnd.uniform(18, 30), 1),
+                             round(rnd.uniform(30, 60), 1), round(rnd.uniform(5, 200), 1)])
+            body, n = encode_batch(device_id, stream, rows), len(rows)
+            last = (body, n)
+        t = time.perf_counter()
+        code, result = post(args.url, body)
+        lat = time.perf_counter() - t
+        with out["lock"]:
+            out["lat"].append(lat)
+            out["codes"][code] = out["codes"].get(code, 0) + 1
+            out["bytes"] += len(body)
+            out["rows_sent"] += n
+            if result:
+                out["accepted"] += result.get("accepted", 0)
+                out["duplicates"] += result.get("duplicates", 0)
+        if code == 503:
+            time.sleep(1.0)
+        elif args.interval:
+            time.sleep(args.interval)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://localhost:8090/ingest")
+    ap.add_argument("--devices", type=int, default=50)
+    ap.add_argument("--rows", type=int, default=100, help="행 수 / 업로드")
+    ap.add_argument("--interval", type=float, default=0.0, help="장치별 업로드 간격(초)")
+    ap.add_argument("--resend", type=float, default=0.05, help="직전 배치 재전송 비율")
+    ap.add_argument("--seconds", type=float, default=20.0)
+    args = ap.parse_args()
+
+    out = dict(lock=threading.Lock(), lat=[], codes={}, bytes=0, rows_sent=0, accepted=0, duplicates=0)
+    deadline = time.monotonic() + args.seconds
+    threads = [threading.Thread(target=device, args=(args, i, deadline, out), daemon=True)
+               for i in range(args.devices)]
+    t0 = time.monotonic()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    elapsed = time.monotonic() - t0
+
+    lat = sorted(out["lat"])
+    if not lat:
+        print("no requests completed")
+        return
+    raw = len(json.dumps([[1, time.time(), 23.4, 45.6, 123.4]] * args.rows, separators=(",", ":")))
+    print(f"{args.devices} devices x {args.rows} rows/upload, {elapsed:.1f} s, responses {out['codes']}")
+    print(f"requests/s  {len(lat) / elapsed:10.1f}")
+    print(f"rows/s      {out['accepted'] / elapsed:10.1f} (stored)")
+    print(f"latency ms  p50 {statistics.median(lat) * 1000:.1f}  p99 {lat[int(len(lat) * 0.99)] * 1000:.1f}"
+          f"  max {lat[-1] * 1000:.1f}")
+    print(f"bytes/row   {out['bytes'] / max(out['rows_sent'], 1):10.1f} gzip (JSON ~{raw / args.rows:.1f})")
+    print(f"duplicates  {out['duplicates']:10d} rows skipped by the gateway")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# 로그 호출이 호출 스레드를 얼마나 붙잡는지 측정: print() vs iotlog (큐 + 백그라운드 출력)
+#   - 출력 대상: 느린 소비자(파이프를 --drain-delay 마다 조금씩 읽음)를 흉내 내
+#     터미널/journald 가 밀릴 때를 재현
+#   - 같은 오류 반복(DHT CRC 등)과 서로 다른 메시지 두 경우
+# 사용: python bench_logging.py -n 20000 --drain-delay 0.002
+import argparse, io, logging, os, statistics, sys, threading, time
+
+import iotlog
+
+
+def slow_pipe(delay, chunk):
+    """쓰기 끝 파일 객체. 읽기 쪽 스레드가 delay 초마다 chunk 바이트만 읽음"""
+    r, w = os.pipe()
+
+    def drain():
+        with os.fdopen(r, "rb", buffering=0) as f:
+            while f.read(chunk):
+                time.sleep(delay)
+
+    threading.Thread(target=drain, daemon=True).start()
+    return io.TextIOWrapper(os.fdopen(w, "wb", buffering=0), write_through=True)
+
+
+def measure(fn, n):
+    lat = []
+    for i in range(n):
+        t = time.perf_counter_ns()
+        fn(i)
+        lat.append(time.perf_counter_ns() - t)
+    lat.sort()
+    return statistics.median(lat) / 1000, lat[int(n * 0.99)] / 1000, lat[-1] / 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=20000)
+    ap.add_argument("--drain-delay", type=float, default=0.002)
+    ap.add_argument("--chunk", type=int, default=4096)
+    args = ap.parse_args()
+
+    print(f"{args.n} calls, consumer reads {args.chunk} B every {args.drain_delay * 1000:g} ms", file=sys.stderr)
+    print(f"{'mode':>22} {'p50 us':>8} {'p99 us':>8} {'max us':>9}", file=sys.stderr)
+
+    out = slow_pipe(args.drain_delay, args.chunk)
+    for name, fn in (
+        ("print repeated", lambda i: print("[ERROR] DHT: Checksum did not validate. Try again.", file=out)),
+        ("print distinct", lambda i: print(f"[DEBUG] reading {i}: temp=23.0 humid=41.0", file=out)),
+    ):
+        p50, p99, mx = measure(fn, args.n)
+        print(f"{name:>22} {p50:>8.1f} {p99:>8.1f} {mx:>9.1f}", file=sys.stderr)
+
+    for fmt in ("text", "json"):
+        iotlog.setup(level="DEBUG", fmt=fmt, stream=slow_pipe(args.drain_delay, args.chunk))
+        log = logging.getLogger("bench")
+        for name, fn in (
+            (f"iotlog {fmt} repeated", lambda i: log.warning("DHT: %s", "Checksum did not validate. Try again.")),
+            (f"iotlog {fmt} distinct", lambda i: log.debug("reading %d: temp=%s humid=%s", i, 23.0, 41.0)),
+        ):
+            p50, p99, mx = measure(fn, args.n)
+            print(f"{name:>22} {p50:>8.1f} {p99:>8.1f} {mx:>9.1f}", file=sys.stderr)
+        print(f"{'':>22} {iotlog.stats()}", file=sys.stderr)
+        iotlog._state["listener"].queue.queue.clear()   # 느린 소비자를 기다리지 않고 종료
+        iotlog.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# 지표 관측 비용 측정 (운영 중에도 켜 둘 수 있는지 확인)
+#   - observe(): 라벨 없음 / labels() 조회 후 / 미리 받아 둔 자식
+#   - @timed 데코레이터, with h.time() 컨텍스트
+#   - 여러 스레드가 같은 히스토그램에 동시에 기록할 때
+#   - /metrics 렌더링 시간 (라벨 조합 수별)
+# 사용: python bench_metrics.py -n 200000
+import argparse, threading, time
+
+from metrics import Registry
+
+
+def per_call(fn, n):
+    t = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t) / n * 1e9
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=200000)
+    ap.add_argument("--threads", type=int, default=4)
+    args = ap.parse_args()
+    n = args.n
+
+    reg = Registry()
+    h = reg.histogram("bench_seconds", "bench")
+    hl = reg.histogram("bench_route_seconds", "bench", labels=("route",))
+    c = reg.counter("bench_total", "bench", labels=("route", "code"))
+    child = hl.labels("/status")
+
+    def noop():
+        pass
+
+    timed_noop = h.timed(noop)
+
+    def ctx():
+        with h.time():
+            pass
+
+    base = per_call(noop, n)
+    rows = [
+        ("baseline call", base),
+        ("observe()", per_call(lambda: h.observe(0.003), n)),
+        ("labels().observe()", per_call(lambda: hl.labels("/status").observe(0.003), n)),
+        ("child.observe()", per_call(lambda: child.observe(0.003), n)),
+        ("counter labels().inc()", per_call(lambda: c.labels("/status", 200).inc(), n)),
+        ("@timed call", per_call(timed_noop, n)),
+        ("with h.time()", per_call(ctx, n)),
+    ]
+    print(f"{'operation':>24} {'ns/call':>9}")
+    for name, ns in rows:
+        print(f"{name:>24} {ns:>9.0f}")
+
+    # 동시 기록: 잠금 경합 포함 처리량
+    per = n // args.threads
+
+    def worker():
+        for _ in range(per):
+            child.observe(0.003)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    t = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    dt = time.perf_counter() - t
+    print(f"\n{args.threads} threads x {per} observe(): {dt / (per * args.threads) * 1e9:.0f} ns/observation")
+
+    # 스크레이프 비용
+    print(f"\n{'series':>8} {'bytes':>8} {'render ms':>10}")
+    for series in (10, 100, 1000):
+        reg = Registry()
+        hist = reg.histogram("bench_route_seconds", "bench", labels=("route",))
+        for i in range(series):
+            hist.labels(f"/r{i}").observe(0.001 * i)
+        t = time.perf_counter()
+        body = reg.render()
+        print(f"{series:>8} {len(body):>8} {(time.perf_counter() - t) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# 보존 관리 효과 측정: 히스토리가 계속 쌓일 때 INSERT / 최근 n개 조회 지연 비교
+#   - part : 일 단위 파티션 + keep_days 보존 (RetentionManager)
+#   - raw  : 파티션/삭제 없이 계속 누적 (기존 sensor_log 방식)
+# 사용: python bench_retention.py --days 20 --rows-per-day 28800 --keep-days 7
+import argparse, statistics, tempfile, time
+from datetime import datetime, date, timedelta
+
+from db_pool import get_pool
+from retention import RetentionManager
+
+DDL = """
+CREATE TABLE {table}(
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    temp  DECIMAL(5,2) NULL,
+    humid DECIMAL(5,2) NULL,
+    dist  DECIMAL(6,2) NULL,
+    dt DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def load_day(pool, table, day, rows):
+    # 하루치 행을 3초 간격 타임스탬프로 적재 (writer 와 같은 executemany)
+    t0 = datetime.combine(day, datetime.min.time())
+    step = 86400 / rows
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        batch = []
+        for i in range(rows):
+            batch.append((20 + i % 10, 40 + i % 20, 50 + i % 100, t0 + timedelta(seconds=i * step)))
+            if len(batch) == 5000:
+                cur.executemany(f"INSERT INTO {table} (temp, humid, dist, dt) VALUES (%s, %s, %s, %s)", batch)
+                batch = []
+        if batch:
+            cur.executemany(f"INSERT INTO {table} (temp, humid, dist, dt) VALUES (%s, %s, %s, %s)", batch)
+        conn.commit()
+        cur.close()
+
+
+def measure(pool, table, day, reps):
+    ins, last = [], []
+    dt = datetime.combine(day, datetime.min.time()) + timedelta(hours=23, minutes=59)
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        for _ in range(reps):
+            t = time.perf_counter()
+            cur.executemany(f"INSERT INTO {table} (temp, humid, dist, dt) VALUES (%s, %s, %s, %s)",
+                            [(21.0, 45.0, 80.0, dt)] * 20)
+            conn.commit()
+            ins.append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            cur.execute(f"SELECT * FROM {table} ORDER BY id DESC LIMIT 10")
+            cur.fetchall()
+            last.append(time.perf_counter() - t)
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        live = cur.fetchone()[0]
+        cur.close()
+    return statistics.median(ins) * 1000, statistics.median(last) * 1000, live
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--user", default="team04")
+    ap.add_argument("--password", default="team04")
+    ap.add_argument("--host", default="localhost")
+    ap.add_argument("--database", default="IOT")
+    ap.add_argument("--days", type=int, default=20)
+    ap.add_argument("--rows-per-day", type=int, default=28800)
+    ap.add_argument("--keep-days", type=int, default=7)
+    ap.add_argument("--reps", type=int, default=50)
+    args = ap.parse_args()
+
+    pool = get_pool(dict(user=args.user, password=args.password, host=args.host,
+                         port=3306, database=args.database))
+    tables = {"part": "sensor_log_bench_part", "raw": "sensor_log_bench_raw"}
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        for t in tables.values():
+            cur.execute(f"DROP TABLE IF EXISTS {t}")
+            cur.execute(DDL.format(table=t))
+        conn.commit()
+        cur.close()
+
+    start = date.today() - timedelta(days=args.days)
+    archive = tempfile.mkdtemp(prefix="sensor_archive_")
+    rm = RetentionManager(pool.connection, keep_days=args.keep_days, archive_dir=archive,
+                          table=tables["part"], require_rollup=False)
+    rm.ensure_partitioned(today=start)
+
+    print(f"{'day':>4} {'total':>10} | {'part live':>10} {'insert ms':>9} {'last10 ms':>9} "
+          f"| {'raw live':>10} {'insert ms':>9} {'last10 ms':>9}")
+    total = 0
+    for i in range(args.days):
+        day = start + timedelta(days=i)
+        for t in tables.values():
+            load_day(pool, t, day, args.rows_per_day)
+        total += args.rows_per_day
+        rm.run_once(today=day)
+        p_ins, p_last, p_live = measure(pool, tables["part"], day, args.reps)
+        r_ins, r_last, r_live = measure(pool, tables["raw"], day, args.reps)
+        print(f"{i:>4} {total:>10} | {p_live:>10} {p_ins:>9.2f} {p_last:>9.3f} "
+              f"| {r_live:>10} {r_ins:>9.2f} {r_last:>9.3f}")
+
+    print(f"archived {len(rm.archived)} partitions → {archive}")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# AUTO 제어 비교: 기존 고정 임계값 if 문 vs 규칙 엔진 (히스테리시스 + 최소 유지 시간)
+#   - 시뮬레이션 센서 궤적(임계값 근처를 오가는 온/습도 + 노이즈)을 W4_shin 과 같은 주기로 재생
+#     DHT 2.2초 주기 → 중앙값 필터 → 제어 0.5초 주기
+#   - 출력 전환(toggle) 횟수, GPIO 쓰기 횟수, 제어 1회당 평가 시간 비교
+# 사용: python bench_rules.py --hours 24
+import argparse, math, random, time
+
+from filters import make_filter
+from rules import RuleEngine
+
+RULES = [
+    dict(name="aircon", output=0, input="temperature", on_above=25, deadband=1.0,
+         min_on=10, min_off=10, priority=2, group="hvac"),
+    dict(name="heater", output=1, input="temperature", on_below=18, deadband=1.0,
+         min_on=10, min_off=10, priority=1, group="hvac"),
+    dict(name="dehumidifier", output=2, input="humidity", on_above=40, deadband=3.0,
+         min_on=10, min_off=10),
+]
+
+# (온도 기준, 진폭, 주기), (습도 기준, 진폭, 주기), 온도 노이즈, 습도 노이즈
+TRACES = {
+    "near_hot": ((25.0, 0.8, 1800.0), (35.0, 2.0, 3600.0), 0.6, 1.0),
+    "near_cold": ((18.0, 0.8, 1800.0), (35.0, 2.0, 3600.0), 0.6, 1.0),
+    "humid": ((21.0, 1.0, 3600.0), (40.0, 1.5, 1200.0), 0.4, 1.5),
+    "daily": ((22.0, 5.0, 600.0), (40.0, 10.0, 900.0), 0.3, 1.0),  # hal 시뮬레이터 기본값
+}
+
+
+def trace(spec, seconds, step, dht_period, seed):
+    (t0, ta, tp), (h0, ha, hp), tn, hn = spec
+    rng = random.Random(seed)
+    ft = make_filter(dict(kind="median", window=5, reject=5.0))
+    fh = make_filter(dict(kind="median", window=5, reject=15.0))
+    temp = humid = None
+    next_dht = 0.0
+    for i in range(int(seconds / step)):
+        now = i * step
+        if now >= next_dht:
+            next_dht += dht_period
+            # DHT11 은 정수 단위
+            temp = ft.update(round(t0 + ta * math.sin(2 * math.pi * now / tp) + rng.gauss(0, tn)))
+            humid = fh.update(round(h0 + ha * math.sin(2 * math.pi * now / hp) + rng.gauss(0, hn)))
+        yield now, temp, humid
+
+
+def legacy(points):
+    state = (0, 0, 0)
+    toggles = writes = 0
+    t = time.perf_counter()
+    for now, temp, humid in points:
+        leds = (
+            int(temp is not None and temp >= 25),
+            int(temp is not None and temp <= 18),
+            int(humid is not None and humid >= 40),
+        )
+        writes += 3   # 매 주기 3개 핀 모두 GPIO.output
+        toggles += sum(a != b for a, b in zip(leds, state))
+        state = leds
+    return toggles, writes, time.perf_counter() - t, None
+
+
+def engine(points):
+    eng = RuleEngine.from_config(RULES, 3)
+    toggles = writes = 0
+    t = time.perf_counter()
+    for now, temp, humid in points:
+        changes = eng.evaluate({"temperature": temp, "humidity": humid}, now)
+        writes += len(changes)
+        toggles += len(changes)
+    return toggles, writes, time.perf_counter() - t, eng.evaluations
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hours", type=float, default=24.0)
+    ap.add_argument("--step", type=float, default=0.5)
+    ap.add_argument("--dht-period", type=float, default=2.2)
+    ap.add_argument("--seed", type=int, default=1234)
+    args = ap.parse_args()
+
+    seconds = args.hours * 3600
+    print(f"{args.hours:g} h per trace, control every {args.step}s, DHT every {args.dht_period}s")
+    print(f"{'trace':>10} {'mode':>7} {'toggles':>8} {'gpio writes':>11} {'rule evals':>10} {'us/step':>8}")
+    for name, spec in TRACES.items():
+        points = list(trace(spec, seconds, args.step, args.dht_period, args.seed))
+        for mode, fn in (("legacy", legacy), ("rules", engine)):
+            toggles, writes, dt, evals = fn(points)
+            print(f"{name:>10} {mode:>7} {toggles:>8} {writes:>11} {'-' if evals is None else evals:>10} "
+                  f"{dt / len(points) * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
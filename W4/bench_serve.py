@@ -0,0 +1,110 @@
+# 서비스 모드 부하 시험: 워커 수에 따른 /status 처리량/지연 비교
+#   - 워커 수마다 serve.py web 을 새로 띄우고 클라이언트 프로세스 N개가 keep-alive 로 요청
+#   - --conditional: 클라이언트가 ETag 를 보내는 polling (대부분 304)
+#   - 워커 증가 효과는 코어 수까지만 나타남 (클라이언트 프로세스도 같은 머신의 CPU 를 씀)
+# 사용: python serve.py owner &   (또는 --start-owner)
+#       python bench_serve.py --workers 1 2 4 --clients 16 --seconds 10
+import argparse, http.client, multiprocessing as mp, os, socket, statistics, subprocess, sys, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def client(port, path, seconds, conditional, out):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    etag = None
+    n = errors = size = 0
+    lat = []
+    deadline = time.perf_counter() + seconds
+    while True:
+        t = time.perf_counter()
+        if t >= deadline:
+            break
+        try:
+            conn.request("GET", path, headers={"If-None-Match": etag} if etag else {})
+            resp = conn.getresponse()
+            size += len(resp.read())
+            if resp.status not in (200, 304):
+                errors += 1
+            elif conditional:
+                etag = resp.getheader("ETag")
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            continue
+        n += 1
+        if n % 10 == 0:
+            lat.append(time.perf_counter() - t)
+    conn.close()
+    out.put((n, errors, size, lat))
+
+
+def wait_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), 0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"port {port} did not open")
+
+
+def run(args, workers):
+    web = subprocess.Popen([sys.executable, os.path.join(HERE, "serve.py"), "web",
+                            "--workers", str(workers), "--host", "127.0.0.1", "--port", str(args.port)],
+                           stdout=subprocess.DEVNULL)
+    try:
+        wait_port(args.port)
+        time.sleep(0.5)
+        out = mp.Queue()
+        procs = [mp.Process(target=client, args=(args.port, args.path, args.seconds, args.conditional, out))
+                 for _ in range(args.clients)]
+        for p in procs:
+            p.start()
+        results = [out.get() for _ in procs]
+        for p in procs:
+            p.join()
+    finally:
+        web.terminate()
+        web.wait(10)
+        time.sleep(0.5)
+
+    n = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    size = sum(r[2] for r in results)
+    lat = sorted(x for r in results for x in r[3]) or [0.0]
+    p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+    return n / args.seconds, statistics.median(lat) * 1000, p99 * 1000, size / max(n, 1), errors
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--port", type=int, default=8090)
+    ap.add_argument("--path", default="/status")
+    ap.add_argument("--conditional", action="store_true")
+    ap.add_argument("--start-owner", action="store_true")
+    args = ap.parse_args()
+
+    owner = None
+    if args.start_owner:
+        owner = subprocess.Popen([sys.executable, os.path.join(HERE, "serve.py"), "owner"])
+        time.sleep(5)
+    try:
+        print(f"GET {args.path}, {args.clients} clients x {args.seconds:.0f}s"
+              f"{' (If-None-Match)' if args.conditional else ''}")
+        print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'bytes/req':>9} {'errors':>6}")
+        for w in args.workers:
+            rps, p50, p99, size, errors = run(args, w)
+            print(f"{w:>7} {rps:>9.0f} {p50:>8.2f} {p99:>8.2f} {size:>9.1f} {errors:>6}")
+    finally:
+        if owner is not None:
+            owner.terminate()
+            owner.wait(15)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# /status 응답 캐시 효과 측정 (Flask test client, 네트워크 제외 서버 처리량)
+#   - plain : 매 요청 jsonify (기존 방식)
+#   - cached: 버전별 직렬화 결과 재사용, If-None-Match 없음
+#   - etag  : 클라이언트가 마지막 ETag 를 보내고 바뀌지 않았으면 304
+# req/s 는 test client 오버헤드를 포함, handler us 는 라우트 함수 자체 처리 시간
+# 여러 클라이언트가 2초마다 polling 하고 상태는 change_every 요청마다 한 번 바뀌는 상황을 흉내냄
+# 사용: IOT_BACKEND=sim python bench_status.py --requests 20000 --clients 5 --change-every 10
+import argparse, time
+
+from flask import jsonify
+
+import W4_shin as node
+
+
+def plain_status():
+    return jsonify(node.status_payload(node.store.snapshot()))
+
+
+handler_time = [0.0]
+
+
+def timed(view):
+    def wrapper(*args, **kwargs):
+        t = time.perf_counter()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            handler_time[0] += time.perf_counter() - t
+    return wrapper
+
+
+def run(client, path, n, clients, change_every, conditional):
+    etags = [None] * clients
+    sent = 0
+    not_modified = 0
+    handler_time[0] = 0.0
+    t0 = time.perf_counter()
+    for i in range(n):
+        if change_every and i % change_every == 0:
+            node.store.update(temperature=20 + i % 97 / 10)
+        c = i % clients
+        headers = {"If-None-Match": etags[c]} if conditional and etags[c] else {}
+        resp = client.get(path, headers=headers)
+        sent += len(resp.get_data())
+        if resp.status_code == 304:
+            not_modified += 1
+        if conditional:
+            etags[c] = resp.headers.get("ETag")
+    dt = time.perf_counter() - t0
+    return n / dt, handler_time[0] / n * 1e6, sent / n, not_modified / n
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=20000)
+    ap.add_argument("--clients", type=int, default=5)
+    ap.add_argument("--change-every", type=int, default=10)
+    args = ap.parse_args()
+
+    node.app.add_url_rule("/_bench/status_plain", "bench_status_plain", timed(plain_status))
+    node.app.view_functions["status"] = timed(node.app.view_functions["status"])
+    node.store.update(temperature=21.0, humidity=45.0, distance=80.0,
+                      raw_temp=21.0, raw_humid=45.0, raw_dist=80.0)
+    client = node.app.test_client()
+
+    print(f"{args.requests} requests, {args.clients} clients, state change every {args.change_every} requests")
+    print(f"{'mode':>8} {'req/s':>10} {'handler us':>10} {'bytes/req':>10} {'304 %':>7}")
+    for mode, path, cond in (("plain", "/_bench/status_plain", False),
+                             ("cached", "/status", False),
+                             ("etag", "/status", True)):
+        rps, us, size, nm = run(client, path, args.requests, args.clients, args.change_every, cond)
+        print(f"{mode:>8} {rps:>10.0f} {us:>10.1f} {size:>10.1f} {nm * 100:>6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# 터치 → 모드 전환 지연 / 대기 중 CPU 사용 비교 (sim 백엔드)
+#   - poll : 기존 touch_loop 방식 (50ms 마다 GPIO.input)
+#   - edge : buttons.Button (엣지 인터럽트 + debounce)
+#   누를 때마다 채터링(수 ms 안의 추가 엣지)을 섞고, 누르는 시점은 폴링 주기와 무관하게 무작위
+#   sim 에서는 엣지 콜백이 누른 스레드에서 바로 호출되므로, 실제 RPi.GPIO 의 콜백 스레드 지연(~0.1ms)은 빠져 있음
+# 사용: python bench_touch.py --presses 50 --idle 10
+import os
+os.environ.setdefault("IOT_BACKEND", "sim")
+
+import argparse, random, statistics, threading, time
+
+from hal import GPIO, clock, sim
+from buttons import Button
+
+TOUCH_PIN = 6
+
+
+def press(rng, hold=0.15, bounces=3):
+    # 채터링 포함 누름 → 뗌
+    g = sim.gpio
+    t0 = time.perf_counter_ns()
+    g._set_input(TOUCH_PIN, g.LOW)
+    for _ in range(bounces):
+        time.sleep(rng.uniform(0.0005, 0.002))
+        g._set_input(TOUCH_PIN, g.HIGH)
+        g._set_input(TOUCH_PIN, g.LOW)
+    time.sleep(hold)
+    g._set_input(TOUCH_PIN, g.HIGH)
+    return t0
+
+
+def run(mode, presses, idle, seed):
+    rng = random.Random(seed)
+    flips = []
+    flipped = threading.Event()
+
+    def flip(*a):
+        flips.append(time.perf_counter_ns())
+        flipped.set()
+
+    stop = threading.Event()
+    if mode == "poll":
+        def touch_loop():
+            prev = GPIO.input(TOUCH_PIN)
+            while not stop.is_set():
+                curr = GPIO.input(TOUCH_PIN)
+                if prev == 1 and curr == 0:
+                    flip()
+                prev = curr
+                clock.sleep(0.05)
+        threading.Thread(target=touch_loop, daemon=True).start()
+        btn = None
+    else:
+        btn = Button(GPIO, TOUCH_PIN, clock, active_low=True, debounce=0.03)
+        btn.on("press", flip)
+        btn.start()
+
+    # 대기 중 CPU 사용 (프로세스 전체 CPU 시간)
+    cpu0 = time.process_time()
+    time.sleep(idle)
+    idle_cpu = (time.process_time() - cpu0) / idle * 100
+
+    lat = []
+    extra = 0
+    for _ in range(presses):
+        time.sleep(rng.uniform(0.05, 0.2))
+        flipped.clear()
+        n = len(flips)
+        t0 = press(rng)
+        if flipped.wait(1.0):
+            lat.append((flips[n] - t0) / 1e6)
+        extra += max(0, len(flips) - n - 1)   # 한 번 눌렀는데 여러 번 전환
+        time.sleep(0.1)
+
+    stop.set()
+    if btn is not None:
+        btn.stop()
+    return lat, extra, idle_cpu, (btn.stats() if btn else None)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--presses", type=int, default=50)
+    ap.add_argument("--idle", type=float, default=10.0)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(TOUCH_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    print(f"{args.presses} presses (3 bounce edges each), idle CPU over {args.idle:g}s")
+    print(f"{'mode':>5} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'missed':>6} {'extra':>5} {'idle CPU %':>10}")
+    for mode in ("poll", "edge"):
+        lat, extra, cpu, stats = run(mode, args.presses, args.idle, args.seed)
+        lat.sort()
+        missed = args.presses - len(lat)
+        lat = lat or [float("nan")]
+        p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+        print(f"{mode:>5} {statistics.median(lat):>8.3f} {p99:>8.3f} {lat[-1]:>8.3f} {missed:>6} {extra:>5} {cpu:>10.3f}")
+        if stats:
+            print(f"      button stats: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# 응답 인코딩 비교: JSON vs 열 형식 바이너리(application/vnd.iot.columnar) vs MessagePack
+#   1) /history_data, /status 를 Flask test client 로 요청 (응답 캐시 없이 매번 직렬화)
+#      - bytes: 본문 크기, gzip: 모바일 프록시/nginx gzip 을 거친다고 했을 때 크기
+#      - us   : 요청 1건 처리 시간 (test client 오버헤드 포함)
+#   2) 긴 구간(--rows) 직렬화만 따로: 기존 JSON 루프(dict + strftime) vs wire.pack_history
+# 사용: IOT_BACKEND=sim python bench_wire.py --requests 2000 --rows 100000
+import argparse, gzip, json, random, time
+from array import array
+
+import W4_shin as node
+import wire
+
+TYPES = [("json", wire.JSON), ("columnar", wire.COLUMNAR)] + ([("msgpack", wire.MSGPACK)] if wire.msgpack else [])
+
+
+def fill_history(n):
+    now = time.time()
+    rnd = random.Random(1)
+    for i in range(n):
+        node.history_cache.append(now - (n - i) * 3.0, temp=round(rnd.uniform(18, 30), 1),
+                                  humid=round(rnd.uniform(30, 60), 1),
+                                  dist=None if i % 50 == 0 else round(rnd.uniform(5, 200), 1))
+
+
+def bench_route(client, path, requests):
+    print(f"\n{path}")
+    print(f"{'encoding':>10} {'bytes':>8} {'gzip':>8} {'us/req':>8}")
+    for name, mimetype in TYPES:
+        if path == "/status" and mimetype not in wire.STATUS_TYPES:
+            continue
+        headers = {"Accept": mimetype}
+        body = client.get(path, headers=headers).get_data()
+        t0 = time.perf_counter()
+        for _ in range(requests):
+            node._history_bodies.clear()
+            node.local_device.status_cache.clear()
+            client.get(path, headers=headers)
+        us = (time.perf_counter() - t0) / requests * 1e6
+        print(f"{name:>10} {len(body):>8} {len(gzip.compress(body)):>8} {us:>8.1f}")
+
+
+def json_loop(ts, vals):
+    # 기존 /history_data JSON 경로와 같은 방식
+    return json.dumps([
+        {"dt": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)), "value": None if v != v else v}
+        for t, v in zip(ts, vals)
+    ], ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def bench_encode(rows, repeat):
+    now = time.time()
+    rnd = random.Random(2)
+    ts = array("d", (now - i * 3.0 for i in range(rows)))
+    vals = array("d", (rnd.uniform(18, 30) for _ in range(rows)))
+    print(f"\nserialize only, {rows} rows")
+    print(f"{'encoding':>10} {'bytes':>10} {'B/row':>6} {'ms':>8} {'x faster':>9}")
+    base = None
+    for name, fn in [("json", lambda: json_loop(ts, vals))] + [
+            (name, lambda m=m: wire.pack_history(m, "temp", ts, vals)) for name, m in TYPES[1:]]:
+        body = fn()
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        ms = (time.perf_counter() - t0) / repeat * 1000
+        base = base or ms
+        print(f"{name:>10} {len(body):>10} {len(body) / rows:>6.1f} {ms:>8.2f} {base / ms:>9.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    fill_history(node.history_cache.capacity)
+    node.store.update(temperature=23.4, humidity=41.0, distance=120.5)
+    client = node.app.test_client()
+    bench_route(client, "/status", args.requests)
+    for n in (10, 100, node.history_cache.capacity):
+        bench_route(client, f"/history_data/temp?n={n}", args.requests)
+    bench_encode(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
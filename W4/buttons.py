@@ -0,0 +1,157 @@
+import logging, threading
+from collections import namedtuple
+
+log = logging.getLogger(__name__)
+
+# =========================
+# 버튼/터치 입력 - 엣지 인터럽트 방식 (폴링 스레드 없음)
+# =========================
+# 이벤트 종류
+#   press   : 눌림 (debounce 후 첫 엣지에서 바로 발생 → 지연 최소)
+#   release : 뗌
+#   click   : 짧게 눌렀다 뗌 (long 이 아니었을 때)
+#   double  : double_tap 초 안에 두 번째 click (click 도 함께 발생)
+#   long    : long_press 초 이상 누르고 있음 (누르는 중에 발생)
+ButtonEvent = namedtuple("ButtonEvent", "kind pin t_ns held")
+
+
+class Button:
+    """GPIO.add_event_detect 로 엣지를 받아 소프트웨어 debounce 후 이벤트로 변환.
+
+    - debounce: 마지막으로 인정한 엣지 이후 이 시간(초) 안의 엣지는 채터링으로 보고,
+      구간이 끝날 때 핀 레벨을 한 번 더 읽어 최종 상태만 반영
+    - 전달: on(kind, fn) 콜백 (GPIO 스레드에서 호출) 또는 subscribe(asyncio 큐, 루프)
+    - 누르고 있지 않을 때는 타이머/스레드가 없음 → CPU 사용 없음
+    """
+
+    def __init__(self, gpio, pin, clock, active_low=True, debounce=0.03,
+                 long_press=1.0, double_tap=0.4):
+        self.gpio = gpio
+        self.pin = pin
+        self.clock = clock
+        self.active_low = active_low
+        self.debounce = debounce
+        self.long_press = long_press
+        self.double_tap = double_tap
+
+        self._lock = threading.Lock()
+        self._handlers = {}
+        self._queues = []
+        self._pressed = False
+        self._last_edge_ns = None
+        self._press_ns = 0
+        self._last_click_ns = None
+        self._settle_timer = None
+        self._long_timer = None
+        self._started = False
+
+        self.edges = 0
+        self.bounces = 0
+        self.counts = dict(press=0, release=0, click=0, double=0, long=0)
+
+    # ---- 구독 ----
+    def on(self, kind, fn):
+        self._handlers.setdefault(kind, []).append(fn)
+        return fn
+
+    def subscribe(self, queue, loop):
+        """asyncio.Queue 로 모든 이벤트 전달 (GPIO 스레드 → 이벤트 루프)"""
+        self._queues.append((queue, loop))
+
+    def start(self):
+        if not self._started:
+            self._pressed = self._read()
+            self.gpio.add_event_detect(self.pin, self.gpio.BOTH, callback=self._on_edge)
+            self._started = True
+        return self
+
+    def stop(self):
+        if self._started:
+            self.gpio.remove_event_detect(self.pin)
+            self._started = False
+        with self._lock:
+            for t in (self._settle_timer, self._long_timer):
+                if t is not None:
+                    t.cancel()
+            self._settle_timer = self._long_timer = None
+
+    # ---- 엣지 처리 (GPIO 스레드) ----
+    def _read(self):
+        level = self.gpio.input(self.pin)
+        return (level == self.gpio.LOW) if self.active_low else (level == self.gpio.HIGH)
+
+    def _timer(self, seconds, fn):
+        t = threading.Timer(max(seconds, 0.0) / self.clock.speed, fn)
+        t.daemon = True
+        t.start()
+        return t
+
+    def _on_edge(self, channel):
+        now = self.clock.perf_counter_ns()
+        with self._lock:
+            self.edges += 1
+            last = self._last_edge_ns
+            if last is not None and now - last < self.debounce * 1e9:
+                self.bounces += 1
+                if self._settle_timer is None:
+                    self._settle_timer = self._timer(self.debounce - (now - last) / 1e9, self._settle)
+                return
+            self._last_edge_ns = now
+        self._apply(self._read(), now)
+
+    def _settle(self):
+        with self._lock:
+            self._settle_timer = None
+        self._apply(self._read(), self.clock.perf_counter_ns())
+
+    def _apply(self, pressed, now):
+        events = []
+        with self._lock:
+            if pressed == self._pressed:
+                return
+            self._pressed = pressed
+            if pressed:
+                self._press_ns = now
+                events.append(ButtonEvent("press", self.pin, now, 0.0))
+                if self.long_press:
+                    self._long_timer = self._timer(self.long_press, lambda: self._long(now))
+            else:
+                held = (now - self._press_ns) / 1e9
+                if self._long_timer is not None:
+                    self._long_timer.cancel()
+                    self._long_timer = None
+                events.append(ButtonEvent("release", self.pin, now, held))
+                if not self.long_press or held < self.long_press:
+                    events.append(ButtonEvent("click", self.pin, now, held))
+                    last = self._last_click_ns
+                    if self.double_tap and last is not None and now - last <= self.double_tap * 1e9:
+                        events.append(ButtonEvent("double", self.pin, now, held))
+                        self._last_click_ns = None
+                    else:
+                        self._last_click_ns = now
+        for ev in events:
+            self._emit(ev)
+
+    def _long(self, press_ns):
+        with self._lock:
+            self._long_timer = None
+            if not self._pressed or self._press_ns != press_ns:
+                return
+            now = self.clock.perf_counter_ns()
+        self._emit(ButtonEvent("long", self.pin, now, (now - press_ns) / 1e9))
+
+    def _emit(self, ev):
+        self.counts[ev.kind] += 1
+        for fn in self._handlers.get(ev.kind, ()):
+            try:
+                fn(ev)
+            except Exception:
+                log.exception("button %s handler failed", ev.kind)
+        for queue, loop in self._queues:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, ev)
+            except RuntimeError:  # 루프 종료 후
+                pass
+
+    def stats(self):
+        return dict(pressed=self._pressed, edges=self.edges, bounces=self.bounces, **self.counts)
@@ -0,0 +1,112 @@
+import time
+
+try:
+    import numpy as np
+except ImportError:       # 없으면 W4_shin 은 기존 행 단위 경로 사용
+    np = None
+
+from downsample import METRIC_COLUMNS
+
+# =========================
+# 히스토리 열 단위 조회/직렬화 (NumPy)
+# =========================
+# - 요청한 메트릭 열 하나만 SELECT (UNIX_TIMESTAMP, DOUBLE) → 튜플 커서 결과를 한 번에 배열로
+#   ts: int64 epoch 초, values: float32 (NULL = NaN)
+# - JSON 도 행마다 dict/strftime 없이 고정 폭 바이트 행렬로 한 번에 생성
+#   [{"dt":"2026-10-18 12:34:56","value":  23.40},...]  ← 값 앞 공백은 JSON 에서 허용되는 공백
+#   값은 소수 둘째 자리 (sensor_log 의 DECIMAL(·,2) 와 같음), 값 없음은 null
+
+
+def last_n_sql(metric):
+    col = metric if metric in METRIC_COLUMNS else "dist"
+    return (f"SELECT UNIX_TIMESTAMP(dt), CAST({col} AS DOUBLE) FROM sensor_log "
+            "WHERE device_id = %s ORDER BY dt DESC, id DESC LIMIT %s")
+
+
+def from_rows(rows):
+    """[(ts, value), ...] → (int64 ts, float32 values). None → NaN"""
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, np.float32)
+    a = np.array(rows, dtype=np.float64)
+    return a[:, 0].astype(np.int64), a[:, 1].astype(np.float32)
+
+
+def _digits(x, width):
+    """0 이상 정수 배열 → (n, width) ASCII 숫자 (앞자리 0 채움)"""
+    out = np.empty((len(x), width), np.uint8)
+    for i in range(width - 1, -1, -1):
+        out[:, i] = x % 10 + 48
+        x = x // 10
+    return out
+
+
+def _local_offset(ts):
+    # 구간 양 끝의 UTC 오프셋이 같으면 상수 (한국은 서머타임 없음), 다르면 행마다
+    first, last = (time.localtime(int(t)).tm_gmtoff for t in (ts[0], ts[-1]))
+    if first == last:
+        return first
+    return np.array([time.localtime(int(t)).tm_gmtoff for t in ts], np.int64)
+
+
+def _dt_field(ts):
+    """epoch 초 → (n, 19) 'YYYY-mm-dd HH:MM:SS' (로컬 시각)"""
+    local = ts + _local_offset(ts)
+    days, sod = np.divmod(local, 86400)
+    uniq, inv = np.unique(days, return_inverse=True)     # 날짜 문자열은 서로 다른 날짜 수만큼만
+    dates = np.frombuffer(np.datetime_as_string(uniq.astype("datetime64[D]")).astype("S10").tobytes(),
+                          np.uint8).reshape(-1, 10)
+    out = np.empty((len(ts), 19), np.uint8)
+    out[:, :10] = dates[inv.reshape(-1)]
+    out[:, 10] = ord(" ")
+    out[:, 11:13] = _digits(sod // 3600, 2)
+    out[:, 13] = ord(":")
+    out[:, 14:16] = _digits(sod // 60 % 60, 2)
+    out[:, 16] = ord(":")
+    out[:, 17:19] = _digits(sod % 60, 2)
+    return out
+
+
+def _value_field(values):
+    """float 배열 → (n, w) 오른쪽 정렬 '-12.34' / 'null' (앞은 공백)"""
+    missing = np.isnan(values)
+    cents = np.rint(np.where(missing, 0, values).astype(np.float64) * 100).astype(np.int64)
+    neg = cents < 0
+    ip, fp = np.divmod(np.abs(cents), 100)
+    iw = len(str(int(ip.max()))) if len(ip) else 1
+    ndig = np.maximum(1, np.floor(np.log10(np.maximum(ip, 1))).astype(np.int64) + 1)
+    w = max(iw + 4, 4)                                     # 부호 + 정수부 + '.' + 소수 2자리
+    out = np.full((len(values), w), ord(" "), np.uint8)
+    digits = _digits(ip, iw)
+    col = np.arange(iw)
+    lead = col[None, :] < (iw - ndig)[:, None]             # 앞자리 0 → 공백
+    out[:, w - 3 - iw:w - 3] = np.where(lead, ord(" "), digits)
+    sign_at = w - 3 - ndig - 1
+    rows = np.nonzero(neg)[0]
+    out[rows, sign_at[rows]] = ord("-")
+    out[:, w - 3] = ord(".")
+    out[:, w - 2:] = _digits(fp, 2)
+    out[missing] = np.frombuffer(b"null".rjust(w), np.uint8)
+    return out
+
+
+if np is not None:      # NumPy 없이도 import 는 되어야 함 (W4_shin 이 np 여부로 경로 선택)
+    _HEAD = np.frombuffer(b'{"dt":"', np.uint8)
+    _MID = np.frombuffer(b'","value":', np.uint8)
+    _TAIL = np.frombuffer(b"},", np.uint8)
+
+
+def to_json(ts, values):
+    """(ts, values) → 기존 /history_data 와 같은 구조의 JSON bytes (순서 그대로)"""
+    n = len(ts)
+    if n == 0:
+        return b"[]"
+    dt = _dt_field(np.asarray(ts, np.int64))
+    val = _value_field(np.asarray(values, np.float32))
+    parts = (_HEAD, dt, _MID, val, _TAIL)
+    width = sum(p.shape[-1] for p in parts)
+    out = np.empty((n, width), np.uint8)
+    at = 0
+    for p in parts:
+        out[:, at:at + p.shape[-1]] = p
+        at += p.shape[-1]
+    return b"[" + out.tobytes()[:-1] + b"]"
@@ -0,0 +1,226 @@
+import asyncio, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import mariadb
+
+# =========================
+# 공용 MariaDB 커넥션 풀
+# =========================
+
+
+class PoolTimeout(Exception):
+    """acquire_timeout 안에 커넥션을 얻지 못함"""
+
+
+class ConnectionPool:
+    """스레드 안전 커넥션 풀 (Flask 라우트 + 센서 스레드 공용).
+
+    - max_size 개까지만 커넥션 생성, 모두 사용 중이면 acquire_timeout 동안 대기
+    - ping_interval 초 이상 쉬었던 커넥션은 ping 으로 상태 확인 후 재사용
+    - max_lifetime 초가 지난 커넥션은 반납 시 닫고 새로 만듦
+    - 반납 시 rollback 으로 열린 트랜잭션(오래된 스냅샷) 정리
+    """
+
+    def __init__(self, config, max_size=5, acquire_timeout=5.0,
+                 ping_interval=30.0, max_lifetime=3600.0, connect=None):
+        self.config = dict(config)
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.ping_interval = ping_interval
+        self.max_lifetime = max_lifetime
+        self._connect = connect or (lambda: mariadb.connect(**self.config))
+
+        self._cond = threading.Condition()
+        self._idle = deque()     # (conn, created, last_used)
+        self._created_at = {}    # id(conn) -> 생성 시각 (사용 중인 커넥션 포함)
+        self._size = 0
+        self._closed = False
+
+        self.acquires = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+        self.created = 0
+        self.discarded = 0
+        self.health_failures = 0
+
+    # ---- 획득/반납 ----
+    def acquire(self, timeout=None):
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeout("pool closed")
+                if self._idle:
+                    conn, created, last_used = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(f"no connection within {timeout}s "
+                                          f"(max_size={self.max_size})")
+                    if not waited:
+                        waited = True
+                        self.waits += 1
+                    t = time.monotonic()
+                    self._cond.wait(remaining)
+                    self.wait_time += time.monotonic() - t
+                    continue
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    self._forget(None)
+                    raise
+                with self._cond:
+                    self.created += 1
+                    self.acquires += 1
+                    self._created_at[id(conn)] = time.monotonic()
+                return conn
+
+            # 오래 쉬었던 커넥션은 상태 확인
+            if time.monotonic() - last_used >= self.ping_interval and not self._ping(conn):
+                with self._cond:
+                    self.health_failures += 1
+                self._discard(conn)
+                continue
+            with self._cond:
+                self.acquires += 1
+                self._created_at[id(conn)] = created
+            return conn
+
+    def release(self, conn, broken=False):
+        if not broken:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+        with self._cond:
+            created = self._created_at.get(id(conn), 0.0)
+            expired = time.monotonic() - created >= self.max_lifetime
+            if broken or expired or self._closed:
+                keep = False
+            else:
+                keep = True
+                self._idle.append((conn, created, time.monotonic()))
+                self._cond.notify()
+        if not keep:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """with pool.connection() as conn: ... (예외 시 상태 확인 후 반납)"""
+        conn = self.acquire(timeout)
+        broken = False
+        try:
+            yield conn
+        except mariadb.Error:
+            broken = not self._ping(conn)
+            raise
+        finally:
+            self.release(conn, broken=broken)
+
+    # ---- 내부 ----
+    @staticmethod
+    def _ping(conn):
+        try:
+            conn.ping()
+            return True
+        except Exception:
+            return False
+
+    def _forget(self, conn):
+        with self._cond:
+            self._size -= 1
+            if conn is not None:
+                self._created_at.pop(id(conn), None)
+            self._cond.notify()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self.discarded += 1
+        self._forget(conn)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    # ---- 지표 ----
+    def metrics(self):
+        with self._cond:
+            return dict(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._size - len(self._idle),
+                max_size=self.max_size,
+                acquires=self.acquires,
+                waits=self.waits,
+                wait_time=round(self.wait_time, 4),
+                timeouts=self.timeouts,
+                created=self.created,
+                discarded=self.discarded,
+                health_failures=self.health_failures,
+            )
+
+
+class AsyncPool:
+    """asyncio 용 래퍼. 블로킹 DB 작업을 풀 크기만큼의 전용 스레드에서 실행.
+
+    await apool.run(fn, *args)  → fn(conn, *args) (커넥션 자동 반납)
+    await apool.call(fn, *args) → fn(*args) (fn 이 직접 풀을 쓰는 기존 헬퍼용)
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._executor = ThreadPoolExecutor(pool.max_size, thread_name_prefix="db")
+
+    async def run(self, fn, *args):
+        return await self.call(self._with_conn, fn, args)
+
+    async def call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _with_conn(self, fn, args):
+        with self.pool.connection() as conn:
+            return fn(conn, *args)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+# ---- 설정별 공용 풀 (W4_shin.py, gateway.py, bench_*.py 공용) ----
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(config, **kwargs):
+    """config 별 공용 풀. 이미 있는 풀과 다른 옵션(max_size 등)을 주면 ValueError (조용히 무시하지 않음)"""
+    key = tuple(sorted(config.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = _pools[key] = ConnectionPool(config, **kwargs)
+            return pool
+        conflicts = {k: v for k, v in kwargs.items()
+                     if getattr(pool, "_connect" if k == "connect" else k) != v}
+        if conflicts:
+            raise ValueError(f"pool for {config.get('host')}/{config.get('database')} already exists "
+                             f"with different options: {sorted(conflicts)}")
+        return pool
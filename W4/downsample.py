@@ -0,0 +1,100 @@
+import math
+import time
+from datetime import datetime
+
+# =========================
+# 기간 조회 + 다운샘플링 도우미
+# =========================
+METRIC_COLUMNS = ("temp", "humid", "dist")
+METHODS = ("avg", "minmax", "lttb")
+MAX_EPOCH = 253402214400     # 9999-12-31 (UTC) - 이보다 크면 datetime 변환이 OverflowError/OSError
+
+
+def parse_time(s, default=None):
+    """epoch 초 / 'YYYY-mm-dd HH:MM:SS' / ISO 문자열 → datetime.
+
+    해석할 수 없거나 1970-01-01 ~ 9999-12-31 밖이면 (inf, nan, 1e20 포함) ValueError → 400
+    """
+    if s is None or s == "":
+        return default
+    try:
+        ts = float(s)
+    except ValueError:
+        ts = None
+    try:
+        if ts is None:
+            dt = datetime.fromisoformat(s.replace("T", " ").replace("Z", ""))
+            ts = dt.timestamp()
+        else:
+            dt = None
+        if not 0 <= ts < MAX_EPOCH:      # nan 도 여기서 걸림
+            raise ValueError
+        return dt or datetime.fromtimestamp(ts)
+    except (ValueError, OverflowError, OSError):
+        raise ValueError(f"invalid time: {s!r}") from None
+
+
+def bucket_seconds(start, end, max_points):
+    """구간을 max_points 개 이하 버킷으로 나누는 버킷 크기(초, 최소 1)"""
+    span = max((end - start).total_seconds(), 1.0)
+    return max(1, math.ceil(span / max(1, max_points)))
+
+
+def lttb(points, threshold):
+    """Largest-Triangle-Three-Buckets. points=[(ts, value), ...] (ts 오름차순)
+
+    value 가 None 인 점은 제외. 결과는 threshold 개 이하.
+    """
+    data = [(t, v) for t, v in points if v is not None]
+    n = len(data)
+    if threshold >= n or threshold < 3:
+        return data
+
+    out = [data[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # 다음 버킷 평균점
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        cnt = avg_end - avg_start
+        avg_t = sum(data[j][0] for j in range(avg_start, avg_end)) / cnt
+        avg_v = sum(data[j][1] for j in range(avg_start, avg_end)) / cnt
+
+        # 현재 버킷에서 삼각형 넓이 최대인 점 선택
+        rng_start = int(i * every) + 1
+        rng_end = int((i + 1) * every) + 1
+        at, av = data[a]
+        best, best_area = rng_start, -1.0
+        for j in range(rng_start, rng_end):
+            t, v = data[j]
+            area = abs((at - avg_t) * (v - av) - (at - t) * (avg_v - av))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(data[best])
+        a = best
+    out.append(data[-1])
+    return out
+
+
+def bucketize(points, bucket_sec):
+    """[(ts, value), ...] (ts 오름차순) → [(버킷 시작 ts, min, max, avg, count), ...]
+
+    range_bucket_query 결과와 같은 모양 (DB 없이 링버퍼로 응답할 때). count 는 값이 있는 점 수
+    """
+    out = []
+    for ts, v in points:
+        b = int(ts // bucket_sec) * bucket_sec
+        if not out or out[-1][0] != b:
+            out.append([b, None, None, 0.0, 0])
+        if v is not None:
+            cur = out[-1]
+            cur[1] = v if cur[1] is None else min(cur[1], v)
+            cur[2] = v if cur[2] is None else max(cur[2], v)
+            cur[3] += v
+            cur[4] += 1
+    return [(b, lo, hi, s / n if n else None, n) for b, lo, hi, s, n in out]
+
+
+def fmt_ts(ts):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
@@ -0,0 +1,143 @@
+from array import array
+
+# =========================
+# 스트리밍 필터 (센서값 1개씩 입력 → 필터값 출력)
+# =========================
+# 모든 필터: update(x) -> 필터값 (x 가 None 이면 현재값 유지), value, reset()
+
+
+class RollingMedian:
+    """window 크기 이동 중앙값 + 이상치 제거.
+
+    reject 가 주어지면 |x - 현재 중앙값| > reject 인 값은 버림 (rejected 집계).
+    단, max_reject 번 연속으로 버려지면 실제 변화로 보고 창을 새로 시작.
+    """
+
+    def __init__(self, window=5, reject=None, max_reject=3):
+        self.window = window
+        self.reject = reject
+        self.max_reject = max_reject
+        self._buf = array("d", [0.0]) * window
+        self._pos = 0
+        self._count = 0
+        self._streak = 0
+        self.value = None
+        self.rejected = 0
+
+    def reset(self):
+        self._pos = self._count = self._streak = 0
+        self.value = None
+
+    def update(self, x):
+        if x is None:
+            return self.value
+        x = float(x)
+        if self.reject is not None and self.value is not None and abs(x - self.value) > self.reject:
+            self._streak += 1
+            self.rejected += 1
+            if self._streak < self.max_reject:
+                return self.value
+            self._pos = self._count = 0
+        self._streak = 0
+        self._buf[self._pos] = x
+        self._pos = (self._pos + 1) % self.window
+        if self._count < self.window:
+            self._count += 1
+        s = sorted(self._buf[:self._count])
+        mid = self._count // 2
+        self.value = s[mid] if self._count % 2 else (s[mid - 1] + s[mid]) / 2
+        return self.value
+
+
+class EMA:
+    """지수 이동 평균. alpha 가 클수록 최근값 비중이 큼"""
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.value = None
+
+    def reset(self):
+        self.value = None
+
+    def update(self, x):
+        if x is None:
+            return self.value
+        x = float(x)
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class Kalman1D:
+    """1차원 칼만 필터 (상수 모델). q=공정 잡음, r=측정 잡음, gate=이상치 게이트(표준편차 배수)"""
+
+    def __init__(self, q=0.01, r=1.0, gate=None):
+        self.q = q
+        self.r = r
+        self.gate = gate
+        self.value = None
+        self.p = 1.0
+        self.rejected = 0
+
+    def reset(self):
+        self.value = None
+        self.p = 1.0
+
+    def update(self, x):
+        if x is None:
+            return self.value
+        x = float(x)
+        if self.value is None:
+            self.value = x
+            return x
+        p = self.p + self.q
+        if self.gate is not None and (x - self.value) ** 2 > self.gate ** 2 * (p + self.r):
+            self.rejected += 1
+            self.p = p
+            return self.value
+        k = p / (p + self.r)
+        self.value += k * (x - self.value)
+        self.p = (1 - k) * p
+        return self.value
+
+
+class Chain:
+    """여러 필터를 순서대로 적용 (예: 중앙값 → EMA)"""
+
+    def __init__(self, *filters):
+        self.filters = filters
+        self.value = None
+
+    def reset(self):
+        for f in self.filters:
+            f.reset()
+        self.value = None
+
+    def update(self, x):
+        for f in self.filters:
+            x = f.update(x)
+        self.value = x
+        return x
+
+    @property
+    def rejected(self):
+        return sum(getattr(f, "rejected", 0) for f in self.filters)
+
+
+def make_filter(spec):
+    """설정 dict → 필터. 예) dict(kind="median", window=5, reject=30, alpha=0.5)
+
+    kind: median | ema | kalman | none. median 에 alpha 를 주면 뒤에 EMA 를 연결.
+    """
+    spec = dict(spec or {})
+    kind = spec.pop("kind", "median")
+    alpha = spec.pop("alpha", None)
+    if kind == "median":
+        f = RollingMedian(**spec)
+        return Chain(f, EMA(alpha)) if alpha is not None else f
+    if kind == "ema":
+        return EMA(alpha if alpha is not None else 0.3)
+    if kind == "kalman":
+        return Kalman1D(**spec)
+    if kind == "none":
+        return EMA(1.0)
+    raise ValueError(f"unknown filter kind: {kind}")
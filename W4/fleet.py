@@ -0,0 +1,263 @@
+import json, logging, threading, time
+
+from ring_buffer import HistoryCache
+from state_store import StateStore
+
+log = logging.getLogger(__name__)
+
+# =========================
+# 여러 장치(방마다 컨트롤러 1대) 상태 - 장치별 메모리 상태/캐시 + 전체 요약
+# =========================
+# - sensor_log.device_id 로 장치 구분, (device_id, dt) 인덱스로 장치별 최근값/기간 조회
+# - 이 프로세스가 직접 제어하는 장치(local)는 W4_shin 의 store/history_cache 를 그대로 등록
+# - 다른 장치는 FleetPoller 가 sensor_log 의 새 행(id > 워터마크)을 한 번의 쿼리로 읽어 갱신
+#   → /fleet 은 장치 수와 관계없이 메모리에서 응답 (장치마다 DB 조회 없음)
+DEVICE_ID_MAX = 32
+
+DEVICE_COLUMN_SQL = ("ALTER TABLE sensor_log ADD COLUMN IF NOT EXISTS "
+                     "device_id VARCHAR(32) NOT NULL DEFAULT 'default' AFTER id")
+DEVICE_INDEX_SQL = "CREATE INDEX IF NOT EXISTS idx_sensor_log_device_dt ON sensor_log (device_id, dt)"
+_POLL_COLUMNS = "id, device_id, UNIX_TIMESTAMP(dt), temp, humid, dist"
+
+
+def ensure_tables(cur):
+    # 장치 구분 이전 테이블은 기존 행을 'default' 장치로 둠
+    cur.execute(DEVICE_COLUMN_SQL)
+    cur.execute(DEVICE_INDEX_SQL)
+
+
+def valid_device_id(device_id):
+    return (0 < len(device_id) <= DEVICE_ID_MAX
+            and all(c.isalnum() or c in "-_." for c in device_id))
+
+
+class DeviceState:
+    """장치 1대의 메모리 상태 (store: 최신값 스냅샷, history: 최근값 링버퍼)"""
+
+    def __init__(self, device_id, store, history, local=False):
+        self.device_id = device_id
+        self.store = store
+        self.history = history
+        self.local = local
+        self.last_seen = time.time() if local else None
+        self.status_cache = {}            # 인코딩 → (ETag, 본문 bytes)
+
+
+class Fleet:
+    """device_id → DeviceState. 원격 장치는 처음 행이 보일 때 자동 등록"""
+
+    def __init__(self, history_capacity=200, offline_after=60.0):
+        self.history_capacity = history_capacity
+        self.offline_after = offline_after
+        self._devices = {}
+        self._lock = threading.Lock()
+        self.version = 0                      # 장치 추가/값 갱신마다 증가
+        self._summary = (None, b"")           # ((version, 5초 단위 시각), JSON bytes)
+
+    def __len__(self):
+        return len(self._devices)
+
+    def __contains__(self, device_id):
+        return device_id in self._devices
+
+    def get(self, device_id):
+        return self._devices.get(device_id)
+
+    def devices(self):
+        return list(self._devices.values())
+
+    def add_local(self, device_id, store, history):
+        with self._lock:
+            dev = self._devices[device_id] = DeviceState(device_id, store, history, local=True)
+            self.version += 1
+        return dev
+
+    def _remote(self, device_id):
+        dev = self._devices.get(device_id)
+        if dev is None:
+            with self._lock:
+                dev = self._devices.get(device_id)
+                if dev is None:
+                    store = StateStore(temperature=None, humidity=None, distance=None,
+                                       led_status=None, auto_mode=None)
+                    dev = self._devices[device_id] = DeviceState(
+                        device_id, store, HistoryCache(self.history_capacity))
+        return dev
+
+    def observe(self, device_id, ts, temp, humid, dist):
+        """원격 장치 행 1개 반영 (로컬 장치 행은 무시 - 로컬 상태가 더 최신)"""
+        dev = self._remote(device_id)
+        if dev.local:
+            return
+        dev.history.append(ts, temp=temp, humid=humid, dist=dist)
+        if dev.last_seen is None or ts >= dev.last_seen:
+            dev.last_seen = ts
+            dev.store.update(temperature=temp, humidity=humid, distance=dist)
+        self.version += 1
+
+    # ---- 전체 요약 (/fleet) ----
+    def summary(self, now=None):
+        now = time.time() if now is None else now
+        devices = []
+        online = 0
+        temps = []
+        alerts = []
+        for dev in sorted(self.devices(), key=lambda d: d.device_id):
+            snap = dev.store.snapshot()
+            seen = now if dev.local else dev.last_seen
+            up = seen is not None and now - seen <= self.offline_after
+            online += up
+            if up and snap.temperature is not None:
+                temps.append(snap.temperature)
+            if up and snap.distance is not None and snap.distance <= 10:
+                alerts.append(dev.device_id)
+            devices.append({
+                "device_id": dev.device_id,
+                "local": dev.local,
+                "online": up,
+                "age_sec": None if seen is None else round(now - seen, 1),
+                "temperature": snap.temperature,
+                "humidity": snap.humidity,
+                "distance": snap.distance,
+                "led_status": None if snap.led_status is None else list(snap.led_status),
+                "auto_mode": snap.auto_mode,
+            })
+        return {
+            "devices": devices,
+            "count": len(devices),
+            "online": online,
+            "temperature": {
+                "min": min(temps) if temps else None,
+                "max": max(temps) if temps else None,
+                "avg": round(sum(temps) / len(temps), 2) if temps else None,
+            },
+            "intrusion": alerts,
+        }
+
+    def summary_body(self, now=None):
+        """요약 JSON bytes. 값이 그대로면 5초 동안 직렬화 결과 재사용 (age_sec/online 갱신 주기)"""
+        now = time.time() if now is None else now
+        key = (self.version, int(now // 5))
+        cached = self._summary
+        if cached[0] != key:
+            body = json.dumps(self.summary(now), ensure_ascii=False, separators=(",", ":")).encode()
+            cached = self._summary = (key, body)
+        return cached[1]
+
+
+class FleetPoller:
+    """sensor_log 새 행을 id 순서로 읽어 원격 장치 상태 갱신 (장치 수와 관계없이 쿼리 1개)
+
+    writer 여럿이면 AUTO_INCREMENT id 가 커밋 순서와 다름 → 읽은 id 사이의 빈 번호를
+    commit_window 초 동안 기억했다가 매 회차 다시 조회 (늦게 커밋된 행도 반영).
+    그동안 안 보이면 롤백 등으로 비어 있는 번호로 보고 포기
+    """
+
+    def __init__(self, get_db, fleet, interval=5.0, batch=5000, commit_window=30.0):
+        self._get_db = get_db
+        self.fleet = fleet
+        self.interval = interval
+        self.batch = batch
+        self.commit_window = commit_window
+        self.last_id = None
+        self._gaps = {}            # 아직 안 보인 id → 처음 빈 번호로 본 monotonic 시각
+        self._stop = threading.Event()
+        self._thread = None
+        self.polls = 0
+        self.rows = 0
+        self.last_error = None
+
+    def warm(self):
+        """장치별 최신 행 1개씩 + 워터마크 설정 (시작 시 1회)"""
+        with self._get_db() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT MAX(id) FROM sensor_log")
+            self.last_id = cur.fetchone()[0] or 0
+            # (device_id, dt) 인덱스로 장치별 MAX(dt) → 해당 행 조인
+            cur.execute("SELECT s.device_id, UNIX_TIMESTAMP(s.dt), s.temp, s.humid, s.dist "
+                        "FROM sensor_log s JOIN (SELECT device_id, MAX(dt) AS dt FROM sensor_log "
+                        "GROUP BY device_id) m ON s.device_id = m.device_id AND s.dt = m.dt")
+            rows = cur.fetchall()
+            cur.close()
+        for device_id, ts, t, h, d in rows:
+            self.fleet.observe(device_id, float(ts), _num(t), _num(h), _num(d))
+        return len(rows)
+
+    def poll(self):
+        if self.last_id is None:
+            return self.warm()
+        now = time.monotonic()
+        with self._get_db() as conn:
+            cur = conn.cursor()
+            total = self._recheck_gaps(cur, now)
+            while True:
+                cur.execute(f"SELECT {_POLL_COLUMNS} FROM sensor_log "
+                            "WHERE id > %s ORDER BY id LIMIT %s", (self.last_id, self.batch))
+                rows = cur.fetchall()
+                prev = self.last_id
+                for row in rows:
+                    if row[0] > prev + 1:
+                        room = self.batch - len(self._gaps)   # 빈 번호 추적 상한 (대량 롤백 대비)
+                        self._gaps.update(dict.fromkeys(range(prev + 1, row[0])[:max(room, 0)], now))
+                    prev = row[0]
+                self._observe(rows)
+                if rows:
+                    self.last_id = rows[-1][0]
+                total += len(rows)
+                if len(rows) < self.batch:
+                    break
+            cur.close()
+        self.polls += 1
+        self.rows += total
+        return total
+
+    def _recheck_gaps(self, cur, now):
+        """이전 회차의 빈 id 중 그사이 커밋된 행 반영, commit_window 지난 번호는 버림"""
+        if not self._gaps:
+            return 0
+        ids = list(self._gaps)
+        cur.execute(f"SELECT {_POLL_COLUMNS} FROM sensor_log "
+                    f"WHERE id IN ({', '.join(['%s'] * len(ids))}) ORDER BY id", ids)
+        rows = cur.fetchall()
+        for row in rows:
+            del self._gaps[row[0]]
+        self._observe(rows)
+        for i, seen in list(self._gaps.items()):
+            if now - seen >= self.commit_window:
+                del self._gaps[i]
+        return len(rows)
+
+    def _observe(self, rows):
+        for _, device_id, ts, t, h, d in rows:
+            self.fleet.observe(device_id, float(ts), _num(t), _num(h), _num(d))
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()  # 담당자 재선출 시 다시 시작할 수 있도록
+            self._thread = threading.Thread(target=self._run, name="fleet-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                log.error("fleet poll failed: %s", e)
+            self._stop.wait(self.interval)
+
+    def stats(self):
+        return dict(devices=len(self.fleet), polls=self.polls, rows=self.rows,
+                    last_id=self.last_id, gaps=len(self._gaps), last_error=self.last_error)
+
+
+def _num(v):
+    return None if v is None else float(v)
@@ -0,0 +1,184 @@
+# 중앙 수집 게이트웨이: 여러 방 컨트롤러(Pi)의 압축 배치 업로드를 받아 sensor_log 에 일괄 적재
+#
+#   python gateway.py --port 8090                       # werkzeug 스레드 서버
+#   IOT_INGEST_WORKERS=4 python gateway.py               # 적재 스레드(= DB 커넥션) 수
+#
+# - POST /ingest : 업로드 형식은 ingest.py 참고. 커밋이 끝난 뒤 응답 → Pi 는 acked 이하를 스풀에서 삭제
+# - DB 커넥션은 적재 스레드 수(IOT_INGEST_WORKERS)만큼만 사용. 요청 스레드는 DB 를 직접 만지지 않음
+# - 같은 배치를 다시 보내도 (device_id, seq) 워터마크로 중복 저장 없음
+# - 집계/보존/fleet 폴링은 같은 DB 를 쓰는 노드들과 함께 담당자 선출 (maintenance.py)
+#   Pi 들은 IOT_MAINTENANCE=off 로 두면 항상 게이트웨이가 담당, GET /fleet 로 전체 장치 요약
+# - Pi 쪽: IOT_INGEST_URL=http://<게이트웨이>:8090/ingest python W4_shin.py
+import argparse, logging, os
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from flask import Flask, Response, jsonify, request
+
+import iotlog
+import rollup
+from db_pool import get_pool
+from fleet import Fleet, FleetPoller, ensure_tables as ensure_fleet_tables
+from ingest import (MAX_BODY, BadBatch, BulkLoader, Overloaded, decode_batch,
+                    ensure_tables as ensure_ingest_tables)
+from maintenance import MaintenanceLeader
+from metrics import Registry
+from retention import RetentionManager
+
+iotlog.setup()
+log = logging.getLogger("gateway")
+
+DB_CONFIG = dict(
+    user=os.environ.get("IOT_DB_USER", "team04"),
+    password=os.environ.get("IOT_DB_PASSWORD", "team04"),
+    host=os.environ.get("IOT_DB_HOST", "localhost"),
+    port=int(os.environ.get("IOT_DB_PORT", "3306")),
+    database="IOT",
+)
+WORKERS = int(os.environ.get("IOT_INGEST_WORKERS", "2"))
+COMMIT_TIMEOUT = 30.0   # 이 시간 안에 커밋되지 않으면 503 (Pi 가 나중에 다시 보냄 → 중복 제거)
+
+# 적재 스레드 + 관리 작업 1개 + 담당자 잠금 1개
+pool = get_pool(DB_CONFIG, max_size=WORKERS + 2, acquire_timeout=10.0)
+rollups = rollup.RollupManager(pool.connection, interval=60.0)
+retention = RetentionManager(pool.connection, keep_days=30,
+                             archive_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive"))
+fleet = Fleet(history_capacity=200, offline_after=60.0)
+fleet_poller = FleetPoller(pool.connection, fleet, interval=5.0)
+loader = BulkLoader(pool, workers=WORKERS, on_flush=rollups.notify)
+
+
+def start_maintenance():
+    retention.ensure_partitioned()
+    rollups.start()
+    retention.start()
+    fleet_poller.start()
+
+
+def stop_maintenance():
+    rollups.stop()
+    retention.stop()
+    fleet_poller.stop()
+
+
+maintenance = MaintenanceLeader(pool, start_maintenance, stop_maintenance)
+
+metrics = Registry()
+BATCH_ROWS = metrics.histogram("iot_ingest_batch_rows", "Rows per upload",
+                               buckets=(1, 10, 50, 100, 500, 1000, 5000))
+COMMIT_WAIT = metrics.histogram("iot_ingest_commit_wait_seconds", "Upload accepted → committed")
+RESPONSES = metrics.counter("iot_ingest_responses_total", "Upload responses", labels=("code",))
+metrics.collect("iot_ingest_rows_total", "Rows by outcome",
+                lambda: {"inserted": loader.rows, "duplicate": loader.duplicates}, labels=("outcome",))
+metrics.collect("iot_ingest_commits_total", "Bulk load transactions", lambda: loader.commits)
+metrics.gauge("iot_ingest_pending_rows", "Rows waiting for a commit", lambda: loader.stats()["pending"])
+metrics.gauge("iot_db_pool_connections", "DB pool connections by state",
+              lambda: {(k,): v for k, v in pool.metrics().items() if k in ("idle", "in_use", "max_size")},
+              labels=("state",))
+metrics.gauge("iot_maintenance_leader", "1 if the gateway runs DB maintenance", lambda: int(maintenance.leader))
+
+app = Flask(__name__)
+
+
+def db_init():
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS sensor_log(
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            device_id VARCHAR(32) NOT NULL DEFAULT 'default',
+            temp  DECIMAL(5,2) NULL,
+            humid DECIMAL(5,2) NULL,
+            dist  DECIMAL(6,2) NULL,
+            dt DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_sensor_log_dt ON sensor_log (dt)")
+        ensure_fleet_tables(cur)
+        ensure_ingest_tables(cur)
+        rollup.ensure_tables(cur)
+        conn.commit()
+        cur.close()
+
+
+def _reply(code, body, headers=None):
+    RESPONSES.labels(code).inc()
+    resp = jsonify(body)
+    resp.status_code = code
+    for k, v in (headers or {}).items():
+        resp.headers[k] = v
+    return resp
+
+
+@app.route("/ingest", methods=["POST"])
+def ingest():
+    if request.content_length is not None and request.content_length > MAX_BODY:
+        return _reply(413, {"error": "body too large"})
+    try:
+        batch = decode_batch(request.get_data(cache=False), request.headers.get("Content-Encoding"))
+    except BadBatch as e:
+        return _reply(400, {"error": str(e)})
+    BATCH_ROWS.observe(len(batch.rows))
+    if not batch.max_seq:
+        return _reply(200, {"acked": 0, "accepted": 0, "duplicates": 0})
+    try:
+        with COMMIT_WAIT.time():
+            result = loader.submit(batch).result(COMMIT_TIMEOUT)
+    except Overloaded as e:
+        return _reply(503, {"error": str(e)}, {"Retry-After": "5"})
+    except (FutureTimeout, RuntimeError) as e:
+        return _reply(503, {"error": f"commit failed: {e}"}, {"Retry-After": "10"})
+    return _reply(200, result)
+
+
+@app.route("/stats")
+def stats():
+    return jsonify(loader=loader.stats(), pool=pool.metrics(), rollup=rollups.stats(),
+                   maintenance=maintenance.stats(), fleet=fleet_poller.stats())
+
+
+@app.route("/fleet")
+def fleet_summary():
+    # 담당자일 때만 채워짐 (아니면 담당 노드의 /fleet 사용)
+    resp = Response(fleet.summary_body(), mimetype="application/json")
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+@app.route("/metrics")
+def metrics_text():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+def start():
+    db_init()
+    loader.start()
+    maintenance.start()
+
+
+def stop():
+    loader.stop()
+    maintenance.stop()
+    log.info("ingest %s", loader.stats())
+    pool.close()
+    iotlog.shutdown()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="센서 업로드 수집 게이트웨이")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8090)
+    args = ap.parse_args()
+    from werkzeug.serving import make_server
+    srv = make_server(args.host, args.port, app, threaded=True)
+    start()
+    log.info("gateway on %s:%d (%d loader connections)", args.host, args.port, WORKERS)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import json, math, os, random, threading, time
+
+# =========================
+# 하드웨어 추상화 계층 (real / sim)
+# =========================
+# IOT_BACKEND=real (기본, 라즈베리파이) | sim (일반 리눅스에서 시뮬레이션)
+# IOT_SIM_SPEED=10      → 시뮬레이션 시계 10배속
+# IOT_SIM_CONFIG='{"dht_error_rate": 0.3, "temp": [22, 5, 600]}'  → 아래 SIM_DEFAULTS 덮어쓰기
+
+SIM_DEFAULTS = dict(
+    seed=1234,
+    speed=1.0,
+    # (기준값, 진폭, 주기[초]) 사인파 + 노이즈
+    temp=[22.0, 5.0, 600.0],
+    humid=[40.0, 10.0, 900.0],
+    dist=[60.0, 50.0, 120.0],
+    temp_noise=0.3,
+    humid_noise=1.0,
+    dist_noise=0.5,
+    dht_error_rate=0.2,       # DHT 읽기 RuntimeError 확률 (CRC/타이밍 오류 흉내)
+    echo_delay=0.0005,        # TRIG 후 ECHO 상승까지 (초)
+    echo_jitter=0.00002,      # ECHO 펄스 길이 지터 (초)
+    echo_glitch_rate=0.0,     # 엉뚱한 반사(가짜 근거리) 확률
+    echo_timeout_rate=0.0,    # ECHO 미수신 확률
+    touch_every=None,         # N초마다 자동 터치 (부하 시험용)
+)
+
+
+# ---- 시계 ----
+class RealClock:
+    speed = 1.0
+
+    def __init__(self):
+        self.time = time.time
+        self.sleep = time.sleep
+        self.perf_counter_ns = time.perf_counter_ns
+
+
+class SimClock:
+    """speed 배속 시계. time() 은 시작 시점 실제 시각에서부터 가속 진행"""
+
+    def __init__(self, speed=1.0):
+        self.speed = float(speed)
+        self._wall0 = time.time()
+        self._mono0 = time.perf_counter_ns()
+
+    def perf_counter_ns(self):
+        return self._mono0 + int((time.perf_counter_ns() - self._mono0) * self.speed)
+
+    def time(self):
+        return self._wall0 + (self.perf_counter_ns() - self._mono0) / 1e9
+
+    def elapsed(self):
+        return (self.perf_counter_ns() - self._mono0) / 1e9
+
+    def sleep(self, s):
+        if s > 0:
+            time.sleep(s / self.speed)
+
+
+# ---- 시뮬레이션 GPIO ----
+class SimGPIO:
+    """RPi.GPIO 와 같은 이름/상수를 제공하는 가짜 GPIO.
+
+    TRIG 가 HIGH→LOW 로 떨어지면 ECHO 펄스를 거리 파형에 맞춰 예약하고,
+    input(ECHO) 는 시뮬레이션 시계로 펄스 구간인지 판단. 엣지 콜백도 지원
+    (콜백을 건 ECHO 핀은 마지막으로 보낸 엣지의 레벨 → 콜백 안의 input() 이 그 엣지와 일치).
+    """
+
+    BCM, BOARD = 11, 10
+    OUT, IN = 0, 1
+    LOW, HIGH = 0, 1
+    PUD_OFF, PUD_DOWN, PUD_UP = 20, 21, 22
+    RISING, FALLING, BOTH = 31, 32, 33
+
+    def __init__(self, board):
+        self._board = board
+        self._lock = threading.RLock()
+        self.mode = None
+        self.directions = {}
+        self.levels = {}
+        self.writes = 0                 # output() 호출 수 (벤치마크용)
+        self._callbacks = {}            # pin -> [(edge, cb)]
+        self._echo = {}                 # echo pin -> (rise_ns, fall_ns)
+        self.trig_echo = {}             # trig pin -> echo pin
+
+    def setwarnings(self, flag):
+        pass
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setup(self, pin, direction, initial=None, pull_up_down=None):
+        with self._lock:
+            self.directions[pin] = direction
+            if direction == self.OUT:
+                self.levels[pin] = self.LOW if initial is None else int(initial)
+            else:
+                self.levels[pin] = self.HIGH if pull_up_down == self.PUD_UP else self.LOW
+
+    def output(self, pin, value):
+        value = int(bool(value))
+        with self._lock:
+            self.writes += 1
+            prev = self.levels.get(pin, self.LOW)
+            self.levels[pin] = value
+        if pin in self.trig_echo and prev == self.HIGH and value == self.LOW:
+            self._board.fire_echo(pin, self.trig_echo[pin])
+
+    def input(self, pin):
+        with self._lock:
+            pulse = self._echo.get(pin)
+            if pulse is not None and not self._callbacks.get(pin):
+                now = self._board.clock.perf_counter_ns()
+                return self.HIGH if pulse[0] <= now < pulse[1] else self.LOW
+            return self.levels.get(pin, self.LOW)
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        with self._lock:
+            self._callbacks.setdefault(pin, [])
+            if callback is not None:
+                self._callbacks[pin].append((edge, callback))
+
+    def add_event_callback(self, pin, callback):
+        self.add_event_detect(pin, self.BOTH, callback)
+
+    def remove_event_detect(self, pin):
+        with self._lock:
+            self._callbacks.pop(pin, None)
+
+    def cleanup(self, *args):
+        with self._lock:
+            self._callbacks.clear()
+            self.levels.clear()
+
+    # ---- 시뮬레이터 내부용 ----
+    def _set_input(self, pin, value):
+        # 입력 핀 레벨 변경 + 엣지 콜백 호출
+        with self._lock:
+            prev = self.levels.get(pin, self.LOW)
+            self.levels[pin] = value
+            cbs = list(self._callbacks.get(pin, ()))
+        if prev != value:
+            self._fire(cbs, pin, value)
+
+    def _fire(self, cbs, pin, value):
+        for edge, cb in cbs:
+            if edge == self.BOTH or (edge == self.RISING) == (value == self.HIGH):
+                cb(pin)
+
+
+class SimDHT11:
+    """adafruit_dht.DHT11 대역. 읽을 때마다 파형값 또는 RuntimeError"""
+
+    def __init__(self, board):
+        self._board = board
+
+    def _read(self, name):
+        b = self._board
+        with b.lock:
+            if b.rng.random() < b.cfg["dht_error_rate"]:
+                raise RuntimeError("Checksum did not validate. Try again.")
+        return round(b.value(name))
+
+    @property
+    def temperature(self):
+        return self._read("temp")
+
+    @property
+    def humidity(self):
+        return self._read("humid")
+
+    def exit(self):
+        pass
+
+
+class SimBoard:
+    """시뮬레이션 장치 전체: 시계, GPIO, DHT, 파형, 터치 스크립트"""
+
+    def __init__(self, cfg=None):
+        self.cfg = dict(SIM_DEFAULTS, **(cfg or {}))
+        self.clock = SimClock(self.cfg["speed"])
+        self.rng = random.Random(self.cfg["seed"])
+        self.lock = threading.Lock()
+        self.gpio = SimGPIO(self)
+        self.overrides = {}             # name -> 고정값 (테스트에서 직접 지정)
+        self.touches = 0
+        if self.cfg["touch_every"]:
+            threading.Thread(target=self._touch_script, daemon=True).start()
+
+    def value(self, name):
+        if name in self.overrides:
+            return self.overrides[name]
+        base, amp, period = self.cfg[name]
+        t = self.clock.elapsed()
+        noise = self.rng.gauss(0, self.cfg[name + "_noise"])
+        return base + amp * math.sin(2 * math.pi * t / period) + noise
+
+    def set_value(self, name, value):
+        if value is None:
+            self.overrides.pop(name, None)
+        else:
+            self.overrides[name] = value
+
+    def bind_ultrasonic(self, trig, echo):
+        self.gpio.trig_echo[trig] = echo
+
+    def fire_echo(self, trig, echo):
+        """TRIG 하강 시점 기준으로 ECHO 펄스 예약 + 엣지 콜백 타이머"""
+        cfg = self.cfg
+        with self.lock:
+            r = self.rng.random()
+            if r < cfg["echo_timeout_rate"]:
+                return
+            dist = self.value("dist")
+            if r < cfg["echo_timeout_rate"] + cfg["echo_glitch_rate"]:
+                dist = self.rng.uniform(2.0, 8.0)
+            width = max(dist, 2.0) / 17150 + self.rng.gauss(0, cfg["echo_jitter"])
+        now = self.clock.perf_counter_ns()
+        rise = now + int(cfg["echo_delay"] * 1e9)
+        fall = rise + int(max(width, 1e-6) * 1e9)
+        g = self.gpio
+        with g._lock:
+            g._echo[echo] = (rise, fall)
+            g.levels[echo] = g.LOW
+            cbs = list(g._callbacks.get(echo, ()))
+        if cbs:
+            def at(t_ns, value):
+                # 대략 잠든 뒤 마지막 구간은 spin → 엣지 시각 오차 최소화
+                coarse = (t_ns - self.clock.perf_counter_ns()) / 1e9 - 0.001 * self.clock.speed
+                if coarse > 0:
+                    self.clock.sleep(coarse)
+                while self.clock.perf_counter_ns() < t_ns:
+                    pass
+                with g._lock:
+                    g.levels[echo] = value
+                g._fire(cbs, echo, value)
+            def run():
+                at(rise, g.HIGH)
+                at(fall, g.LOW)
+            threading.Thread(target=run, daemon=True).start()
+
+    def press(self, pin, hold=0.1):
+        """터치(active-low) 한 번: LOW 로 hold 초 유지 후 HIGH 복귀"""
+        self.touches += 1
+        self.gpio._set_input(pin, self.gpio.LOW)
+        self.clock.sleep(hold)
+        self.gpio._set_input(pin, self.gpio.HIGH)
+
+    def _touch_script(self):
+        while True:
+            self.clock.sleep(self.cfg["touch_every"])
+            echo_pins = set(self.gpio.trig_echo.values())
+            for pin, d in list(self.gpio.directions.items()):
+                if d == self.gpio.IN and pin not in echo_pins:
+                    self.press(pin)
+
+
+# =========================
+# 백엔드 선택
+# =========================
+BACKEND = os.environ.get("IOT_BACKEND", "real")
+sim = None
+
+if BACKEND == "sim":
+    _cfg = json.loads(os.environ.get("IOT_SIM_CONFIG", "{}"))
+    if "IOT_SIM_SPEED" in os.environ:
+        _cfg["speed"] = float(os.environ["IOT_SIM_SPEED"])
+    sim = SimBoard(_cfg)
+    GPIO = sim.gpio
+    clock = sim.clock
+
+    def DHT11(pin, use_pulseio=True):
+        return SimDHT11(sim)
+
+    def bind_ultrasonic(trig, echo):
+        sim.bind_ultrasonic(trig, echo)
+else:
+    import RPi.GPIO as GPIO
+    import adafruit_dht, board
+    clock = RealClock()
+
+    def DHT11(pin, use_pulseio=True):
+        return adafruit_dht.DHT11(getattr(board, f"D{pin}"), use_pulseio=use_pulseio)
+
+    def bind_ultrasonic(trig, echo):
+        pass
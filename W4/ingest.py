@@ -0,0 +1,309 @@
+import gzip, json, logging, math, threading, time, zlib
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+
+from fleet import valid_device_id
+from schema import INSERT_SQL
+
+log = logging.getLogger(__name__)
+
+# =========================
+# 중앙 수집 게이트웨이 공용: 업로드 형식 + 검증 + 일괄 적재기
+# =========================
+# 업로드 1건 (POST /ingest, Content-Encoding: gzip, JSON):
+#   {"device_id": "room-101", "stream": "<스풀 id>", "rows": [[seq, ts, temp, humid, dist], ...]}
+#   - seq: 장치 스풀 안에서 단조 증가하는 번호 → (device_id, seq) 로 중복 제거
+#   - stream: 스풀 파일이 새로 만들어지면 바뀜 (seq 가 1부터 다시 시작해도 구분)
+#   - ts: epoch 초, 값은 숫자 또는 null
+# 응답: {"acked": <이 seq 이하는 저장 완료>, "accepted": n, "duplicates": m}
+MAX_BODY = 1 << 20            # 압축된 본문 최대 1 MB
+MAX_INFLATED = 8 << 20        # 압축 해제 후 최대 8 MB (압축 폭탄 방지)
+MAX_ROWS = 5000               # 업로드 1건 최대 행 수
+MAX_SKEW = 300                # 미래 시각 허용 오차(초)
+MAX_AGE = 30 * 86400          # 이보다 오래된 행은 버림 (보존 기간 밖)
+# 시각이 범위 밖인 행은 저장하지 않고 acked 에는 포함 (Pi 스풀이 그 행에서 막히지 않도록)
+
+# 센서 범위 밖 값은 null 로 저장 (행 전체를 버리지 않음)
+RANGES = dict(temp=(-40.0, 85.0), humid=(0.0, 100.0), dist=(0.0, 500.0))
+
+STATE_SQL = """
+CREATE TABLE IF NOT EXISTS ingest_state(
+    device_id VARCHAR(32) NOT NULL,
+    stream VARCHAR(32) NOT NULL,
+    last_seq BIGINT NOT NULL DEFAULT 0,
+    last_seen DATETIME NULL,
+    PRIMARY KEY (device_id, stream)
+)
+"""
+
+# 워터마크는 (device_id, stream) 마다 따로, 커지기만 함
+#   → 스풀이 바뀐 뒤 늦게 도착한(재전송) 옛 stream 배치가 새 stream 워터마크를 되돌리지 않음
+STATE_UPSERT_SQL = """
+INSERT INTO ingest_state (device_id, stream, last_seq, last_seen) VALUES (%s, %s, %s, NOW())
+ON DUPLICATE KEY UPDATE
+    last_seq = GREATEST(last_seq, VALUES(last_seq)),
+    last_seen = NOW()
+"""
+
+
+def ensure_tables(cur):
+    cur.execute(STATE_SQL)
+    # 장치당 1행(PK device_id)이던 테이블 → 기존 행은 그대로 두고 PK 를 (device_id, stream) 으로
+    cur.execute("SELECT COUNT(*) FROM information_schema.KEY_COLUMN_USAGE "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'ingest_state' "
+                "AND CONSTRAINT_NAME = 'PRIMARY' AND COLUMN_NAME = 'stream'")
+    if not cur.fetchone()[0]:
+        cur.execute("ALTER TABLE ingest_state DROP PRIMARY KEY, ADD PRIMARY KEY (device_id, stream)")
+
+
+class BadBatch(ValueError):
+    """형식이 잘못된 업로드 (400)"""
+
+
+class Overloaded(Exception):
+    """적재 대기 행이 너무 많음 (503 + Retry-After)"""
+
+
+# ---- 인코딩/디코딩 ----
+def encode_batch(device_id, stream, rows, level=6):
+    body = json.dumps({"device_id": device_id, "stream": stream, "rows": rows},
+                      separators=(",", ":")).encode()
+    return gzip.compress(body, compresslevel=level)
+
+
+def _inflate(body):
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)   # gzip 헤더
+    out = d.decompress(body, MAX_INFLATED)
+    if d.unconsumed_tail:
+        raise BadBatch(f"inflated body over {MAX_INFLATED} bytes")
+    return out
+
+
+def _value(v, name):
+    if v is None:
+        return None
+    if not isinstance(v, (int, float)) or isinstance(v, bool) or not math.isfinite(v):
+        raise BadBatch(f"{name}: not a number")
+    lo, hi = RANGES[name]
+    return float(v) if lo <= v <= hi else None
+
+
+class Batch:
+    """검증된 업로드 1건. rows = [(seq, datetime, temp, humid, dist), ...] seq 오름차순, 중복 없음.
+
+    max_seq 는 버린 행까지 포함한 최대 seq (워터마크/acked 기준)
+    """
+
+    __slots__ = ("device_id", "stream", "rows", "max_seq", "clamped", "dropped", "future")
+
+    def __init__(self, device_id, stream, rows, max_seq, clamped=0, dropped=0):
+        self.device_id = device_id
+        self.stream = stream
+        self.rows = rows
+        self.max_seq = max_seq
+        self.clamped = clamped
+        self.dropped = dropped
+        self.future = Future()
+
+
+def decode_batch(body, encoding=None, now=None):
+    """요청 본문 → Batch. 잘못된 형식은 BadBatch"""
+    if len(body) > MAX_BODY:
+        raise BadBatch(f"body over {MAX_BODY} bytes")
+    if encoding == "gzip":
+        try:
+            body = _inflate(body)
+        except zlib.error as e:
+            raise BadBatch(f"bad gzip: {e}") from None
+    try:
+        doc = json.loads(body)
+    except ValueError as e:
+        raise BadBatch(f"bad json: {e}") from None
+    if not isinstance(doc, dict):
+        raise BadBatch("expected an object")
+    device_id = doc.get("device_id")
+    stream = doc.get("stream")
+    rows = doc.get("rows")
+    if not isinstance(device_id, str) or not valid_device_id(device_id):
+        raise BadBatch("invalid device_id")
+    if not isinstance(stream, str) or not valid_device_id(stream):
+        raise BadBatch("invalid stream")
+    if not isinstance(rows, list) or len(rows) > MAX_ROWS:
+        raise BadBatch(f"rows must be a list of at most {MAX_ROWS}")
+
+    now = time.time() if now is None else now
+    out = {}
+    clamped = dropped = max_seq = 0
+    for r in rows:
+        if not isinstance(r, list) or len(r) != 5:
+            raise BadBatch("row must be [seq, ts, temp, humid, dist]")
+        seq, ts, t, h, d = r
+        if not isinstance(seq, int) or isinstance(seq, bool) or seq <= 0:
+            raise BadBatch("seq must be a positive integer")
+        if not isinstance(ts, (int, float)) or isinstance(ts, bool) or not math.isfinite(ts):
+            raise BadBatch(f"seq {seq}: timestamp must be a number")
+        max_seq = max(max_seq, seq)
+        if not now - MAX_AGE <= ts <= now + MAX_SKEW:
+            dropped += 1
+            out.pop(seq, None)
+            continue
+        vals = (_value(t, "temp"), _value(h, "humid"), _value(d, "dist"))
+        clamped += sum(v is None and raw is not None for v, raw in zip(vals, (t, h, d)))
+        out[seq] = (seq, datetime.fromtimestamp(ts)) + vals   # 같은 업로드 안의 중복 seq 는 마지막 값
+    return Batch(device_id, stream, [out[s] for s in sorted(out)], max_seq, clamped, dropped)
+
+
+# ---- 일괄 적재 ----
+class BulkLoader:
+    """여러 장치의 업로드를 모아 한 트랜잭션으로 sensor_log 에 적재 (group commit).
+
+    - 작업 스레드 workers 개 = 사용하는 DB 커넥션 수 (장치 수와 무관)
+    - 장치는 hash 로 작업 스레드에 고정 → 같은 장치의 배치는 항상 순서대로 처리
+    - 트랜잭션: ingest_state 워터마크 잠금(FOR UPDATE) → seq > 워터마크 행만 INSERT → 워터마크 갱신 → COMMIT
+      (워터마크는 (device_id, stream) 별 - stream 이 바뀌면 그 stream 의 seq 는 0 부터)
+      커밋 후에 요청 스레드의 Future 를 완료 (응답 = 저장 완료 확인)
+    - 대기 행이 max_pending 을 넘으면 submit() 이 Overloaded
+    """
+
+    def __init__(self, pool, workers=2, max_rows=5000, linger=0.05, max_pending=200000,
+                 retry_delay=1.0, on_flush=None):
+        self.pool = pool
+        self.max_rows = max_rows
+        self.linger = linger
+        self.max_pending = max_pending
+        self.retry_delay = retry_delay
+        self.on_flush = on_flush
+
+        self._queues = [deque() for _ in range(workers)]
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._running = False
+        self._threads = []
+
+        self.batches = 0
+        self.rows = 0
+        self.duplicates = 0
+        self.commits = 0
+        self.errors = 0
+        self.rejected = 0
+        self.last_error = None
+
+    def submit(self, batch):
+        with self._cond:
+            if self._pending + len(batch.rows) > self.max_pending:
+                self.rejected += 1
+                raise Overloaded(f"{self._pending} rows pending")
+            self._pending += len(batch.rows)
+            self._queues[hash(batch.device_id) % len(self._queues)].append(batch)
+            self._cond.notify_all()
+        return batch.future
+
+    def start(self):
+        self._running = True
+        for i in range(len(self._queues)):
+            th = threading.Thread(target=self._run, args=(i,), name=f"ingest-{i}", daemon=True)
+            th.start()
+            self._threads.append(th)
+        return self
+
+    def stop(self, timeout=10.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for th in self._threads:
+            th.join(timeout)
+        self._threads = []
+
+    # ---- 작업 스레드 ----
+    def _take(self, i):
+        q = self._queues[i]
+        with self._cond:
+            while self._running and not q:
+                self._cond.wait(1.0)
+            if not q:
+                return None
+        # 조금 더 기다려 다른 장치 업로드와 묶음 (커밋 횟수 감소)
+        deadline = time.monotonic() + self.linger
+        with self._cond:
+            while self._running and sum(len(b.rows) for b in q) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            group, n = [], 0
+            while q and (not group or n + len(q[0].rows) <= self.max_rows):
+                b = q.popleft()
+                group.append(b)
+                n += len(b.rows)
+        return group
+
+    def _run(self, i):
+        while True:
+            group = self._take(i)
+            if group is None:
+                return
+            while True:
+                try:
+                    results = self._write(group)
+                    break
+                except Exception as e:
+                    self.errors += 1
+                    self.last_error = str(e)
+                    log.error("ingest commit failed (%d batches): %s", len(group), e)
+                    if not self._running:
+                        results = None
+                        break
+                    time.sleep(self.retry_delay)
+            with self._cond:
+                self._pending -= sum(len(b.rows) for b in group)
+            for b in group:
+                if results is None:
+                    b.future.set_exception(RuntimeError(self.last_error))
+                else:
+                    b.future.set_result(results[id(b)])
+            if results and self.on_flush is not None:
+                self.on_flush()
+
+    def _write(self, group):
+        devices = sorted({b.device_id for b in group})   # 잠금 순서 고정 (교착 방지)
+        conn = self.pool.acquire()
+        broken = False
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT device_id, stream, last_seq FROM ingest_state WHERE device_id IN ("
+                        + ",".join(["%s"] * len(devices)) + ") FOR UPDATE", devices)
+            marks = {(dev, stream): last for dev, stream, last in cur.fetchall()}
+
+            inserts, state, results = [], {}, {}
+            for b in group:
+                key = (b.device_id, b.stream)
+                last = marks.get(key, 0)                   # 처음 보는 stream (새 스풀) → seq 다시 시작
+                fresh = [r for r in b.rows if r[0] > last]
+                inserts += [(b.device_id,) + r[2:] + (r[1],) for r in fresh]   # INSERT_SQL 순서 (값..., dt)
+                acked = max(last, b.max_seq)
+                marks[key] = acked
+                state[key] = key + (acked,)
+                results[id(b)] = dict(acked=acked, accepted=len(fresh), duplicates=len(b.rows) - len(fresh),
+                                      clamped=b.clamped, dropped=b.dropped)
+            if inserts:
+                cur.executemany(INSERT_SQL, inserts)
+            cur.executemany(STATE_UPSERT_SQL, list(state.values()))
+            conn.commit()
+            cur.close()
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.pool.release(conn, broken=broken)
+
+        self.commits += 1
+        self.batches += len(group)
+        self.rows += len(inserts)
+        self.duplicates += sum(r["duplicates"] for r in results.values())
+        return results
+
+    def stats(self):
+        return dict(pending=self._pending, batches=self.batches, rows=self.rows,
+                    duplicates=self.duplicates, commits=self.commits, errors=self.errors,
+                    rejected=self.rejected, last_error=self.last_error)
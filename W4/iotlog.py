@@ -0,0 +1,211 @@
+import json, logging, os, queue, sys, threading
+from logging.handlers import QueueHandler, QueueListener
+
+# =========================
+# 비동기 로그 (센서 작업/HTTP 핸들러는 큐에 넣기만, 출력은 백그라운드 스레드)
+# =========================
+# 각 모듈은 표준 logging 만 사용:  log = logging.getLogger(__name__);  log.warning("...: %s", e)
+# 프로세스 진입점(W4_shin/serve/web)에서 setup() 한 번 → 루트 로거에 큐 핸들러 연결
+#   - 호출 스레드: 레벨 확인 + 중복/빈도 필터 + put_nowait (stdout/journald 가 느려도 대기 없음)
+#   - 큐가 가득 차면 버리고 개수만 셈 (로그 때문에 센서 루프가 멈추지 않음)
+#   - 같은 메시지 반복 (DHT CRC 오류 등): dedup_window 초 안의 반복은 숨기고 다음 출력에 반복 횟수 표시
+#   - 로거별 빈도 제한: 초당 rate 개 (burst 까지 몰아서 허용)
+#   - 중복/빈도 필터는 WARNING 이상만 (출력 전환/모드 변경 같은 INFO 는 반복돼도 모두 남김)
+# 환경 변수: IOT_LOG_LEVEL=DEBUG|INFO|WARNING..., IOT_LOG_FORMAT=text|json
+
+
+class DedupFilter(logging.Filter):
+    """window 초 안에 같은 (로거, 레벨, 메시지) 가 반복되면 숨김. min_level 미만은 그대로 통과"""
+
+    def __init__(self, window=60.0, max_keys=1024, min_level=logging.WARNING):
+        super().__init__()
+        self.window = window
+        self.min_level = min_level
+        self.max_keys = max_keys
+        self._seen = {}           # key -> [처음 출력 시각, 숨긴 횟수]
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record):
+        if record.levelno < self.min_level:
+            return True
+        key = (record.name, record.levelno, record.getMessage())
+        now = record.created
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                self.suppressed += 1
+                return False
+            if entry is not None and entry[1]:
+                record.repeated = entry[1]
+            if len(self._seen) >= self.max_keys:
+                self._seen.clear()
+            self._seen[key] = [now, 0]
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """로거별 토큰 버킷. 넘친 레코드는 버리고 다음에 통과하는 레코드에 개수 표시. min_level 미만은 그대로 통과"""
+
+    def __init__(self, rate=20.0, burst=50, min_level=logging.WARNING):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.min_level = min_level
+        self._buckets = {}        # 로거 이름 -> [토큰, 마지막 시각, 버린 개수]
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    def filter(self, record):
+        if record.levelno < self.min_level:
+            return True
+        now = record.created
+        with self._lock:
+            b = self._buckets.get(record.name)
+            if b is None:
+                b = self._buckets[record.name] = [float(self.burst), now, 0]
+            b[0] = min(self.burst, b[0] + (now - b[1]) * self.rate)
+            b[1] = now
+            if b[0] < 1.0:
+                b[2] += 1
+                self.limited += 1
+                return False
+            b[0] -= 1.0
+            if b[2]:
+                record.rate_limited = b[2]
+                b[2] = 0
+        return True
+
+
+class DropQueueHandler(QueueHandler):
+    """put_nowait 만 사용. 큐가 가득 차면 레코드를 버림 (호출 스레드는 절대 대기하지 않음)"""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record):
+        # 메시지 포맷은 출력 스레드에서 (호출 스레드 비용 최소화). args 는 그대로 넘김
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    def format(self, record):
+        s = super().format(record)
+        return s + _suffix(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON. log.info("...", extra={"fields": {...}}) 의 fields 는 최상위 키로 합침"""
+
+    def format(self, record):
+        out = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            out.update(fields)
+        for attr in ("repeated", "rate_limited"):
+            if getattr(record, attr, None):
+                out[attr] = getattr(record, attr)
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+def _suffix(record):
+    parts = []
+    if getattr(record, "repeated", None):
+        parts.append(f"repeated {record.repeated}x")
+    if getattr(record, "rate_limited", None):
+        parts.append(f"{record.rate_limited} rate-limited")
+    return f" ({', '.join(parts)})" if parts else ""
+
+
+_state = None
+
+
+def setup(level=None, fmt=None, stream=None, queue_size=10000, dedup_window=60.0, rate=20.0, burst=50,
+          filter_level=logging.WARNING):
+    """루트 로거를 큐 핸들러로 교체하고 출력 스레드 시작. 두 번째 호출부터는 기존 상태 반환"""
+    global _state
+    if _state is not None:
+        return _state
+    level = level or os.environ.get("IOT_LOG_LEVEL", "INFO")
+    fmt = fmt or os.environ.get("IOT_LOG_FORMAT", "text")
+
+    out = logging.StreamHandler(stream or sys.stderr)
+    out.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    q = queue.Queue(queue_size)
+    handler = DropQueueHandler(q)
+    dedup = DedupFilter(dedup_window, min_level=filter_level)
+    limit = RateLimitFilter(rate, burst, min_level=filter_level)
+    handler.addFilter(dedup)   # 반복 메시지는 빈도 제한 토큰을 쓰지 않도록 먼저
+    handler.addFilter(limit)
+
+    # 프로세스 정보는 출력 형식에서 쓰지 않음 → 레코드마다 수집하지 않음 (logging 문서의 최적화 항목)
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(handler)
+    root.setLevel(level)
+    logging.getLogger("werkzeug").setLevel(max(root.level, logging.WARNING))  # 요청마다 접근 로그 X
+
+    listener = QueueListener(q, out, respect_handler_level=True)
+    listener.start()
+    _state = dict(queue=q, handler=handler, dedup=dedup, limit=limit, listener=listener)
+    return _state
+
+
+def shutdown():
+    """남은 레코드를 모두 출력하고 스레드 종료"""
+    global _state
+    if _state is None:
+        return
+    _state["listener"].stop()
+    logging.getLogger().removeHandler(_state["handler"])
+    _state = None
+
+
+def _after_fork():
+    # fork 된 자식(serve.py web 워커)에는 출력 스레드가 없음 → 새 큐/스레드로 다시 시작
+    global _state
+    if _state is None:
+        return
+    old = _state["listener"]
+    q = queue.Queue(_state["queue"].maxsize)
+    _state["handler"].queue = q
+    listener = QueueListener(q, *old.handlers, respect_handler_level=True)
+    listener.start()
+    _state = dict(_state, queue=q, listener=listener)
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def stats():
+    if _state is None:
+        return dict(enqueued=0, dropped=0, deduplicated=0, rate_limited=0, queued=0)
+    return dict(enqueued=_state["handler"].enqueued, dropped=_state["handler"].dropped,
+                deduplicated=_state["dedup"].suppressed, rate_limited=_state["limit"].limited,
+                queued=_state["queue"].qsize())
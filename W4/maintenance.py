@@ -0,0 +1,117 @@
+import logging, threading
+
+log = logging.getLogger(__name__)
+
+# =========================
+# 공유 DB 관리 작업(집계/보존/fleet 폴링) 담당자 선출
+# =========================
+# 여러 노드와 게이트웨이가 같은 MariaDB 를 쓰면 관리 작업은 한 곳에서만 돌아야 함
+#   (파티션 DDL 경합, 같은 파티션 중복 아카이브, 노드 수 × 장치 수 fleet 스캔 방지)
+# - GET_LOCK(name, 0) 을 얻은 세션이 담당자. 잠금은 그 커넥션이 살아 있는 동안 유지
+#   → 담당 프로세스가 죽거나 연결이 끊기면 서버가 잠금을 풀고 다음 회차에 다른 쪽이 가져감
+# - 담당자는 잠금 커넥션을 풀에서 하나 빌려 계속 들고 있음 (풀 크기 +1 필요)
+# - interval 마다: 담당자면 IS_USED_LOCK 으로 아직 내 잠금인지 확인, 아니면 GET_LOCK 재시도
+# - 담당이 되면 on_elected(), 잃으면 on_demoted() 호출 (작업 시작/중지)
+LOCK_NAME = "iot_maintenance"
+
+
+class MaintenanceLeader:
+    """GET_LOCK 으로 관리 작업 담당자 1곳 선출 (노드/게이트웨이 공용)"""
+
+    def __init__(self, pool, on_elected, on_demoted, name=LOCK_NAME, interval=30.0):
+        self.pool = pool
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.name = name
+        self.interval = interval
+        self._conn = None          # 잠금을 든 커넥션 (담당자일 때만)
+        self._stop = threading.Event()
+        self._thread = None
+        self.elections = 0
+        self.last_error = None
+
+    @property
+    def leader(self):
+        return self._conn is not None
+
+    def check(self):
+        """1회: 담당 유지 확인 또는 잠금 시도. 현재 담당 여부 반환"""
+        if self._conn is not None:
+            try:
+                cur = self._conn.cursor()
+                cur.execute("SELECT IS_USED_LOCK(%s) = CONNECTION_ID()", (self.name,))
+                held = cur.fetchone()[0] == 1
+                cur.close()
+            except Exception as e:
+                log.warning("maintenance lock check failed: %s", e)
+                held = False
+            if not held:
+                log.warning("maintenance lock lost")
+                self._demote(broken=True)
+            return self.leader
+
+        conn = self.pool.acquire()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT GET_LOCK(%s, 0)", (self.name,))
+            got = cur.fetchone()[0] == 1
+            cur.close()
+        except Exception:
+            self.pool.release(conn, broken=True)
+            raise
+        if not got:
+            self.pool.release(conn)
+            return False
+        self._conn = conn
+        self.elections += 1
+        log.info("elected for DB maintenance (%s)", self.name)
+        try:
+            self.on_elected()
+        except Exception:
+            self._demote(broken=True)   # 다음 회차에 (다른 쪽이든 이 쪽이든) 다시 선출
+            raise
+        return True
+
+    def _demote(self, broken=False):
+        conn, self._conn = self._conn, None
+        try:
+            self.on_demoted()
+        except Exception as e:
+            log.error("maintenance stop failed: %s", e)
+        if not broken:
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT RELEASE_LOCK(%s)", (self.name,))
+                cur.close()
+            except Exception:
+                broken = True
+        self.pool.release(conn, broken=broken)   # broken → 커넥션을 닫아 서버 쪽 잠금도 해제
+
+    # ---- 주기 실행 ----
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="maintenance", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+        if self._conn is not None:
+            self._demote()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                log.error("maintenance election failed: %s", e)
+            self._stop.wait(self.interval)
+
+    def stats(self):
+        return dict(leader=self.leader, elections=self.elections, last_error=self.last_error)
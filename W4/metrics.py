@@ -0,0 +1,225 @@
+import functools, threading, time
+from bisect import bisect_left
+
+# =========================
+# Prometheus 텍스트 형식 지표 (외부 라이브러리 없이)
+# =========================
+# 관측 1회 = bisect + 잠금 안에서 정수/실수 덧셈 2번 (약 1us) → 운영 중에도 켜 둠
+#   h = registry.histogram("iot_db_insert_seconds", "...")        # 라벨 없음
+#   h.observe(0.002) / with h.time(): ... / @h.timed
+#   r = registry.histogram("iot_http_request_seconds", "...", labels=("route",))
+#   r.labels("/status").observe(dt)
+# 이미 다른 객체가 세고 있는 값(풀 사용량, 스풀 길이, 작업 overrun 등)은 collect() 콜백으로
+# 스크레이프 시점에만 읽음 → 관측 비용 0
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _fmt(v):
+    if v == float("inf"):
+        return "+Inf"
+    if isinstance(v, float) and v.is_integer() and abs(v) < 1e15:
+        return str(int(v))
+    return repr(v) if isinstance(v, float) else str(v)
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    esc = lambda s: str(s).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+
+class _Timer:
+    __slots__ = ("child", "t0")
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.t0)
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # 마지막 칸 = +Inf
+        self.sum = 0.0
+
+    def observe(self, v):
+        i = bisect_left(self._bounds, v)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += v
+
+    def time(self):
+        return _Timer(self)
+
+    def timed(self, fn):
+        """데코레이터: fn 호출마다 실행 시간 관측 (예외 포함)"""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.observe(time.perf_counter() - t0)
+        return wrapper
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._children[()] = self._new()
+
+    def labels(self, *values):
+        """라벨값별 자식. 핫패스에서는 한 번 받아 둔 자식을 재사용"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: expected labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new())
+        return child
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new(self):
+        return _CounterChild()
+
+    def inc(self, n=1):
+        self._default.inc(n)
+
+    def render(self):
+        out = self._header()
+        for key, c in list(self._children.items()):
+            out.append(f"{self.name}{_labels(self.labelnames, key)} {_fmt(c.value)}")
+        return out
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, help, labels)
+
+    def _new(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, v):
+        self._default.observe(v)
+
+    def time(self):
+        return _Timer(self._default)
+
+    def timed(self, fn):
+        return self._default.timed(fn)
+
+    def render(self):
+        out = self._header()
+        for key, c in list(self._children.items()):
+            with c._lock:
+                counts, total = list(c.counts), c.sum
+            acc = 0
+            for le, n in zip(self.bounds + (float("inf"),), counts):
+                acc += n
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, key, ('le', _fmt(le)))} {acc}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {acc}")
+        return out
+
+
+class _Collected:
+    """스크레이프 시점에 fn() 을 호출해 값을 읽는 지표 (gauge/counter).
+
+    fn() 반환: 숫자 (라벨 없음) 또는 {라벨값 튜플: 숫자}
+    """
+
+    def __init__(self, name, help, kind, fn, labels=()):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+        self.labelnames = tuple(labels)
+
+    def render(self):
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        value = self.fn()
+        if isinstance(value, dict):
+            for key, v in value.items():
+                key = key if isinstance(key, tuple) else (key,)
+                if v is not None:
+                    out.append(f"{self.name}{_labels(self.labelnames, key)} {_fmt(v)}")
+        elif value is not None:
+            out.append(f"{self.name} {_fmt(value)}")
+        return out
+
+
+class Registry:
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _add(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"duplicate metric {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name, help, fn, labels=()):
+        return self._add(_Collected(name, help, "gauge", fn, labels))
+
+    def collect(self, name, help, fn, labels=()):
+        """다른 객체가 이미 세고 있는 누적값을 counter 로 노출"""
+        return self._add(_Collected(name, help, "counter", fn, labels))
+
+    def render(self):
+        lines = []
+        for m in list(self._metrics.values()):
+            try:
+                lines += m.render()
+            except Exception as e:   # 콜백 하나가 실패해도 나머지는 노출
+                lines.append(f"# {m.name} collect failed: {type(e).__name__}: {e}")
+        return ("\n".join(lines) + "\n").encode()
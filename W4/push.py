@@ -0,0 +1,176 @@
+import asyncio, json, threading, time
+
+# =========================
+# 상태 변경 푸시 (Server-Sent Events)
+# =========================
+
+
+class Subscriber:
+    """클라이언트 1명분 대기열. 키별 최신값만 보관(coalescing) → 느린 클라이언트도 메모리 고정"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.pending = {}
+        self.closed = False
+        self.sent = 0
+        self.coalesced = 0
+        self.last_drain = time.monotonic()
+
+    def offer(self, delta):
+        with self._cond:
+            for k in delta:
+                if k in self.pending:
+                    self.coalesced += 1
+            self.pending.update(delta)
+            self._cond.notify()
+
+    def get(self, timeout):
+        """변경분 dict 반환. timeout 동안 변경이 없으면 None (heartbeat 용)"""
+        with self._cond:
+            if not self.pending and not self.closed:
+                self._cond.wait(timeout)
+            delta, self.pending = self.pending, {}
+            self.last_drain = time.monotonic()
+        if delta:
+            self.sent += 1
+        return delta or None
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+
+class AsyncSubscriber(Subscriber):
+    """asyncio 클라이언트용. offer() 는 어느 스레드에서든 호출 가능, get() 은 코루틴"""
+
+    def __init__(self, loop):
+        super().__init__()
+        self._loop = loop
+        self._event = asyncio.Event()
+
+    def _wake(self):
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:  # 루프 종료 후
+            pass
+
+    def offer(self, delta):
+        super().offer(delta)
+        self._wake()
+
+    async def get(self, timeout):
+        if not self.pending and not self.closed:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._event.clear()
+        with self._cond:
+            delta, self.pending = self.pending, {}
+            self.last_drain = time.monotonic()
+        if delta:
+            self.sent += 1
+        return delta or None
+
+    def close(self):
+        super().close()
+        self._wake()
+
+
+class Broadcaster:
+    """publish() 로 들어온 상태에서 바뀐 키만 골라 모든 구독자에게 전달.
+
+    - 값이 그대로면 아무것도 보내지 않음
+    - 구독자별 최소 전송 간격(min_interval) 동안 들어온 변경은 하나로 합침
+    - max_lag 초 이상 받아가지 않는 구독자는 끊음 (멈춘 연결 정리)
+    """
+
+    def __init__(self, heartbeat=15.0, min_interval=0.1, max_clients=100, max_lag=60.0):
+        self.heartbeat = heartbeat
+        self.min_interval = min_interval
+        self.max_clients = max_clients
+        self.max_lag = max_lag
+        self._lock = threading.Lock()
+        self._state = {}
+        self._subs = set()
+        self.version = 0
+        self.published = 0
+        self.dropped_clients = 0
+
+    def publish(self, **state):
+        with self._lock:
+            delta = {k: v for k, v in state.items() if self._state.get(k) != v}
+            if not delta:
+                return False
+            self._state.update(delta)
+            self.version += 1
+            self.published += 1
+            subs = list(self._subs)
+        now = time.monotonic()
+        for sub in subs:
+            if now - sub.last_drain > self.max_lag:
+                self.unsubscribe(sub)
+                self.dropped_clients += 1
+            else:
+                sub.offer(delta)
+        return True
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._state)
+
+    def subscribe(self, sub=None):
+        """sub 를 주지 않으면 스레드용 Subscriber. asyncio 는 AsyncSubscriber(loop) 전달"""
+        with self._lock:
+            if len(self._subs) >= self.max_clients:
+                return None
+            sub = sub or Subscriber()
+            sub.offer(dict(self._state))  # 첫 이벤트는 전체 상태
+            self._subs.add(sub)
+            return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subs.discard(sub)
+        sub.close()
+
+    def stream(self, sub):
+        """SSE 텍스트 스트림 생성기 (Flask Response 에 그대로 전달)"""
+        try:
+            yield "retry: 3000\n\n"
+            while not sub.closed:
+                delta = sub.get(self.heartbeat)
+                if delta is None:
+                    yield ": hb\n\n"
+                    continue
+                yield self._event(delta)
+                if self.min_interval:
+                    time.sleep(self.min_interval)
+        finally:
+            self.unsubscribe(sub)
+
+    async def astream(self, sub):
+        """stream() 의 asyncio 버전 (AsyncSubscriber 용, 연결당 스레드 없음)"""
+        try:
+            yield "retry: 3000\n\n"
+            while not sub.closed:
+                delta = await sub.get(self.heartbeat)
+                if delta is None:
+                    yield ": hb\n\n"
+                    continue
+                yield self._event(delta)
+                if self.min_interval:
+                    await asyncio.sleep(self.min_interval)
+        finally:
+            self.unsubscribe(sub)
+
+    def _event(self, delta):
+        return f"id: {self.version}\ndata: {json.dumps(delta, separators=(',', ':'))}\n\n"
+
+    def stats(self):
+        with self._lock:
+            subs = list(self._subs)
+        return dict(clients=len(subs), version=self.version, published=self.published,
+                    dropped_clients=self.dropped_clients,
+                    coalesced=sum(s.coalesced for s in subs))
@@ -0,0 +1,193 @@
+import csv, gzip, logging, os, threading
+from datetime import date, timedelta
+
+log = logging.getLogger(__name__)
+
+# =========================
+# sensor_log 일 단위 파티션 + 보존 기간 관리
+# =========================
+# 파티션 이름: pYYYYMMDD (해당 날짜 하루치), p_old (파티션 도입 이전 행), pmax (미래 대비)
+
+
+def _pname(d):
+    return "p" + d.strftime("%Y%m%d")
+
+
+def _pdate(name):
+    try:
+        return date(int(name[1:5]), int(name[5:7]), int(name[7:9]))
+    except (ValueError, IndexError):
+        return None
+
+
+def _less_than(d):
+    # pYYYYMMDD 는 다음 날 0시 미만
+    return f"TO_DAYS('{(d + timedelta(days=1)).isoformat()}')"
+
+
+class RetentionManager:
+    """sensor_log 를 일 단위 RANGE 파티션으로 관리하고 오래된 파티션을 정리.
+
+    - ensure_partitioned(): 파티션이 없으면 (id, dt) PK 로 바꾸고 파티션 적용
+    - 미래 future_days 일치 파티션을 미리 만들어 둠 (pmax 분할)
+    - keep_days 보다 오래된 파티션은 archive_dir 에 CSV.gz 로 내보낸 뒤 DROP
+      (집계 테이블 워터마크가 아직 그 파티션을 지나지 않았으면 이번 회차는 건너뜀)
+    - 1분 집계는 rollup_keep_days 이후 삭제, 1시간 집계는 보존
+    """
+
+    def __init__(self, get_db, keep_days=30, archive_dir="archive", future_days=3,
+                 rollup_keep_days=90, interval=3600.0, table="sensor_log",
+                 require_rollup=True):
+        self._get_db = get_db
+        self.keep_days = keep_days
+        self.archive_dir = archive_dir
+        self.future_days = future_days
+        self.rollup_keep_days = rollup_keep_days
+        self.interval = interval
+        self.table = table
+        self.require_rollup = require_rollup
+        self._stop = threading.Event()
+        self._thread = None
+        self.archived = []
+        self.last_error = None
+
+    # ---- 파티션 조회/생성 ----
+    def partitions(self, cur):
+        cur.execute(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+            "ORDER BY PARTITION_ORDINAL_POSITION", (self.table,))
+        return [r[0] for r in cur.fetchall() if r[0] is not None]
+
+    def ensure_partitioned(self, today=None):
+        today = today or date.today()
+        with self._get_db() as conn:
+            cur = conn.cursor()
+            if self.partitions(cur):
+                cur.close()
+                return False
+            first = today - timedelta(days=self.keep_days)
+            cur.execute(f"SELECT MIN(dt) FROM {self.table}")
+            oldest = cur.fetchone()[0]
+            if oldest is not None and oldest.date() > first:
+                first = oldest.date()
+            days = [first + timedelta(days=i) for i in range((today - first).days + self.future_days + 1)]
+            parts = [f"PARTITION p_old VALUES LESS THAN (TO_DAYS('{first.isoformat()}'))"]
+            parts += [f"PARTITION {_pname(d)} VALUES LESS THAN ({_less_than(d)})" for d in days]
+            parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+
+            # 파티션 키(dt)는 모든 유니크 키에 포함되어야 함 → PK (id, dt)
+            cur.execute(f"UPDATE {self.table} SET dt = NOW() WHERE dt IS NULL")
+            cur.execute(f"ALTER TABLE {self.table} "
+                        "MODIFY dt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+                        "DROP PRIMARY KEY, ADD PRIMARY KEY (id, dt)")
+            cur.execute(f"ALTER TABLE {self.table} PARTITION BY RANGE (TO_DAYS(dt)) (\n    "
+                        + ",\n    ".join(parts) + "\n)")
+            conn.commit()
+            cur.close()
+        return True
+
+    def add_future_partitions(self, cur, today):
+        names = self.partitions(cur)
+        dated = [d for d in map(_pdate, names) if d is not None]
+        last = max(dated) if dated else today - timedelta(days=1)
+        want = today + timedelta(days=self.future_days)
+        new = []
+        d = last + timedelta(days=1)
+        while d <= want:
+            new.append(f"PARTITION {_pname(d)} VALUES LESS THAN ({_less_than(d)})")
+            d += timedelta(days=1)
+        if new:
+            cur.execute(f"ALTER TABLE {self.table} REORGANIZE PARTITION pmax INTO (\n    "
+                        + ",\n    ".join(new + ["PARTITION pmax VALUES LESS THAN MAXVALUE"]) + "\n)")
+        return len(new)
+
+    # ---- 만료 파티션 내보내기/삭제 ----
+    def expired(self, cur, today):
+        cutoff = today - timedelta(days=self.keep_days)
+        out = []
+        for name in self.partitions(cur):
+            d = _pdate(name)
+            if name == "p_old" or (d is not None and d < cutoff):
+                out.append(name)
+        return out
+
+    def _rolled_up(self, cur, name):
+        if not self.require_rollup:
+            return True
+        cur.execute(f"SELECT MAX(id) FROM {self.table} PARTITION ({name})")
+        max_id = cur.fetchone()[0]
+        if max_id is None:
+            return True
+        cur.execute("SELECT last_id FROM rollup_state WHERE name = 'sensor_log'")
+        row = cur.fetchone()
+        return row is not None and row[0] >= max_id
+
+    def archive_partition(self, cur, name):
+        """파티션 행을 archive_dir/<table>_<name>.csv.gz 로 내보냄 (행 없으면 None)"""
+        cur.execute(f"SELECT * FROM {self.table} PARTITION ({name}) ORDER BY id")
+        header = [c[0] for c in cur.description]
+        rows = cur.fetchmany(5000)
+        if not rows:
+            return None
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"{self.table}_{name[1:].strip('_')}.csv.gz")
+        tmp = path + ".part"
+        with gzip.open(tmp, "wt", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(header)
+            while rows:
+                w.writerows(rows)
+                rows = cur.fetchmany(5000)
+        os.replace(tmp, path)
+        return path
+
+    def run_once(self, today=None):
+        today = today or date.today()
+        result = dict(added=0, archived=[], dropped=[], skipped=[], rollup_deleted=0)
+        with self._get_db() as conn:
+            cur = conn.cursor()
+            result["added"] = self.add_future_partitions(cur, today)
+            for name in self.expired(cur, today):
+                if not self._rolled_up(cur, name):
+                    result["skipped"].append(name)
+                    continue
+                path = self.archive_partition(cur, name)
+                if path:
+                    result["archived"].append(path)
+                cur.execute(f"ALTER TABLE {self.table} DROP PARTITION {name}")
+                result["dropped"].append(name)
+            if self.require_rollup and self.rollup_keep_days:
+                cur.execute("DELETE FROM sensor_log_1m WHERE bucket < %s",
+                            (today - timedelta(days=self.rollup_keep_days),))
+                result["rollup_deleted"] = cur.rowcount
+            conn.commit()
+            cur.close()
+        self.archived += result["archived"]
+        return result
+
+    # ---- 주기 실행 ----
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()  # 담당자 재선출 시 다시 시작할 수 있도록
+            self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                r = self.run_once()
+                self.last_error = None
+                if r["dropped"] or r["skipped"]:
+                    log.info("retention %s", r)
+            except Exception as e:
+                self.last_error = str(e)
+                log.error("retention failed: %s", e)
+            self._stop.wait(self.interval)
@@ -0,0 +1,115 @@
+import threading
+from array import array
+
+# =========================
+# 최근값 링버퍼 캐시 (/history_data 용)
+# =========================
+METRICS = ("temp", "humid", "dist")
+NAN = float("nan")
+
+
+class MetricRing:
+    """고정 크기 링버퍼 (timestamp, value) - array('d') 두 개로 저장.
+
+    값 None 은 NaN 으로 저장했다가 꺼낼 때 다시 None 으로 돌려줌.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._ts = array("d", [0.0]) * capacity
+        self._val = array("d", [NAN]) * capacity
+        self._head = 0      # 다음에 쓸 위치
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, ts, value):
+        with self._lock:
+            i = self._head
+            self._ts[i] = ts
+            self._val[i] = NAN if value is None else float(value)
+            self._head = (i + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+
+    def last(self, n):
+        """최근 n개 [(ts, value), ...] (최신→과거). 버퍼에 n개가 없으면 None"""
+        with self._lock:
+            if n > self._count:
+                return None
+            out = []
+            i = self._head
+            for _ in range(n):
+                i = (i - 1) % self.capacity
+                v = self._val[i]
+                out.append((self._ts[i], None if v != v else v))
+            return out
+
+    def columns(self, n):
+        """최근 n개를 열로 (ts array('d'), value array('d'), 최신→과거, 값 없음 = NaN).
+        행 단위 루프 없이 슬라이스 복사만. 버퍼에 n개가 없으면 None"""
+        with self._lock:
+            if n > self._count:
+                return None
+            lo = self._head - n
+            if lo >= 0:
+                ts, val = self._ts[lo:self._head], self._val[lo:self._head]
+            else:                                   # 끝을 넘어 감긴 구간
+                ts = self._ts[lo:] + self._ts[:self._head]
+                val = self._val[lo:] + self._val[:self._head]
+        return ts[::-1], val[::-1]
+
+    def clear(self):
+        with self._lock:
+            self._head = 0
+            self._count = 0
+
+
+class HistoryCache:
+    """메트릭별 MetricRing 묶음. sensor_loop 가 저장할 때마다 같이 채움"""
+
+    def __init__(self, capacity=600, metrics=METRICS):
+        self.capacity = capacity
+        self.rings = {m: MetricRing(capacity) for m in metrics}
+        self.hits = 0
+        self.misses = 0
+        self.version = 0    # append/warm 마다 증가 (응답 캐시/ETag 키)
+
+    def append(self, ts, **values):
+        for m, v in values.items():
+            self.rings[m].append(ts, v)
+        self.version += 1
+
+    def last_n(self, metric, n):
+        ring = self.rings.get(metric)
+        rows = None if ring is None else ring.last(n)
+        if rows is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return rows
+
+    def count(self, metric):
+        ring = self.rings.get(metric)
+        return 0 if ring is None else len(ring)
+
+    def last_columns(self, metric, n):
+        ring = self.rings.get(metric)
+        cols = None if ring is None else ring.columns(n)
+        if cols is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cols
+
+    def warm(self, rows):
+        """DB 행(dict, 최신→과거)으로 초기 적재 - 콜드 스타트용"""
+        for ring in self.rings.values():
+            ring.clear()
+        for r in reversed(rows):
+            ts = r["dt"].timestamp()
+            for m, ring in self.rings.items():
+                ring.append(ts, r.get(m))
+        self.version += 1
@@ -0,0 +1,197 @@
+import collections, logging, threading, time
+
+log = logging.getLogger(__name__)
+
+# =========================
+# sensor_log 1분/1시간 집계 테이블 (증분 갱신)
+# =========================
+METRICS = ("temp", "humid", "dist")
+
+# (테이블, 버킷 크기(초), dt → 버킷 시작 시각 SQL)
+LEVELS = (
+    ("sensor_log_1m", 60, "FROM_UNIXTIME(FLOOR(UNIX_TIMESTAMP(dt) / 60) * 60)"),
+    ("sensor_log_1h", 3600, "FROM_UNIXTIME(FLOOR(UNIX_TIMESTAMP(dt) / 3600) * 3600)"),
+)
+
+
+def _table_sql(table):
+    cols = ",\n".join(
+        f"        {m}_min DECIMAL(6,2) NULL, {m}_max DECIMAL(6,2) NULL, "
+        f"{m}_sum DOUBLE NULL, {m}_cnt INT NOT NULL DEFAULT 0"
+        for m in METRICS
+    )
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table}(
+        device_id VARCHAR(32) NOT NULL DEFAULT 'default',
+        bucket DATETIME NOT NULL,
+{cols},
+        PRIMARY KEY (device_id, bucket)
+    )
+    """
+
+
+STATE_SQL = """
+CREATE TABLE IF NOT EXISTS rollup_state(
+    name VARCHAR(32) PRIMARY KEY,
+    last_id BIGINT NOT NULL DEFAULT 0
+)
+"""
+
+
+def ensure_tables(cur):
+    for table, _, _ in LEVELS:
+        cur.execute(_table_sql(table))
+        # 장치 구분 이전에 만든 테이블 → 기존 행은 'default' 장치로 두고 PK 를 (device_id, bucket) 으로
+        cur.execute("SELECT COUNT(*) FROM information_schema.COLUMNS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'device_id'",
+                    (table,))
+        if not cur.fetchone()[0]:
+            cur.execute(f"ALTER TABLE {table} "
+                        "ADD COLUMN device_id VARCHAR(32) NOT NULL DEFAULT 'default' FIRST, "
+                        "DROP PRIMARY KEY, ADD PRIMARY KEY (device_id, bucket)")
+    cur.execute(STATE_SQL)
+    cur.execute("INSERT IGNORE INTO rollup_state (name, last_id) VALUES ('sensor_log', 0)")
+
+
+def _upsert_sql(table, bucket_expr):
+    select = ", ".join(
+        f"MIN({m}), MAX({m}), SUM({m}), COUNT({m})" for m in METRICS
+    )
+    cols = ", ".join(f"{m}_min, {m}_max, {m}_sum, {m}_cnt" for m in METRICS)
+    # NULL 과 LEAST/GREATEST 를 섞으면 NULL 이 되므로 COALESCE 로 보정
+    merge = ",\n        ".join(
+        f"{m}_min = LEAST(COALESCE({m}_min, VALUES({m}_min)), COALESCE(VALUES({m}_min), {m}_min)), "
+        f"{m}_max = GREATEST(COALESCE({m}_max, VALUES({m}_max)), COALESCE(VALUES({m}_max), {m}_max)), "
+        f"{m}_sum = IF(VALUES({m}_cnt) = 0, {m}_sum, COALESCE({m}_sum, 0) + VALUES({m}_sum)), "
+        f"{m}_cnt = {m}_cnt + VALUES({m}_cnt)"
+        for m in METRICS
+    )
+    return f"""
+    INSERT INTO {table} (device_id, bucket, {cols})
+    SELECT device_id, {bucket_expr} AS b, {select}
+    FROM sensor_log WHERE id > %s AND id <= %s
+    GROUP BY device_id, b
+    ON DUPLICATE KEY UPDATE
+        {merge}
+    """
+
+
+def range_bucket_query(metric, bucket_sec):
+    """요청 해상도를 만족하는 가장 거친 소스(원본/1m/1h)로 구간 집계 SQL 생성.
+
+    반환: (sql, bucket_sec) - bucket_sec 는 소스 단위의 배수로 올림됨.
+    sql 파라미터: (bucket_sec, device_id, start, end), 결과: (b, min, max, avg, count)
+    """
+    m = metric if metric in METRICS else "dist"
+    for table, size, _ in reversed(LEVELS):
+        if bucket_sec >= size:
+            bucket_sec = -(-bucket_sec // size) * size
+            sql = f"""
+            SELECT FLOOR(UNIX_TIMESTAMP(bucket) / %s) AS b,
+                   MIN({m}_min), MAX({m}_max), SUM({m}_sum) / NULLIF(SUM({m}_cnt), 0), SUM({m}_cnt)
+            FROM {table}
+            WHERE device_id = %s AND bucket >= %s AND bucket < %s
+            GROUP BY b ORDER BY b
+            """
+            return sql, bucket_sec
+    sql = f"""
+    SELECT FLOOR(UNIX_TIMESTAMP(dt) / %s) AS b,
+           MIN({m}), MAX({m}), AVG({m}), COUNT({m})
+    FROM sensor_log
+    WHERE device_id = %s AND dt >= %s AND dt < %s
+    GROUP BY b ORDER BY b
+    """
+    return sql, bucket_sec
+
+
+class RollupManager:
+    """sensor_log 의 새 행(id > 워터마크)을 1분/1시간 테이블에 합산.
+
+    - 집계 UPSERT 와 워터마크 갱신을 한 트랜잭션으로 처리 → 재실행해도 중복 합산 없음
+    - 중단 후에는 chunk 단위로 끝까지 따라잡음
+    - 연속 호출 사이에 최소 settle 초 간격 (writer flush 가 몰릴 때 과도한 집계 방지)
+    - 워터마크는 commit_window 초 전에 본 MAX(id) 까지만 전진
+      (writer 여럿이면 AUTO_INCREMENT id 가 커밋 순서와 다름 → 작은 id 가 늦게 커밋되면
+       이미 지나간 워터마크 아래에 떨어져 집계되지 않고, 보존 정책이 원본까지 지워버림.
+       dt 기준 상한은 spool/게이트웨이 행이 과거 dt 를 달고 오므로 쓸 수 없음)
+    """
+
+    def __init__(self, get_db, interval=60.0, chunk=50000, settle=5, commit_window=30.0):
+        self._get_db = get_db
+        self.interval = interval
+        self.chunk = chunk
+        self.settle = settle
+        self.commit_window = commit_window
+        self._seen = collections.deque()   # (monotonic 시각, 그때의 MAX(id))
+        self._safe = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.rows_rolled = 0
+        self.runs = 0
+        self.last_error = None
+
+    def catch_up(self):
+        """밀린 행 전부 집계. 처리한 행 id 개수(대략) 반환"""
+        total = 0
+        with self._get_db() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT MAX(id) FROM sensor_log")
+            upper = self._settled(cur.fetchone()[0] or 0)
+            while True:
+                cur.execute("SELECT last_id FROM rollup_state WHERE name = 'sensor_log' FOR UPDATE")
+                last_id = cur.fetchone()[0]
+                if last_id >= upper:
+                    conn.commit()
+                    break
+                hi = min(last_id + self.chunk, upper)
+                for table, _, bucket_expr in LEVELS:
+                    cur.execute(_upsert_sql(table, bucket_expr), (last_id, hi))
+                cur.execute("UPDATE rollup_state SET last_id = %s WHERE name = 'sensor_log'", (hi,))
+                conn.commit()
+                total += hi - last_id
+            cur.close()
+        self.rows_rolled += total
+        self.runs += 1
+        return total
+
+    def _settled(self, newest):
+        """commit_window 초 이상 지난 관측 중 가장 큰 MAX(id) - 그 아래 id 는 커밋이 끝났다고 봄"""
+        now = time.monotonic()
+        self._seen.append((now, newest))
+        while self._seen and now - self._seen[0][0] >= self.commit_window:
+            self._safe = max(self._safe, self._seen.popleft()[1])
+        return self._safe
+
+    def notify(self):
+        # writer flush 후 호출 → 다음 집계를 앞당김
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()  # 담당자 재선출 시 다시 시작할 수 있도록
+            self._thread = threading.Thread(target=self._run, name="rollup", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.catch_up()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                log.error("rollup failed: %s", e)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            time.sleep(self.settle)
+
+    def stats(self):
+        return dict(runs=self.runs, rows_rolled=self.rows_rolled, last_error=self.last_error)
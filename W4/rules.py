@@ -0,0 +1,138 @@
+import json
+
+# =========================
+# AUTO 모드 규칙 엔진 (히스테리시스 + 최소 유지 시간 + 우선순위)
+# =========================
+# 규칙 1개 = 입력 1개로 출력 1개를 켜고 끔. 설정 예)
+#   dict(name="aircon", output=0, input="temperature", on_above=25, deadband=1.0,
+#        min_on=10, min_off=10, priority=2, group="hvac")
+#   - on_above=T: x >= T 이면 켜고, 켜진 뒤에는 x < T - deadband 가 되어야 끔 (on_below 는 반대)
+#   - min_on/min_off: 켜진(꺼진) 뒤 이 시간(초)이 지나야 다시 바꿈. 막힌 전환은 보류했다가 시간이 되면 적용
+#   - group: 같은 group 안에서는 priority 가 가장 높은 규칙 하나만 켤 수 있음 (예: 에어컨/히터 동시 가동 금지)
+INF = float("inf")
+
+
+class Rule:
+    def __init__(self, name, output, input, on_above=None, on_below=None, deadband=0.0,
+                 min_on=0.0, min_off=0.0, priority=0, group=None):
+        if (on_above is None) == (on_below is None):
+            raise ValueError(f"rule {name}: exactly one of on_above/on_below is required")
+        self.name = name
+        self.output = output
+        self.input = input
+        self.on_above = on_above
+        self.on_below = on_below
+        self.deadband = deadband
+        self.min_on = min_on
+        self.min_off = min_off
+        self.priority = priority
+        self.group = group
+
+    def wants(self, x, on):
+        """입력 x, 현재 출력 on 에서 켜져 있어야 하는지. 입력이 없으면 현재 상태 유지"""
+        if x is None:
+            return on
+        if self.on_above is not None:
+            return x >= (self.on_above - self.deadband if on else self.on_above)
+        return x <= (self.on_below + self.deadband if on else self.on_below)
+
+
+class RuleEngine:
+    """입력이 바뀐 규칙만 다시 평가하고, 출력이 실제로 바뀔 때만 전환 목록을 돌려줌.
+
+    evaluate(inputs, now) → [(output, on), ...] (GPIO 는 호출 측에서 이 목록만 씀)
+    """
+
+    def __init__(self, rules, outputs):
+        self.rules = sorted(rules, key=lambda r: -r.priority)
+        self.state = [False] * outputs
+        self._changed_at = [-INF] * outputs
+        self._by_input = {}
+        self._by_output = {}
+        self._by_group = {}
+        for r in self.rules:
+            self._by_input.setdefault(r.input, []).append(r)
+            self._by_output.setdefault(r.output, []).append(r)
+            if r.group is not None:
+                self._by_group.setdefault(r.group, []).append(r)
+        self._min_on = {o: max(r.min_on for r in rs) for o, rs in self._by_output.items()}
+        self._min_off = {o: max(r.min_off for r in rs) for o, rs in self._by_output.items()}
+        self._inputs = {}
+        self._want = {r.name: False for r in self.rules}
+        self._pending = set()     # 최소 유지 시간 때문에 미뤄진 출력
+
+        self.evaluations = 0      # 규칙 평가 횟수
+        self.transitions = 0      # 출력 전환 횟수
+        self.blocked = 0          # 최소 유지 시간으로 미뤄진 횟수
+
+    @classmethod
+    def from_config(cls, specs, outputs):
+        return cls([Rule(**spec) for spec in specs], outputs)
+
+    def outputs(self):
+        return tuple(int(on) for on in self.state)
+
+    def sync(self, states):
+        """실제 출력 상태를 알려줌 (MANUAL → AUTO 복귀 등). 다음 evaluate 에서 모든 규칙을 다시 평가"""
+        for i, on in enumerate(states):
+            self.state[i] = bool(on)
+            self._changed_at[i] = -INF
+        self._inputs.clear()
+
+    def _allowed(self, rule):
+        # 같은 group 에서 더 높은 우선순위 규칙이 켜려고 하면 양보
+        for other in self._by_group.get(rule.group, ()):
+            if other.priority > rule.priority and self._want[other.name]:
+                return False
+        return True
+
+    def _desired(self, output):
+        return any(self._want[r.name] and self._allowed(r) for r in self._by_output.get(output, ()))
+
+    def evaluate(self, inputs, now):
+        touched = set(self._pending)
+        for key, x in inputs.items():
+            if key in self._inputs and self._inputs[key] == x:
+                continue
+            self._inputs[key] = x
+            for r in self._by_input.get(key, ()):
+                self.evaluations += 1
+                want = r.wants(x, self.state[r.output])
+                if want != self._want[r.name]:
+                    self._want[r.name] = want
+                    touched.add(r.output)
+                    for other in self._by_group.get(r.group, ()):
+                        touched.add(other.output)
+
+        changes = []
+        for out in sorted(touched):
+            desired = self._desired(out)
+            on = self.state[out]
+            if desired == on:
+                self._pending.discard(out)
+                continue
+            dwell = self._min_on.get(out, 0.0) if on else self._min_off.get(out, 0.0)
+            if now - self._changed_at[out] < dwell:
+                if out not in self._pending:
+                    self.blocked += 1
+                    self._pending.add(out)
+                continue
+            self._pending.discard(out)
+            self.state[out] = desired
+            self._changed_at[out] = now
+            self.transitions += 1
+            changes.append((out, desired))
+        return changes
+
+    def stats(self):
+        return dict(rules=len(self.rules), evaluations=self.evaluations, transitions=self.transitions,
+                    blocked=self.blocked, pending=sorted(self._pending), outputs=self.outputs())
+
+
+def load_rules(path):
+    """JSON 파일 → 규칙 설정 목록 ([{...}, ...])"""
+    with open(path, encoding="utf-8") as f:
+        specs = json.load(f)
+    if not isinstance(specs, list):
+        raise ValueError(f"{path}: expected a list of rules")
+    return specs
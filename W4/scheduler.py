@@ -0,0 +1,224 @@
+import asyncio, logging, threading
+
+log = logging.getLogger(__name__)
+
+# =========================
+# 센서별 주기 작업 스케줄러
+# =========================
+
+
+class SensorTask:
+    """주기 작업 하나. fn() 결과를 publish(result) 로 자기 상태 슬롯에 게시.
+
+    - period: 실행 주기(초). 예정 시각 기준(드리프트 없음)으로 실행
+    - deadline: 한 번 실행(재시도 포함)에 허용되는 시간, 넘으면 overrun (기본 = period)
+    - retries/retry_delay: fn() 예외 시 재시도 정책 (deadline 을 넘기면 중단)
+    """
+
+    def __init__(self, name, fn, period, publish=None, deadline=None,
+                 retries=0, retry_delay=0.0, retry_on=(Exception,)):
+        self.name = name
+        self.fn = fn
+        self.period = period
+        self.publish = publish
+        self.deadline = period if deadline is None else deadline
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.retry_on = retry_on
+
+        self.runs = 0
+        self.errors = 0
+        self.retried = 0
+        self.overruns = 0
+        self.skipped = 0          # 밀려서 건너뛴 주기 수
+        self.jitter_sum = 0.0
+        self.jitter_max = 0.0
+        self.dur_sum = 0.0
+        self.dur_max = 0.0
+        self.last_error = None
+        self.timer = None         # 실행 시간 히스토그램 (metrics 자식, 선택)
+
+    # ---- 실행 기록 (스레드/asyncio 스케줄러 공용) ----
+    def _started(self, due, now):
+        jitter = now - due
+        self.jitter_sum += jitter
+        self.jitter_max = max(self.jitter_max, jitter)
+
+    def _finished(self, ok, dur):
+        if not ok:
+            self.errors += 1
+            # 같은 오류 반복(DHT CRC 등)은 로그 계층에서 묶어서 출력
+            log.warning("task %s failed: %s", self.name, self.last_error)
+        self.runs += 1
+        self.dur_sum += dur
+        self.dur_max = max(self.dur_max, dur)
+        if dur > self.deadline:
+            self.overruns += 1
+        if self.timer is not None:
+            self.timer.observe(dur)
+
+    def _next_due(self, due, now):
+        # 다음 예정 시각. 한 주기 이상 밀렸으면 지난 주기는 건너뜀
+        due += self.period
+        behind = now - due
+        if behind > self.period:
+            missed = int(behind // self.period)
+            self.skipped += missed
+            due += missed * self.period
+        return due
+
+    def _publish(self, ok, result):
+        if ok and self.publish is not None:
+            try:
+                self.publish(result)
+            except Exception as e:
+                self.last_error = f"publish {type(e).__name__}: {e}"
+                return False
+        return ok
+
+    def stats(self):
+        n = max(self.runs, 1)
+        return dict(
+            period=self.period, runs=self.runs, errors=self.errors, retried=self.retried,
+            overruns=self.overruns, skipped=self.skipped,
+            jitter_avg_ms=round(self.jitter_sum / n * 1000, 3),
+            jitter_max_ms=round(self.jitter_max * 1000, 3),
+            duration_avg_ms=round(self.dur_sum / n * 1000, 3),
+            duration_max_ms=round(self.dur_max * 1000, 3),
+            last_error=self.last_error,
+        )
+
+
+class SensorScheduler:
+    """작업마다 전용 스레드 → 느린 DHT 읽기가 거리 측정을 막지 않음"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.tasks = {}
+        self._stop = threading.Event()
+        self._threads = []
+
+    def add(self, task):
+        self.tasks[task.name] = task
+        return task
+
+    def start(self):
+        for task in self.tasks.values():
+            th = threading.Thread(target=self._run, args=(task,), name=f"task-{task.name}", daemon=True)
+            th.start()
+            self._threads.append(th)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for th in self._threads:
+            th.join(1.0)
+        self._threads = []
+
+    def _call(self, task, start):
+        attempt = 0
+        while True:
+            try:
+                return True, task.fn()
+            except Exception as e:
+                task.last_error = f"{type(e).__name__}: {e}"
+                if not isinstance(e, task.retry_on):
+                    return False, None
+                elapsed = self.clock.time() - start
+                if attempt >= task.retries or elapsed + task.retry_delay > task.deadline:
+                    return False, None
+                attempt += 1
+                task.retried += 1
+                self.clock.sleep(task.retry_delay)
+
+    def _run(self, task):
+        clock = self.clock
+        next_t = clock.time()
+        while not self._stop.is_set():
+            now = clock.time()
+            if next_t > now:
+                # stop() 에 바로 반응하도록 실제 시간으로 환산해 대기
+                self._stop.wait((next_t - now) / clock.speed)
+                if self._stop.is_set():
+                    return
+                now = clock.time()
+
+            task._started(next_t, now)
+            ok, result = self._call(task, now)
+            ok = task._publish(ok, result)
+            task._finished(ok, clock.time() - now)
+            next_t = task._next_due(next_t, clock.time())
+
+    def stats(self):
+        return {name: t.stats() for name, t in self.tasks.items()}
+
+
+class AsyncSensorScheduler:
+    """asyncio 버전. 작업마다 코루틴 1개 (스레드 없음).
+
+    fn 이 코루틴 함수면 그대로 await, 일반 함수면 executor 스레드에서 실행 (DHT 읽기 등).
+    publish 는 이벤트 루프에서 바로 호출. 실행 기록/통계는 SensorScheduler 와 같음.
+    """
+
+    def __init__(self, clock, executor=None):
+        self.clock = clock
+        self.executor = executor
+        self.tasks = {}
+        self._running = []
+
+    def add(self, task):
+        self.tasks[task.name] = task
+        return task
+
+    def start(self):
+        # 실행 중인 이벤트 루프 안에서 호출
+        loop = asyncio.get_running_loop()
+        self._running = [loop.create_task(self._run(t), name=f"task-{t.name}")
+                         for t in self.tasks.values()]
+        return self
+
+    async def stop(self):
+        for t in self._running:
+            t.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+        self._running = []
+
+    async def _invoke(self, task):
+        if asyncio.iscoroutinefunction(task.fn):
+            return await task.fn()
+        return await asyncio.get_running_loop().run_in_executor(self.executor, task.fn)
+
+    async def _call(self, task, start):
+        attempt = 0
+        while True:
+            try:
+                return True, await self._invoke(task)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                task.last_error = f"{type(e).__name__}: {e}"
+                if not isinstance(e, task.retry_on):
+                    return False, None
+                elapsed = self.clock.time() - start
+                if attempt >= task.retries or elapsed + task.retry_delay > task.deadline:
+                    return False, None
+                attempt += 1
+                task.retried += 1
+                await asyncio.sleep(task.retry_delay / self.clock.speed)
+
+    async def _run(self, task):
+        clock = self.clock
+        next_t = clock.time()
+        while True:
+            now = clock.time()
+            if next_t > now:
+                await asyncio.sleep((next_t - now) / clock.speed)
+                now = clock.time()
+            task._started(next_t, now)
+            ok, result = await self._call(task, now)
+            ok = task._publish(ok, result)
+            task._finished(ok, clock.time() - now)
+            next_t = task._next_due(next_t, clock.time())
+
+    def stats(self):
+        return {name: t.stats() for name, t in self.tasks.items()}
@@ -0,0 +1,8 @@
+# =========================
+# sensor_log 적재 공용 정의 (spool.py 재전송기, ingest.py 게이트웨이 적재기)
+# =========================
+INSERT_SQL = "INSERT INTO sensor_log (device_id, temp, humid, dist, dt) VALUES (%s, %s, %s, %s, %s)"
+
+
+def to_float(v):
+    return None if v is None else float(v)
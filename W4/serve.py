@@ -0,0 +1,153 @@
+# 서비스 모드 실행: 센서 소유 프로세스 1개 + 상태 없는 HTTP 워커 N개
+#
+#   python serve.py all --workers 4 --port 8080    # 소유 프로세스 + 워커를 한 번에 (기본 사용법)
+#   python serve.py owner                          # GPIO/센서/DB 작업만 (HTTP 포트 없음)
+#   python serve.py web --workers 4 --port 8080    # HTTP 워커만 (owner 가 먼저 떠 있어야 함)
+#   gunicorn -w 4 -b 0.0.0.0:8080 web:app          # gunicorn 이 있으면 web 대신 사용 가능
+#
+# - owner: W4_shin 을 import 하는 유일한 프로세스 → GPIO.setup/센서 스레드/DB writer 가 1벌만 존재.
+#          /status 본문을 공유 메모리(--shm)에 게시하고 유닉스 소켓(--socket)으로 제어/히스토리 요청 처리
+# - web  : 미리 열어 둔 리슨 소켓을 fork 한 워커들이 나눠 받음. 워커가 죽으면 다시 띄움
+# 개발 중에는 기존처럼 python W4_shin.py 로 단일 프로세스 실행 가능
+import argparse, logging, os, signal, socket, subprocess, sys, threading, time
+
+import iotlog
+from share import DEFAULT_SHM, DEFAULT_SOCKET
+
+log = logging.getLogger("serve")
+
+# 워커가 소유 프로세스로 넘기는 경로 ("/" 로 끝나면 접두사). /events(SSE) 는 워커가 공유 메모리로 직접 처리
+OWNER_ROUTES = ("/", "/history_data/", "/history_range", "/history/", "/metrics",
+                "/control/", "/set_mode/", "/scheduler", "/fleet", "/d/", "/status",
+                "/actuators")
+
+
+def run_owner(args):
+    import W4_shin as node
+    from share import StatePublisher, OwnerServer
+
+    publisher = StatePublisher(args.shm)
+
+    def publish(snap, delta):
+        tag = node.store.etag(snap)
+        publisher.write(snap.version, tag, node.status_body(snap, tag))
+
+    snap = node.store.snapshot()
+    publish(snap, {})
+    node.store.listen(publish)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *a: stop.set())
+    server = None
+    try:
+        node.start_node()
+        server = OwnerServer(node.app, args.socket, allow=OWNER_ROUTES).start()
+        log.info("owner ready (shm=%s, socket=%s)", args.shm, args.socket)
+        while not stop.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.stop()
+            log.info("owner forwarded %d requests, %d errors", server.requests, server.errors)
+        node.stop_node()
+        publisher.close()
+
+
+def _worker(sock, args):
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    import web
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *a, **kw):
+            pass
+
+    srv = make_server(args.host, args.port, web.app, threaded=True,
+                      request_handler=QuietHandler, fd=sock.fileno())
+    signal.signal(signal.SIGTERM, lambda *a: threading.Thread(target=srv.shutdown).start())
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def run_web(args):
+    os.environ["IOT_SHM"] = args.shm
+    os.environ["IOT_SOCKET"] = args.socket
+    sock = socket.create_server((args.host, args.port), backlog=512)
+    sock.set_inheritable(True)
+
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                _worker(sock, args)
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def shutdown(*a):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for _ in range(args.workers):
+        spawn()
+    log.info("%d workers on %s:%d", args.workers, args.host, args.port)
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            log.warning("worker %d exited, restarting", pid)
+            time.sleep(0.5)
+            spawn()
+    sock.close()
+
+
+def run_all(args):
+    owner = subprocess.Popen([sys.executable, os.path.abspath(__file__), "owner",
+                              "--shm", args.shm, "--socket", args.socket])
+    try:
+        deadline = time.time() + 60
+        while not os.path.exists(args.socket):
+            if owner.poll() is not None or time.time() > deadline:
+                raise SystemExit("[ERROR] owner failed to start")
+            time.sleep(0.2)
+        run_web(args)
+    finally:
+        owner.terminate()
+        owner.wait(15)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="IoT 컨트롤러 서비스 모드 (센서 소유 프로세스 + HTTP 워커)")
+    ap.add_argument("mode", choices=("all", "owner", "web"))
+    ap.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1))
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--shm", default=DEFAULT_SHM, help="/status 공유 메모리 이름")
+    ap.add_argument("--socket", default=DEFAULT_SOCKET, help="소유 프로세스 유닉스 소켓 경로")
+    args = ap.parse_args()
+    iotlog.setup()
+    {"all": run_all, "owner": run_owner, "web": run_web}[args.mode](args)
+
+
+if __name__ == "__main__":
+    main()
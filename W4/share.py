@@ -0,0 +1,264 @@
+import json, logging, os, socket, socketserver, struct, threading, time
+from multiprocessing import shared_memory
+
+log = logging.getLogger(__name__)
+
+# =========================
+# 센서 소유 프로세스 ↔ HTTP 워커 공유 (공유 메모리 + 유닉스 소켓)
+# =========================
+# - /status 본문: 소유 프로세스가 공유 메모리에 기록, 워커는 잠금 없이 읽기 (seqlock)
+# - 나머지 요청(제어/모드/히스토리): 워커가 유닉스 소켓으로 소유 프로세스에 전달
+DEFAULT_SHM = "iot_status"
+DEFAULT_SOCKET = "/tmp/iot_node.sock"
+
+# seq(홀수=쓰는 중), 세그먼트 세대(생성 시각 ns), version, etag 길이, body 길이
+# 세대: 소유 프로세스가 재시작하면 같은 이름으로 새 세그먼트를 만듦 → 워커는 세대가 바뀌면 다시 엶
+_HEADER = struct.Struct("<QQQII")
+_ETAG_MAX = 64
+_CLOSED = 1      # close() 가 남기는 seq (홀수 → 계속 "쓰는 중" 으로 보여 리더가 다시 엶)
+
+
+def _open_shm(name):
+    shm = shared_memory.SharedMemory(name=name)
+    # 3.13 미만은 읽기만 하는 프로세스도 종료 시 세그먼트를 지워버림 → 추적 해제
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+class StatePublisher:
+    """소유 프로세스 쪽. write(version, etag, body) 로 최신 /status 응답을 통째로 교체"""
+
+    def __init__(self, name=DEFAULT_SHM, size=65536):
+        try:
+            old = shared_memory.SharedMemory(name=name)  # 이전 실행이 남긴 세그먼트 정리
+            old.close()
+            old.unlink()
+        except FileNotFoundError:
+            pass
+        self.name = name
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._buf = self.shm.buf
+        self._seq = 0
+        self.generation = time.time_ns()
+        _HEADER.pack_into(self._buf, 0, 0, self.generation, 0, 0, 0)
+        self._lock = threading.Lock()
+        self.writes = 0
+
+    def write(self, version, etag, body):
+        etag = etag.encode()
+        if len(etag) > _ETAG_MAX or _HEADER.size + _ETAG_MAX + len(body) > len(self._buf):
+            raise ValueError("status payload too large for shared segment")
+        with self._lock:
+            buf = self._buf
+            self._seq += 1
+            _HEADER.pack_into(buf, 0, self._seq, self.generation, version, len(etag), len(body))
+            off = _HEADER.size
+            buf[off:off + len(etag)] = etag
+            off += _ETAG_MAX
+            buf[off:off + len(body)] = body
+            self._seq += 1
+            struct.pack_into("<Q", buf, 0, self._seq)
+            self.writes += 1
+
+    def close(self):
+        with self._lock:
+            struct.pack_into("<Q", self._buf, 0, _CLOSED)   # 매핑을 들고 있는 워커에게 종료 알림
+            self._buf = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class StateReader:
+    """워커 쪽. read() → (version, etag, body). 쓰는 중이면 짧게 재시도
+
+    - recheck 초마다 이름으로 세그먼트를 다시 열어 세대를 비교 → 소유 프로세스 재시작 후 새 세그먼트로 교체
+    - max_spins 번 연속으로 일관된 값을 못 읽으면 (종료/비정상 종료로 seq 가 멈춤) 바로 다시 엶
+    - 세그먼트가 없으면 FileNotFoundError, 다시 열어도 읽을 수 없으면 TimeoutError
+    """
+
+    def __init__(self, name=DEFAULT_SHM, recheck=1.0, max_spins=10000):
+        self.name = name
+        self.recheck = recheck
+        self.max_spins = max_spins
+        self.shm = None
+        self.generation = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.reopens = 0
+
+    def _refresh(self, force=False):
+        # 이름으로 열린 현재 세그먼트의 세대가 다르면 교체 (여러 요청 스레드가 함께 호출)
+        with self._lock:
+            now = time.monotonic()
+            if not force and self.shm is not None and now < self._next_check:
+                return
+            self._next_check = now + self.recheck
+            shm = _open_shm(self.name)
+            generation = struct.unpack_from("<Q", shm.buf, 8)[0]
+            if self.shm is not None and generation == self.generation:
+                shm.close()
+                return
+            if self.shm is not None:
+                # 이전 매핑은 닫지 않고 놓기만 함 (읽는 중인 스레드가 다 쓰면 GC 가 닫음)
+                self.reopens += 1
+                log.info("status segment %s reopened (generation %d)", self.name, generation)
+            self.shm, self.generation = shm, generation
+
+    def read(self):
+        self._refresh()
+        for attempt in (0, 1):
+            shm = self.shm
+            buf = shm.buf
+            for _ in range(self.max_spins):
+                seq, _, version, elen, blen = _HEADER.unpack_from(buf, 0)
+                if seq and not seq & 1:
+                    off = _HEADER.size
+                    etag = bytes(buf[off:off + elen])
+                    body = bytes(buf[off + _ETAG_MAX:off + _ETAG_MAX + blen])
+                    if struct.unpack_from("<Q", buf, 0)[0] == seq:
+                        return version, etag.decode(), body
+                self.retries += 1
+                time.sleep(0)
+            if not attempt:
+                self._refresh(force=True)
+        raise TimeoutError(f"status segment {self.name} is not being published")
+
+    def close(self):
+        with self._lock:
+            if self.shm is not None:
+                self.shm.close()
+                self.shm = None
+
+
+# ---- 요청 전달 (워커 → 소유 프로세스) ----
+# 요청: JSON 한 줄 {"method", "path", "query", "headers"}
+# 응답: JSON 한 줄 {"status", "headers", "length"} + 본문 length 바이트
+FORWARD_HEADERS = ("If-None-Match", "If-Modified-Since", "Accept")
+
+
+def _recv_exact(f, n):
+    data = f.read(n)
+    if len(data) != n:
+        raise ConnectionError("owner closed connection")
+    return data
+
+
+class _ForwardHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            req = json.loads(line)
+            status, headers, body = self.server.dispatch(req)
+            head = json.dumps({"status": status, "headers": headers, "length": len(body)})
+            self.wfile.write(head.encode() + b"\n" + body)
+            self.wfile.flush()
+
+
+class OwnerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """소유 프로세스의 Flask 앱으로 워커 요청을 그대로 디스패치 (라우트 로직 재사용).
+
+    allow: 전달을 허용할 경로. "/" 로 끝나면 접두사, 아니면 정확히 일치 (SSE 등 스트림은 제외)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, app, path=DEFAULT_SOCKET, allow=()):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.app = app
+        self._exact = {p for p in allow if not p.endswith("/") or p == "/"}
+        self._prefix = tuple(p for p in allow if p.endswith("/") and p != "/")
+        self.requests = 0
+        self.errors = 0
+        super().__init__(path, _ForwardHandler)
+        os.chmod(path, 0o660)
+        self._thread = None
+
+    def dispatch(self, req):
+        self.requests += 1
+        path = req.get("path", "/")
+        if path not in self._exact and not path.startswith(self._prefix):
+            return 404, [], b""
+        try:
+            with self.app.test_request_context(path, method=req.get("method", "GET"),
+                                               query_string=req.get("query", ""),
+                                               headers=req.get("headers") or {}):
+                resp = self.app.full_dispatch_request()
+                body = resp.get_data()
+            headers = [[k, v] for k, v in resp.headers.items()
+                       if k not in ("Content-Length",) and not k.startswith("Access-Control-")]
+            return resp.status_code, headers, body
+        except Exception as e:
+            self.errors += 1
+            log.error("owner dispatch %s failed: %s", req.get("path"), e)
+            return 500, [], b""
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="owner-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class BadReply(ValueError):
+    """소유 프로세스 응답 형식 오류 (워커는 502)"""
+
+
+class OwnerClient:
+    """워커 쪽 전달 클라이언트. 스레드마다 연결 1개를 유지하고 끊기면 1회 재연결"""
+
+    def __init__(self, path=DEFAULT_SOCKET, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conn(self):
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            c = self._local.conn = (sock, sock.makefile("rb"))
+        return c
+
+    def _drop(self):
+        c = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if c is not None:
+            c[1].close()
+            c[0].close()
+
+    def request(self, method, path, query="", headers=None):
+        """(status, [(name, value)], body) 반환. 연결 실패는 OSError, 응답 형식 오류는 BadReply"""
+        msg = json.dumps({"method": method, "path": path, "query": query,
+                          "headers": headers or {}}).encode() + b"\n"
+        for attempt in (0, 1):
+            try:
+                sock, rfile = self._conn()
+                sock.sendall(msg)
+                line = rfile.readline()
+                if not line:
+                    raise ConnectionError("owner closed connection")
+                head = json.loads(line)
+                body = _recv_exact(rfile, head["length"])
+                return head["status"], head["headers"], body
+            except OSError:
+                self._drop()
+                if attempt:
+                    raise
+            except (ValueError, KeyError, TypeError) as e:
+                self._drop()
+                if attempt:
+                    raise BadReply(f"bad reply from owner: {e!r}") from e
@@ -0,0 +1,230 @@
+import logging, os, sqlite3, threading, time
+from collections import namedtuple
+from datetime import datetime
+
+from schema import INSERT_SQL, to_float
+
+log = logging.getLogger(__name__)
+
+# =========================
+# 로컬 스풀 (SQLite WAL) + MariaDB 재전송기
+# =========================
+# 센서 작업은 항상 로컬 스풀에만 씀 (DB 상태와 무관하게 수십 us)
+# 재전송기가 스풀을 seq 순서로 읽어 MariaDB 에 일괄 INSERT.
+# 정확히 한 번: 배치 INSERT 와 sensor_spool_state.last_seq 갱신을 한 트랜잭션으로 커밋하고,
+# 로컬 삭제(ack)는 그 다음. 커밋 후 ack 전에 죽어도 재시작 시 last_seq 이하 행은 건너뜀
+SpoolRow = namedtuple("SpoolRow", "seq temp humid dist dt")
+
+STATE_SQL = """
+CREATE TABLE IF NOT EXISTS sensor_spool_state(
+    spool_id VARCHAR(32) PRIMARY KEY,
+    last_seq BIGINT NOT NULL DEFAULT 0
+)
+"""
+
+
+def ensure_tables(cur):
+    cur.execute(STATE_SQL)
+
+
+class SensorSpool:
+    """append-only 로컬 버퍼. seq 는 스풀 파일 안에서 단조 증가 (삭제 후에도 재사용 안 함)"""
+
+    def __init__(self, path, max_rows=500000, synchronous="NORMAL"):
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={synchronous}")   # NORMAL: 프로세스 죽어도 보존, FULL: 전원 차단까지
+        self._db.execute("CREATE TABLE IF NOT EXISTS spool("
+                         "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "temp REAL, humid REAL, dist REAL, dt TEXT NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta(key TEXT PRIMARY KEY, value TEXT)")
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'spool_id'").fetchone()
+        if row is None:
+            # 스풀 파일마다 고유 id → 파일을 새로 만들어 seq 가 1부터 다시 시작해도 DB 워터마크와 섞이지 않음
+            self.spool_id = os.urandom(8).hex()
+            self._db.execute("INSERT INTO meta (key, value) VALUES ('spool_id', ?)", (self.spool_id,))
+        else:
+            self.spool_id = row[0]
+        self._count = self._db.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+        self.appended = 0
+        self.acked = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, temp, humid, dist, dt):
+        with self._lock:
+            cur = self._db.execute("INSERT INTO spool (temp, humid, dist, dt) VALUES (?, ?, ?, ?)",
+                                   (temp, humid, dist, dt.isoformat(sep=" ")))
+            self._count += 1
+            self.appended += 1
+            if self._count > self.max_rows:
+                # 디스크 한도: 가장 오래된 행부터 버림
+                n = self._count - self.max_rows
+                self._db.execute("DELETE FROM spool WHERE seq IN (SELECT seq FROM spool ORDER BY seq LIMIT ?)", (n,))
+                self._count -= n
+                self.dropped += n
+            return cur.lastrowid
+
+    def read(self, limit):
+        with self._lock:
+            rows = self._db.execute("SELECT seq, temp, humid, dist, dt FROM spool ORDER BY seq LIMIT ?",
+                                    (limit,)).fetchall()
+        return [SpoolRow(seq, t, h, d, datetime.fromisoformat(dt)) for seq, t, h, d, dt in rows]
+
+    def ack(self, upto_seq):
+        """upto_seq 이하 행 삭제 (DB 커밋이 끝난 뒤 호출)"""
+        with self._lock:
+            n = self._db.execute("DELETE FROM spool WHERE seq <= ?", (upto_seq,)).rowcount
+            self._count -= n
+            self.acked += n
+
+    def close(self):
+        with self._lock:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._db.close()
+
+
+class SpooledLogWriter:
+    """sensor_log 일괄 저장기 (submit/start/stop/flush/stats). 메모리 큐 대신 로컬 스풀 사용.
+
+    - submit(): 스풀에 append 만 (DB 를 기다리지 않음, 프로세스가 죽어도 행 보존)
+    - 재전송 스레드: batch_size 개가 쌓이거나 flush_interval 초마다 DB 로 전송
+    - DB 장애 시 retry_delay 후 재시도, 그 동안 스풀에 계속 쌓임 (max_rows 까지)
+    """
+
+    def __init__(self, spool, connect, release=None, batch_size=50, flush_interval=5.0,
+                 retry_delay=2.0, max_batch=500, on_flush=None, device_id="default"):
+        self.spool = spool
+        self.device_id = device_id      # 스풀 1개 = 장치 1대
+        self._connect = connect
+        self._release = release
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.max_batch = max_batch      # 밀린 행을 따라잡을 때 한 트랜잭션 최대 행 수
+        self.on_flush = on_flush
+
+        self._cond = threading.Condition()
+        self._conn = None
+        self._thread = None
+        self._running = False
+        self._since_flush = 0
+
+        self.written = 0
+        self.duplicates = 0             # 이미 DB 에 있어 건너뛴 행 (ack 전 재시작)
+        self.batches = 0
+        self.errors = 0
+        self.last_error = None
+
+    # ---- 생산자 쪽 ----
+    def submit(self, temp, humid, dist, dt=None):
+        self.spool.append(to_float(temp), to_float(humid), to_float(dist), dt or datetime.now())
+        with self._cond:
+            self._since_flush += 1
+            if self._since_flush >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    # ---- 재전송 스레드 ----
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="spool-drainer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=10.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+        self._close()
+
+    def _write(self, rows):
+        """행 INSERT + 워터마크 갱신을 한 트랜잭션으로. 실제로 넣은 행 수 반환"""
+        if self._conn is None:
+            self._conn = self._connect()
+        cur = self._conn.cursor()
+        try:
+            cur.execute("SELECT last_seq FROM sensor_spool_state WHERE spool_id = %s FOR UPDATE",
+                        (self.spool.spool_id,))
+            r = cur.fetchone()
+            last = r[0] if r else 0
+            fresh = [(self.device_id, row.temp, row.humid, row.dist, row.dt) for row in rows if row.seq > last]
+            if fresh:
+                cur.executemany(INSERT_SQL, fresh)
+            cur.execute("INSERT INTO sensor_spool_state (spool_id, last_seq) VALUES (%s, %s) "
+                        "ON DUPLICATE KEY UPDATE last_seq = GREATEST(last_seq, VALUES(last_seq))",
+                        (self.spool.spool_id, rows[-1].seq))
+            self._conn.commit()
+        except Exception:
+            try:
+                self._conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            cur.close()
+        self.duplicates += len(rows) - len(fresh)
+        return len(fresh)
+
+    def _close(self, broken=False):
+        if self._conn is not None:
+            try:
+                if self._release is not None:
+                    self._release(self._conn, broken=broken)
+                else:
+                    self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def flush(self):
+        """스풀이 빌 때까지 전송. 실패하면 False (행은 스풀에 남음)"""
+        with self._cond:
+            self._since_flush = 0
+        while True:
+            rows = self.spool.read(self.max_batch)
+            if not rows:
+                return True
+            try:
+                n = self._write(rows)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                self._close(broken=True)
+                return False
+            self.spool.ack(rows[-1].seq)
+            self.written += n
+            self.batches += 1
+            if self.on_flush is not None and n:
+                self.on_flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._running and self._since_flush < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                running = self._running
+            if not running:
+                return
+            if not self.flush():
+                log.error("spool drain failed (%d rows pending): %s", len(self.spool), self.last_error)
+                time.sleep(self.retry_delay)
+
+    def stats(self):
+        return dict(pending=len(self.spool), written=self.written, duplicates=self.duplicates,
+                    dropped=self.spool.dropped, batches=self.batches, errors=self.errors,
+                    last_error=self.last_error)
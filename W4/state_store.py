@@ -0,0 +1,86 @@
+import logging, os, threading
+from collections.abc import Mapping
+
+log = logging.getLogger(__name__)
+
+# =========================
+# 버전 관리되는 공유 상태 저장소 (copy-on-write)
+# =========================
+
+
+class Snapshot(Mapping):
+    """읽기 전용 상태 스냅샷. snap["temperature"] 또는 snap.temperature 로 조회"""
+
+    __slots__ = ("_data", "version")
+
+    def __init__(self, data, version):
+        self._data = data
+        self.version = version
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self):
+        return f"Snapshot(v{self.version}, {self._data!r})"
+
+
+class StateStore:
+    """센서 작업/터치/HTTP 핸들러가 함께 쓰는 상태.
+
+    - 쓰기: 잠금 안에서 새 dict 를 만들어 통째로 교체 (값이 같으면 버전 유지)
+    - 읽기: 현재 스냅샷 참조를 그대로 가져감 → 잠금 없음, 항상 한 시점의 일관된 값
+    - version 은 변경마다 1씩 증가, epoch 는 프로세스 시작마다 새로 생성 (ETag 충돌 방지)
+    - listen(cb) 로 등록한 콜백은 변경 순서대로 cb(snapshot, delta) 호출
+    """
+
+    def __init__(self, **initial):
+        self.epoch = os.urandom(4).hex()
+        self._lock = threading.Lock()
+        self._snap = Snapshot(dict(initial), 0)
+        self._listeners = []
+
+    def snapshot(self):
+        return self._snap
+
+    def etag(self, snap=None):
+        snap = snap or self._snap
+        return f"{self.epoch}-{snap.version}"
+
+    def listen(self, callback):
+        self._listeners.append(callback)
+
+    def update(self, **changes):
+        with self._lock:
+            return self._apply(changes)
+
+    def update_with(self, fn):
+        """fn(현재 스냅샷) → 변경 dict. 읽고-고치고-쓰기를 원자적으로 (예: 모드 토글)"""
+        with self._lock:
+            return self._apply(fn(self._snap) or {})
+
+    def _apply(self, changes):
+        cur = self._snap
+        delta = {k: v for k, v in changes.items() if k not in cur._data or cur._data[k] != v}
+        if not delta:
+            return cur
+        data = dict(cur._data)
+        data.update(delta)
+        snap = self._snap = Snapshot(data, cur.version + 1)
+        for cb in self._listeners:
+            try:
+                cb(snap, delta)
+            except Exception:
+                log.exception("state listener failed")
+        return snap
@@ -0,0 +1,37 @@
+# W4 노드 테스트 공용 설정: 하드웨어 없이 시뮬레이터 백엔드로 W4_shin 을 import
+#   W4 폴더에서 실행: python -m pytest -q tests
+# MariaDB 커넥터가 없으면 tests/stubs 의 대역을 사용 (실제 DB 연결은 어느 테스트도 하지 않음)
+import os, sys, tempfile
+
+import pytest
+
+W4 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubs")
+sys.path.insert(0, W4)
+
+try:
+    import mariadb  # noqa: F401
+    _paths = [W4]
+except ImportError:
+    sys.path.insert(0, STUBS)
+    _paths = [W4, STUBS]
+
+os.environ.setdefault("IOT_BACKEND", "sim")
+os.environ.setdefault("IOT_LOG_LEVEL", "WARNING")
+os.environ.setdefault("IOT_SPOOL", os.path.join(tempfile.mkdtemp(prefix="iot-spool-"), "sensor_log.db"))
+
+
+def subprocess_env(**extra):
+    """W4_shin 을 별도 프로세스로 import 할 때의 환경 (스풀은 새 임시 파일)"""
+    env = dict(os.environ, IOT_SPOOL=os.path.join(tempfile.mkdtemp(prefix="iot-spool-"), "sensor_log.db"),
+               **extra)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, _paths + [env.get("PYTHONPATH")]))
+    return env
+
+
+@pytest.fixture(scope="session")
+def node():
+    """W4_shin 모듈 (Flask 가 없으면 이 fixture 를 쓰는 테스트만 건너뜀)"""
+    pytest.importorskip("flask")
+    import W4_shin
+    return W4_shin
@@ -0,0 +1,14 @@
+# 테스트용 mariadb 대역: 커넥터가 설치되지 않은 환경에서 db_pool/W4_shin 을 import 만 할 수 있게.
+# 테스트는 실제 DB 에 연결하지 않음 (DB 가 필요한 곳은 connect= 로 가짜 커넥션을 넘김)
+
+
+class Error(Exception):
+    pass
+
+
+class OperationalError(Error):
+    pass
+
+
+def connect(**config):
+    raise OperationalError("mariadb connector is not installed (test stub)")
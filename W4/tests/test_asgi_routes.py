@@ -0,0 +1,67 @@
+# ASGI 앱(asgi_app.py)이 Flask 앱과 같은 경로를 모두 처리하는지
+import asyncio, json, re
+
+import pytest
+
+pytest.importorskip("flask")
+import asgi_app  # noqa: E402
+import W4_shin as node  # noqa: E402
+
+SAMPLE = {"device_id": node.DEVICE_ID, "metric": "temp"}
+
+
+def sample_path(rule):
+    # /d/<device_id>/control/<int:led_id>/<int:state> → /d/room-101/control/1/1
+    return re.sub(r"<(?:(\w+):)?(\w+)>",
+                  lambda m: "1" if m.group(1) == "int" else SAMPLE[m.group(2)], rule)
+
+
+def call(path, query=b""):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(msg):
+        sent.append(msg)
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": query, "headers": []}
+    asyncio.run(asgi_app.app(scope, receive, send))
+    return sent[0]["status"], sent[1]["body"]
+
+
+def test_every_flask_route_has_an_asgi_route():
+    missing = []
+    for rule in node.app.url_map.iter_rules():
+        if rule.endpoint == "static":
+            continue
+        path = sample_path(rule.rule)
+        if not any(pattern.fullmatch(path) for pattern, _, _ in asgi_app.ROUTES):
+            missing.append(rule.rule)
+    assert missing == []
+
+
+def test_asgi_history_range_and_page_match_flask():
+    c = node.app.test_client()
+    for path, query in (("/history_range", b"metric=bogus"), ("/history/temp", b"view=chart"),
+                        ("/history/nope", b"")):
+        code, body = call(path, query)
+        flask = c.get(path + "?" + query.decode())
+        assert code == flask.status_code, path
+        if flask.is_json:
+            assert json.loads(body) == flask.get_json()
+
+
+def test_asgi_metrics_use_flask_route_labels():
+    assert ({rule for _, rule, _ in asgi_app.ROUTES}
+            == {r.rule for r in node.app.url_map.iter_rules() if r.endpoint != "static"})
+    for pattern, rule, _ in asgi_app.ROUTES:
+        assert pattern.fullmatch(sample_path(rule)), rule
+
+    def count(route, code):
+        return node.HTTP_RESPONSES.labels(route, code).value
+
+    before = count("/history/<metric>", 404), count("unmatched", 404)
+    assert call("/history/nope")[0] == 404
+    assert call("/no/such/path")[0] == 404
+    assert (count("/history/<metric>", 404), count("unmatched", 404)) == (before[0] + 1, before[1] + 1)
@@ -0,0 +1,75 @@
+# 터치 버튼: 채터링은 debounce 로 한 번만, 짧게 두 번 누르면 double, 오래 누르면 long
+import threading, time
+
+from buttons import Button
+
+MS = 1_000_000
+
+
+class Clock:
+    speed = 1.0
+
+    def __init__(self):
+        self.now = 0
+
+    def perf_counter_ns(self):
+        return self.now
+
+
+class GPIO:
+    LOW, HIGH, BOTH = 0, 1, 33
+
+    def __init__(self):
+        self.level = self.HIGH          # active-low: 떼어 있음
+        self.callback = None
+
+    def input(self, pin):
+        return self.level
+
+    def add_event_detect(self, pin, edge, callback=None):
+        self.callback = callback
+
+    def remove_event_detect(self, pin):
+        self.callback = None
+
+
+def make(**kw):
+    gpio, clock = GPIO(), Clock()
+    btn = Button(gpio, 6, clock, **kw).start()
+    events = []
+    for kind in ("press", "release", "click", "double", "long"):
+        btn.on(kind, lambda ev: events.append(ev.kind))
+
+    def edge(level, at_ms):
+        clock.now, gpio.level = at_ms * MS, level
+        gpio.callback(6)
+    return btn, edge, events
+
+
+def test_bounces_inside_debounce_are_one_press():
+    btn, edge, events = make(debounce=0.03, long_press=0, double_tap=0)
+    edge(GPIO.LOW, 0)
+    edge(GPIO.HIGH, 5)                  # 채터링
+    edge(GPIO.LOW, 10)
+    time.sleep(0.1)                     # debounce 구간 끝 → 레벨 재확인 (여전히 눌림)
+    edge(GPIO.HIGH, 200)
+    assert events == ["press", "release", "click"]
+    assert btn.stats()["bounces"] == 2
+
+
+def test_second_click_within_double_tap_is_double():
+    btn, edge, events = make(debounce=0.01, long_press=0, double_tap=0.4)
+    for t in (0, 100, 300, 400):
+        edge(GPIO.LOW if t in (0, 300) else GPIO.HIGH, t)
+    assert events == ["press", "release", "click", "press", "release", "click", "double"]
+
+
+def test_long_press_fires_while_held_and_suppresses_click():
+    btn, edge, events = make(debounce=0.01, long_press=0.05)
+    got = threading.Event()
+    btn.on("long", lambda ev: got.set())
+    edge(GPIO.LOW, 0)
+    assert got.wait(2)
+    edge(GPIO.HIGH, 1000)
+    assert events == ["press", "long", "release"]
+    btn.stop()
@@ -0,0 +1,15 @@
+# 설정별 공용 풀: 같은 설정이면 같은 풀, 옵션이 다르면 조용히 무시하지 않고 ValueError
+import pytest
+
+from db_pool import get_pool
+
+
+def test_get_pool_rejects_conflicting_options():
+    config = dict(user="u", host="test-get-pool", database="IOT")
+    pool = get_pool(config, max_size=3, connect=object)
+    assert get_pool(config) is pool
+    assert get_pool(dict(config), max_size=3) is pool
+    with pytest.raises(ValueError, match="max_size"):
+        get_pool(config, max_size=7)
+    pool.close()
+    assert get_pool(config, max_size=7).max_size == 7    # 닫힌 풀은 새로 만듦
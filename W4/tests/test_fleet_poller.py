@@ -0,0 +1,79 @@
+# fleet 폴링 커서: 작은 id 가 늦게 커밋돼도 원격 장치 상태에 반영되는지
+import time
+import types
+
+import fleet as fleet_mod
+from fleet import Fleet, FleetPoller
+
+
+class LogDB:
+    """sensor_log 의 커밋된 행만 흉내 내는 DB (id > / id IN 조회)"""
+
+    def __init__(self):
+        self.rows = {}
+        self._rows = []
+
+    def add(self, id_, device_id, temp):
+        self.rows[id_] = (id_, device_id, 1000.0 + id_, temp, 50.0, 100.0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, args=()):
+        if sql.startswith("SELECT MAX(id)"):
+            self._rows = [(max(self.rows, default=None),)]
+        elif "WHERE id IN" in sql:
+            self._rows = [self.rows[i] for i in sorted(args) if i in self.rows]
+        elif "WHERE id >" in sql:
+            last, limit = args
+            self._rows = [self.rows[i] for i in sorted(self.rows) if i > last][:limit]
+        else:
+            self._rows = []
+
+    def fetchone(self):
+        return self._rows[0]
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+def poller(db, monkeypatch, now, **kw):
+    monkeypatch.setattr(fleet_mod, "time", types.SimpleNamespace(monotonic=lambda: now[0], time=time.time))
+    fl = Fleet()
+    p = FleetPoller(lambda: db, fl, **kw)
+    p.last_id = 0                      # warm() 생략
+    return p, fl
+
+
+def test_late_commit_in_gap_is_observed(monkeypatch):
+    db, now = LogDB(), [0.0]
+    p, fl = poller(db, monkeypatch, now)
+    db.add(1, "a", 20.0)
+    db.add(3, "a", 22.0)               # id 2 (장치 b) 는 아직 커밋 전
+    assert p.poll() == 2 and p.last_id == 3 and p.stats()["gaps"] == 1
+    now[0] += 5
+    db.add(2, "b", 30.0)
+    assert p.poll() == 1
+    assert fl.get("b").store.snapshot().temperature == 30.0
+    assert p.stats()["gaps"] == 0 and p.rows == 3
+
+
+def test_gap_is_dropped_after_commit_window(monkeypatch):
+    db, now = LogDB(), [0.0]
+    p, fl = poller(db, monkeypatch, now, commit_window=30.0, batch=2)
+    db.add(1, "a", 20.0)
+    db.add(4, "a", 22.0)
+    db.add(5, "a", 23.0)
+    assert p.poll() == 3 and p.stats()["gaps"] == 2
+    now[0] += 31                       # 롤백된 번호 → 포기
+    assert p.poll() == 0 and p.stats()["gaps"] == 0
+    assert sorted(d.device_id for d in fl.devices()) == ["a"]
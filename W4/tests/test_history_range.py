@@ -0,0 +1,26 @@
+# /history_range 인자 검증: 잘못된 시각/방법은 500 이 아니라 400
+from datetime import datetime
+
+import pytest
+
+from downsample import parse_time
+
+
+@pytest.mark.parametrize("value", ["inf", "-inf", "nan", "1e20", "-1", "0001-01-01", "yesterday"])
+def test_parse_time_rejects_bad_values(value):
+    with pytest.raises(ValueError):
+        parse_time(value)
+
+
+def test_parse_time_accepts_epoch_and_iso():
+    assert parse_time("1700000000") == datetime.fromtimestamp(1700000000)
+    assert parse_time("2024-05-01T12:00:00Z") == datetime(2024, 5, 1, 12)
+    assert parse_time("", "default") == "default"
+
+
+@pytest.mark.parametrize("query", ["from=inf", "to=1e20", "from=nan", "to=0001-01-01",
+                                   "method=bogus", "method="])
+def test_history_range_bad_args_are_400(node, query):
+    resp = node.app.test_client().get("/history_range?metric=temp&" + query)
+    assert resp.status_code == 400
+    assert "error" in resp.get_json()
@@ -0,0 +1,108 @@
+# 게이트웨이 적재기: (device_id, stream) 워터마크로 재전송/옛 스풀 배치가 중복 저장되지 않는지
+import gzip, json, time
+
+import pytest
+
+from ingest import MAX_INFLATED, BadBatch, BulkLoader, decode_batch, encode_batch
+
+
+class StateDB:
+    """ingest_state 와 sensor_log INSERT 만 흉내 내는 커넥션"""
+
+    def __init__(self):
+        self.state = {}           # (device_id, stream) → last_seq
+        self.log = []
+        self._rows = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, args=()):
+        assert sql.startswith("SELECT device_id, stream, last_seq FROM ingest_state")
+        self._rows = [(d, s, last) for (d, s), last in self.state.items() if d in args]
+
+    def executemany(self, sql, rows):
+        if "INTO sensor_log" in sql:
+            self.log += rows
+        else:
+            for dev, stream, seq in rows:
+                self.state[dev, stream] = max(self.state.get((dev, stream), 0), seq)
+
+    def fetchall(self):
+        return self._rows
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Pool:
+    def __init__(self, db):
+        self.db = db
+
+    def acquire(self):
+        return self.db
+
+    def release(self, conn, broken=False):
+        pass
+
+
+def batch(stream, seqs, temp=21.5):
+    now = time.time()
+    rows = [[s, now - 60 + s, temp, 40.0, 120.0] for s in seqs]
+    return decode_batch(encode_batch("room-1", stream, rows), "gzip")
+
+
+def test_stale_stream_retry_does_not_rewind_watermark():
+    db = StateDB()
+    loader = BulkLoader(Pool(db))
+    assert loader._write([batch("old", [1, 2, 3])])   # 옛 스풀
+    new = batch("new", [1, 2])
+    assert loader._write([new])[id(new)]["accepted"] == 2
+    retry = batch("old", [2, 3])                        # 스풀 교체 후 늦게 도착한 재전송
+    assert loader._write([retry])[id(retry)]["duplicates"] == 2
+    again = batch("new", [1, 2, 3])
+    res = loader._write([again])[id(again)]
+    assert (res["accepted"], res["duplicates"], res["acked"]) == (1, 2, 3)
+    assert len(db.log) == 6 and db.state == {("room-1", "old"): 3, ("room-1", "new"): 3}
+
+
+def test_rows_follow_insert_column_order():
+    db = StateDB()
+    BulkLoader(Pool(db))._write([batch("s", [1], temp=22.0)])
+    device_id, temp, humid, dist, dt = db.log[0]
+    assert (device_id, temp, humid, dist) == ("room-1", 22.0, 40.0, 120.0)
+    assert abs(dt.timestamp() - (time.time() - 59)) < 5
+
+
+def test_decode_batch_validates_and_normalises_rows():
+    now = 1_800_000_000
+    rows = [[3, now - 10, 21.0, 40.0, 120.0],
+            [1, now - 30, 99.0, None, -5.0],          # 범위 밖 값 → null
+            [2, now - 40 * 86400, 20.0, 40.0, 100.0],  # 보존 기간 밖 → 버리지만 acked 에는 포함
+            [3, now - 5, 22.0, 41.0, 121.0]]           # 같은 seq 는 마지막 값
+    b = decode_batch(encode_batch("room-1", "s1", rows), "gzip", now=now)
+    assert [r[0] for r in b.rows] == [1, 3]
+    assert b.rows[0][2:] == (None, None, None) and b.rows[1][2] == 22.0
+    assert (b.max_seq, b.clamped, b.dropped) == (3, 2, 1)
+
+
+@pytest.mark.parametrize("doc", [
+    {"device_id": "bad id!", "stream": "s", "rows": []},
+    {"device_id": "room-1", "stream": "s", "rows": [[0, 1, None, None, None]]},
+    {"device_id": "room-1", "stream": "s", "rows": [[1, "x", None, None, None]]},
+    {"device_id": "room-1", "stream": "s", "rows": [[1, time.time(), True, None, None]]},
+    {"device_id": "room-1", "stream": "s", "rows": [[1, time.time()]]},
+    [],
+])
+def test_decode_batch_rejects_malformed_uploads(doc):
+    with pytest.raises(BadBatch):
+        decode_batch(json.dumps(doc).encode())
+
+
+def test_decode_batch_rejects_gzip_bomb():
+    body = gzip.compress(b" " * (MAX_INFLATED + 1))
+    with pytest.raises(BadBatch, match="inflated"):
+        decode_batch(body, "gzip")
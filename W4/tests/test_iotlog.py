@@ -0,0 +1,24 @@
+# 중복/빈도 필터는 WARNING 이상만: 반복되는 INFO (출력 전환, 모드 변경) 는 모두 남아야 함
+import logging
+
+from iotlog import DedupFilter, RateLimitFilter
+
+
+def record(level, msg, created):
+    r = logging.LogRecord("node", level, __file__, 0, msg, None, None)
+    r.created = created
+    return r
+
+
+def test_dedup_keeps_repeated_info():
+    f = DedupFilter(window=60.0)
+    assert all(f.filter(record(logging.INFO, "웹 모드 → AUTO", t)) for t in range(5))
+    assert [f.filter(record(logging.WARNING, "DHT: Checksum", t)) for t in range(3)] == [True, False, False]
+    assert f.suppressed == 2
+
+
+def test_rate_limit_only_applies_to_warnings():
+    f = RateLimitFilter(rate=1.0, burst=2)
+    assert all(f.filter(record(logging.INFO, f"aircon → ON {i}", 0.0)) for i in range(10))
+    assert [f.filter(record(logging.ERROR, f"db {i}", 0.0)) for i in range(3)] == [True, True, False]
+    assert f.limited == 1
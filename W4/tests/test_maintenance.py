@@ -0,0 +1,84 @@
+# 관리 작업 담당자 선출: 같은 DB 를 쓰는 여러 노드 중 한 곳만 집계/보존/fleet 폴링을 돌리는지
+from maintenance import MaintenanceLeader
+
+
+class LockServer:
+    """GET_LOCK / IS_USED_LOCK / RELEASE_LOCK 만 흉내 내는 DB (세션 = 커넥션)"""
+
+    def __init__(self):
+        self.owner = {}
+        self.next_id = 0
+
+
+class Conn:
+    def __init__(self, server):
+        server.next_id += 1
+        self.server, self.id, self.closed = server, server.next_id, False
+        self._row = None
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, args):
+        if self.closed:
+            raise RuntimeError("connection closed")
+        owner, name = self.server.owner, args[0]
+        if sql.startswith("SELECT GET_LOCK"):
+            got = owner.setdefault(name, self.id) == self.id
+            self._row = (int(got),)
+        elif sql.startswith("SELECT IS_USED_LOCK"):
+            self._row = (int(owner.get(name) == self.id),)
+        elif sql.startswith("SELECT RELEASE_LOCK"):
+            self._row = (int(owner.pop(name, None) == self.id),)
+
+    def fetchone(self):
+        return self._row
+
+    def close(self):
+        pass
+
+    def kill(self):
+        # 서버가 세션을 끊으면 그 세션의 잠금도 풀림
+        self.closed = True
+        if self.server.owner.get("iot_maintenance") == self.id:
+            del self.server.owner["iot_maintenance"]
+
+
+class Pool:
+    def __init__(self, server):
+        self.server = server
+
+    def acquire(self):
+        return Conn(self.server)
+
+    def release(self, conn, broken=False):
+        if broken:
+            conn.kill()
+
+
+def node(server, running):
+    name = f"n{len(running)}"
+    running[name] = False
+    return MaintenanceLeader(Pool(server), lambda: running.__setitem__(name, True),
+                             lambda: running.__setitem__(name, False))
+
+
+def test_only_one_node_runs_maintenance():
+    server, running = LockServer(), {}
+    nodes = [node(server, running) for _ in range(3)]
+    for _ in range(2):
+        assert [n.check() for n in nodes] == [True, False, False]
+    assert list(running.values()) == [True, False, False]
+
+
+def test_leader_failover_and_clean_stop():
+    server, running = LockServer(), {}
+    a, b = node(server, running), node(server, running)
+    assert a.check() and not b.check()
+    a._conn.kill()                      # 담당 노드의 DB 세션이 끊김
+    assert not a.check()                # 잠금 확인 실패 → 작업 중지
+    assert running["n0"] is False
+    assert b.check() and running["n1"]
+    b.stop()                            # 정상 종료는 잠금 반납 → 바로 다른 쪽이 담당
+    assert running["n1"] is False
+    assert a.check() and running["n0"]
@@ -0,0 +1,29 @@
+# NumPy 가 없는 노드: columnar 를 import 해도 실패하지 않고 W4_shin 은 행 단위 경로로 응답
+import subprocess, sys, textwrap
+
+import pytest
+
+from conftest import W4, subprocess_env
+
+pytest.importorskip("flask")
+
+SCRIPT = textwrap.dedent("""
+    import sys
+    sys.modules["numpy"] = None          # import numpy → ImportError
+    import columnar
+    assert columnar.np is None
+    import W4_shin as node
+    node.db_insert(21.5, 40.0, 100.0)
+    r = node.app.test_client().get("/history_data/temp?n=1")
+    assert r.status_code == 200, r.status_code
+    assert r.get_json()[0]["value"] == 21.5
+    print("ok")
+""")
+
+
+def test_node_imports_without_numpy():
+    env = subprocess_env()
+    proc = subprocess.run([sys.executable, "-c", SCRIPT], cwd=W4, env=env,
+                          capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip().endswith("ok")
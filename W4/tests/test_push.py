@@ -0,0 +1,45 @@
+# 상태 푸시: 바뀐 키만 보내고, 느린 구독자는 키별 최신값으로 합치고, 멈춘 구독자는 끊는지
+from push import Broadcaster
+
+
+def test_only_changed_keys_are_pushed():
+    b = Broadcaster(min_interval=0)
+    b.publish(temperature=22.0, humidity=40.0)
+    sub = b.subscribe()
+    assert sub.get(0) == {"temperature": 22.0, "humidity": 40.0}    # 첫 이벤트는 전체 상태
+    assert b.publish(temperature=22.0, humidity=40.0) is False
+    assert b.publish(temperature=22.5, humidity=40.0) is True
+    assert sub.get(0) == {"temperature": 22.5}
+    assert sub.get(0) is None
+
+
+def test_slow_subscriber_gets_latest_value_per_key():
+    b = Broadcaster(min_interval=0)
+    sub = b.subscribe()
+    sub.get(0)
+    for d in (30.0, 20.0, 10.0):
+        b.publish(distance=d)
+    b.publish(led_status=[1, 0, 0])
+    assert sub.get(0) == {"distance": 10.0, "led_status": [1, 0, 0]}
+    assert b.stats()["coalesced"] == 2
+
+
+def test_client_limit_and_stalled_subscriber():
+    b = Broadcaster(max_clients=1, max_lag=60.0)
+    sub = b.subscribe()
+    assert b.subscribe() is None
+    sub.last_drain -= 61                 # 60초 넘게 받아가지 않음
+    b.publish(temperature=1.0)
+    assert sub.closed and b.stats()["clients"] == 0 and b.dropped_clients == 1
+    assert b.subscribe() is not None
+
+
+def test_stream_formats_sse_events():
+    b = Broadcaster(min_interval=0)
+    b.publish(auto_mode=True)
+    sub = b.subscribe()
+    gen = b.stream(sub)
+    assert next(gen) == "retry: 3000\n\n"
+    assert next(gen) == 'id: 1\ndata: {"auto_mode":true}\n\n'
+    gen.close()
+    assert sub.closed
@@ -0,0 +1,82 @@
+# 보존 정책: 집계 워터마크가 지나가지 않은 만료 파티션은 지우지 않는지 (require_rollup)
+import csv, gzip, re
+from datetime import date
+
+from retention import RetentionManager
+
+TODAY = date(2026, 3, 1)
+
+
+class PartDB:
+    """일 단위 파티션과 rollup_state 만 흉내 내는 DB"""
+
+    def __init__(self, parts, last_id):
+        self.parts = parts          # 파티션 이름 → [id, ...]
+        self.last_id = last_id
+        self.description = [("id",), ("temp",)]
+        self.rowcount = 0
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, args=()):
+        part = re.search(r"PARTITION \((\w+)\)", sql)
+        if "information_schema.PARTITIONS" in sql:
+            self._rows = [(name,) for name in self.parts]
+        elif sql.startswith("SELECT MAX(id)"):
+            self._rows = [(max(self.parts[part.group(1)], default=None),)]
+        elif sql.startswith("SELECT last_id"):
+            self._rows = [(self.last_id,)]
+        elif sql.startswith("SELECT *"):
+            self._rows = [(i, 20.0) for i in self.parts[part.group(1)]]
+        elif "DROP PARTITION" in sql:
+            del self.parts[sql.split()[-1]]
+        else:
+            self._rows = []
+
+    def fetchone(self):
+        return self._rows[0]
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchmany(self, n):
+        out, self._rows = self._rows[:n], self._rows[n:]
+        return out
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def parts():
+    return {"p20260101": [1, 2, 3], "p20260102": [4, 5, 6], "p20260301": [7], "pmax": []}
+
+
+def test_partition_past_rollup_watermark_is_kept(tmp_path):
+    db = PartDB(parts(), last_id=4)
+    rm = RetentionManager(lambda: db, keep_days=30, future_days=0, archive_dir=str(tmp_path))
+    res = rm.run_once(TODAY)
+    assert res["dropped"] == ["p20260101"] and res["skipped"] == ["p20260102"]
+    with gzip.open(res["archived"][0], "rt") as f:
+        assert [r[0] for r in csv.reader(f)] == ["id", "1", "2", "3"]
+
+    db.last_id = 6                         # 집계가 따라잡은 뒤 다음 회차에 정리
+    assert rm.run_once(TODAY)["dropped"] == ["p20260102"]
+    assert list(db.parts) == ["p20260301", "pmax"]
+
+
+def test_without_require_rollup_expired_partitions_are_dropped(tmp_path):
+    db = PartDB(parts(), last_id=0)
+    rm = RetentionManager(lambda: db, keep_days=30, future_days=0, archive_dir=str(tmp_path),
+                          require_rollup=False)
+    assert rm.run_once(TODAY)["dropped"] == ["p20260101", "p20260102"]
@@ -0,0 +1,73 @@
+# 증분 집계 워터마크: 작은 id 가 늦게 커밋돼도 집계에서 빠지지 않는지
+import types
+
+import rollup
+
+
+class LogDB:
+    """sensor_log 의 커밋된 id 와 rollup_state 만 흉내 내는 DB"""
+
+    def __init__(self):
+        self.committed = set()
+        self.last_id = 0
+        self.rolled = []          # 1분 테이블에 합산된 id (중복 합산 확인용으로 list)
+        self._row = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, args=()):
+        sql = sql.strip()
+        if sql.startswith("SELECT MAX(id)"):
+            self._row = (max(self.committed, default=None),)
+        elif sql.startswith("SELECT last_id"):
+            self._row = (self.last_id,)
+        elif sql.startswith("INSERT INTO sensor_log_1m"):
+            lo, hi = args
+            self.rolled += sorted(i for i in self.committed if lo < i <= hi)
+        elif sql.startswith("UPDATE rollup_state"):
+            self.last_id = args[0]
+
+    def fetchone(self):
+        return self._row
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def manager(db, monkeypatch, now, **kw):
+    monkeypatch.setattr(rollup, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return rollup.RollupManager(lambda: db, **kw)
+
+
+def test_late_commit_below_watermark_is_rolled_up(monkeypatch):
+    db, now = LogDB(), [100.0]
+    mgr = manager(db, monkeypatch, now, commit_window=30.0)
+    db.committed |= {1, 2, 4}          # id 3 은 아직 커밋 전 (다른 writer 의 트랜잭션)
+    assert mgr.catch_up() == 0          # 방금 본 MAX(id) 는 아직 안전하지 않음
+    now[0] += 10
+    db.committed.add(3)
+    now[0] += 21
+    db.committed.add(5)
+    mgr.catch_up()
+    assert db.rolled == [1, 2, 3, 4] and db.last_id == 4
+    now[0] += 30
+    mgr.catch_up()
+    assert db.rolled == [1, 2, 3, 4, 5]
+
+
+def test_zero_window_rolls_up_immediately(monkeypatch):
+    db, now = LogDB(), [0.0]
+    mgr = manager(db, monkeypatch, now, commit_window=0, chunk=2)
+    db.committed |= {1, 2, 3, 4, 5}
+    assert mgr.catch_up() == 5
+    assert db.rolled == [1, 2, 3, 4, 5] and mgr.stats()["rows_rolled"] == 5
@@ -0,0 +1,49 @@
+# AUTO 규칙 엔진: 히스테리시스, 최소 유지 시간(보류 후 적용), 그룹 우선순위
+import pytest
+
+from rules import Rule, RuleEngine
+
+AIRCON = dict(name="aircon", output=0, input="temperature", on_above=25, deadband=1.0, group="hvac", priority=2)
+HEATER = dict(name="heater", output=1, input="temperature", on_below=18, deadband=1.0, group="hvac", priority=1)
+
+
+def test_hysteresis_holds_inside_deadband():
+    eng = RuleEngine.from_config([AIRCON], outputs=1)
+    assert eng.evaluate({"temperature": 24.9}, 0) == []
+    assert eng.evaluate({"temperature": 25.0}, 1) == [(0, True)]
+    assert eng.evaluate({"temperature": 24.2}, 2) == []          # 25 - 1 이상 → 유지
+    assert eng.evaluate({"temperature": 24.5}, 3) == []
+    assert eng.evaluate({"temperature": 23.9}, 4) == [(0, False)]
+    assert eng.evaluate({"temperature": 24.9}, 5) == []          # 꺼진 뒤에는 다시 25 이상이어야 켬
+    assert eng.outputs() == (0,)
+
+
+def test_min_on_defers_switch_until_dwell_passes():
+    eng = RuleEngine.from_config([dict(AIRCON, min_on=10, min_off=5)], outputs=1)
+    assert eng.evaluate({"temperature": 26}, 100) == [(0, True)]
+    assert eng.evaluate({"temperature": 20}, 103) == []           # 켠 지 3초 → 보류
+    assert eng.stats()["pending"] == [0] and eng.blocked == 1
+    assert eng.evaluate({"temperature": 20}, 109) == []           # 입력이 그대로여도 보류 중인 출력은 다시 확인
+    assert eng.evaluate({}, 110) == [(0, False)]
+    assert eng.evaluate({"temperature": 26}, 112) == []           # min_off 5초
+    assert eng.evaluate({}, 115) == [(0, True)]
+
+
+def test_pending_switch_is_cancelled_when_input_returns():
+    eng = RuleEngine.from_config([dict(AIRCON, min_on=10)], outputs=1)
+    eng.evaluate({"temperature": 26}, 0)
+    assert eng.evaluate({"temperature": 20}, 2) == []
+    assert eng.evaluate({"temperature": 25.5}, 4) == []           # 다시 켜야 하는 값 → 보류 취소
+    assert eng.evaluate({}, 20) == [] and eng.stats()["pending"] == []
+
+
+def test_group_priority_blocks_lower_rule():
+    cold_aircon = dict(AIRCON, input="humidity", on_above=60)      # 다른 입력으로 켜지는 상위 규칙
+    eng = RuleEngine.from_config([cold_aircon, HEATER], outputs=2)
+    assert eng.evaluate({"humidity": 70, "temperature": 15}, 0) == [(0, True)]
+    assert eng.evaluate({"humidity": 50}, 1) == [(0, False), (1, True)]
+
+
+def test_rule_needs_exactly_one_threshold():
+    with pytest.raises(ValueError):
+        Rule("bad", 0, "temperature")
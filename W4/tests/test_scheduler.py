@@ -0,0 +1,65 @@
+# 센서 스케줄러: 재시도는 retry_on/deadline 안에서만, 밀린 주기는 건너뛰고, publish 실패는 오류로
+from scheduler import SensorScheduler, SensorTask
+
+
+class Clock:
+    speed = 1.0
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, s):
+        self.slept.append(s)
+        self.now += s
+
+
+def flaky(failures, exc=RuntimeError):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise exc("Checksum did not validate")
+        return 21.0
+    return fn, calls
+
+
+def test_retries_until_success():
+    clock = Clock()
+    fn, calls = flaky(2)
+    task = SensorTask("dht", fn, period=2.2, retries=2, retry_delay=0.2, retry_on=(RuntimeError,))
+    assert SensorScheduler(clock)._call(task, clock.time()) == (True, 21.0)
+    assert len(calls) == 3 and task.retried == 2 and clock.slept == [0.2, 0.2]
+
+
+def test_retry_stops_at_deadline_and_ignores_other_errors():
+    clock = Clock()
+    fn, calls = flaky(5)
+    task = SensorTask("dht", fn, period=2.2, deadline=0.5, retries=5, retry_delay=0.2)
+    assert SensorScheduler(clock)._call(task, clock.time()) == (False, None)
+    assert len(calls) == 3                  # 0.2 + 0.2, 세 번째 재시도는 deadline 초과
+    fn, calls = flaky(1, exc=ValueError)
+    task = SensorTask("dht", fn, period=2.2, retries=2, retry_on=(RuntimeError,))
+    assert SensorScheduler(clock)._call(task, clock.time()) == (False, None)
+    assert len(calls) == 1 and task.last_error.startswith("ValueError")
+
+
+def test_next_due_skips_missed_periods():
+    task = SensorTask("distance", lambda: 0, period=0.1)
+    assert round(task._next_due(10.0, 10.05), 6) == 10.1
+    assert round(task._next_due(10.0, 10.55), 6) == 10.5
+    assert task.skipped == 4
+
+
+def test_publish_failure_counts_as_error():
+    def publish(v):
+        raise KeyError("slot")
+
+    task = SensorTask("dht", lambda: 1, period=1.0, publish=publish)
+    ok = task._publish(True, 1)
+    task._finished(ok, 0.01)
+    assert ok is False and task.errors == 1 and task.last_error.startswith("publish KeyError")
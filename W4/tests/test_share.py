@@ -0,0 +1,87 @@
+# 다중 워커 모드 공유: 소유 프로세스 재시작 후 워커가 새 세그먼트를 읽는지, 워커가 /events 를 주는지
+import json, os, socket, threading, time
+
+import pytest
+
+from share import OwnerClient, StatePublisher, StateReader
+
+
+def shm_name(tag):
+    return f"iot_test_{tag}_{os.getpid()}"
+
+
+def status(version, temp):
+    return json.dumps({"temperature": temp, "humidity": 40.0, "distance": 80.0,
+                       "led_status": [0, 0, 0], "auto_mode": True, "version": version}).encode()
+
+
+def test_reader_follows_owner_restart():
+    name = shm_name("restart")
+    pub = StatePublisher(name, size=4096)
+    reader = StateReader(name, recheck=0.05)
+    try:
+        pub.write(1, "e-1", status(1, 20.0))
+        assert reader.read()[:2] == (1, "e-1")
+        pub.close()                               # 정상 종료 → seq 가 멈춤 → 다시 엶
+        pub = StatePublisher(name, size=4096)
+        pub.write(1, "e2-1", status(1, 21.0))
+        assert reader.read()[1] == "e2-1"
+        pub = StatePublisher(name, size=4096)     # close 없이 재시작 (비정상 종료 후) → 세대 비교로 교체
+        pub.write(1, "e3-1", status(1, 22.0))
+        time.sleep(0.1)
+        assert reader.read()[1] == "e3-1"
+        assert reader.reopens == 2
+    finally:
+        reader.close()
+        pub.close()
+
+
+def test_worker_serves_events_from_shared_memory():
+    web = pytest.importorskip("web")
+    name = shm_name("events")
+    pub = StatePublisher(name, size=4096)
+    web.reader = StateReader(name)
+    try:
+        pub.write(3, "e-3", status(3, 23.5))
+        resp = web.app.test_client().get("/events", buffered=False)
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/event-stream"
+        chunks = iter(resp.response)
+        assert next(chunks).startswith(b"retry:")
+        event = next(chunks).decode()
+        resp.close()
+        data = json.loads(event.split("data: ", 1)[1])
+        assert data["temperature"] == 23.5 and data["auto_mode"] is True
+    finally:
+        web.reader.close()
+        pub.close()
+
+
+def test_worker_maps_owner_failures_to_5xx(tmp_path):
+    web = pytest.importorskip("web")
+
+    path = str(tmp_path / "owner.sock")
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    srv.bind(path)
+    srv.listen()
+
+    def garbage():                               # 소유 프로세스가 형식이 깨진 응답을 보냄 (재연결 포함 2번)
+        for _ in range(2):
+            conn, _ = srv.accept()
+            conn.makefile("rb").readline()
+            conn.sendall(b'{"status": 200}\n')
+            conn.close()
+
+    th = threading.Thread(target=garbage, daemon=True)
+    th.start()
+    saved = web.owner
+    client = web.app.test_client()
+    try:
+        web.owner = OwnerClient(path, timeout=2.0)
+        assert client.get("/history").status_code == 502
+        web.owner = OwnerClient(str(tmp_path / "missing.sock"))
+        assert client.get("/history").status_code == 503
+    finally:
+        web.owner = saved
+        th.join(2)
+        srv.close()
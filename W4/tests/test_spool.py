@@ -0,0 +1,90 @@
+# 로컬 스풀 재전송: DB 커밋 후 ack 전에 죽거나 커밋이 실패해도 sensor_log 에 정확히 한 번씩만 들어가는지
+from datetime import datetime, timedelta
+
+from spool import SensorSpool, SpooledLogWriter
+
+
+class SpoolDB:
+    """sensor_spool_state / sensor_log 만 흉내 내는 MariaDB (커밋 전 변경은 rollback 으로 버림)"""
+
+    def __init__(self):
+        self.state = {}
+        self.log = []
+        self.fail_commits = 0
+
+    def connect(self):
+        return Conn(self)
+
+
+class Conn:
+    def __init__(self, db):
+        self.db = db
+        self._rows, self._state = [], {}
+        self._one = None
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, args):
+        if sql.startswith("SELECT last_seq"):
+            last = self._state.get(args[0], self.db.state.get(args[0]))
+            self._one = None if last is None else (last,)
+        else:
+            spool_id, seq = args
+            self._state[spool_id] = max(seq, self._state.get(spool_id, self.db.state.get(spool_id, 0)))
+
+    def executemany(self, sql, rows):
+        self._rows += rows
+
+    def fetchone(self):
+        return self._one
+
+    def commit(self):
+        if self.db.fail_commits:
+            self.db.fail_commits -= 1
+            raise RuntimeError("connection lost during commit")
+        self.db.log += self._rows
+        self.db.state.update(self._state)
+        self.rollback()
+
+    def rollback(self):
+        self._rows, self._state = [], {}
+
+    def close(self):
+        pass
+
+
+def fill(spool, n):
+    t0 = datetime(2026, 1, 1)
+    for i in range(n):
+        spool.append(20.0 + i, 40.0, 100.0, t0 + timedelta(seconds=i))
+
+
+def test_restart_between_commit_and_ack_does_not_duplicate(tmp_path):
+    path = str(tmp_path / "spool.db")
+    db = SpoolDB()
+    spool = SensorSpool(path)
+    fill(spool, 5)
+    writer = SpooledLogWriter(spool, db.connect, max_batch=3)
+    writer._write(spool.read(3))           # 커밋 완료, ack 전에 프로세스 종료
+    spool.close()
+
+    spool = SensorSpool(path)               # 재시작: 같은 spool_id, 행 5개 그대로
+    assert len(spool) == 5
+    writer = SpooledLogWriter(spool, db.connect, max_batch=3)
+    assert writer.flush() and len(spool) == 0
+    assert [r[1] for r in db.log] == [20.0, 21.0, 22.0, 23.0, 24.0]
+    assert writer.duplicates == 3 and writer.written == 2
+    spool.close()
+
+
+def test_failed_commit_keeps_rows_for_retry(tmp_path):
+    db = SpoolDB()
+    spool = SensorSpool(str(tmp_path / "spool.db"))
+    fill(spool, 4)
+    writer = SpooledLogWriter(spool, db.connect)
+    db.fail_commits = 1
+    assert writer.flush() is False and len(spool) == 4 and db.log == []
+    assert writer.flush() and len(spool) == 0
+    assert len(db.log) == 4 and writer.stats()["errors"] == 1
+    spool.close()
@@ -0,0 +1,30 @@
+# 센서값이 그대로면 /status ETag 도 그대로 → 대시보드 폴링이 304 를 받는지
+import random
+
+import pytest
+
+pytest.importorskip("flask")
+import W4_shin as node  # noqa: E402
+
+
+def run_sensors(seconds, rnd, dist=80.0, temp=22, humid=35):
+    # 샘플러 주기대로 게시: 거리 10 Hz (에코 지터 ≈ 0.3 cm), DHT11 2.2초마다 (정수)
+    for i in range(int(seconds * 10)):
+        node.publish_dist(dist + rnd.gauss(0, 0.3))
+        if i % 22 == 0:
+            node.publish_dht((temp, humid))
+
+
+def test_steady_sensors_poll_304():
+    rnd = random.Random(1)
+    run_sensors(2.0, rnd)                    # 필터 창 채우기
+    c = node.app.test_client()
+    first = c.get("/status")
+    assert first.status_code == 200
+    run_sensors(2.0, rnd)                    # 다음 폴링까지 2초
+    second = c.get("/status", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+    run_sensors(1.0, rnd, dist=60.0)         # 실제로 움직이면 새 값
+    third = c.get("/status", headers={"If-None-Match": first.headers["ETag"]})
+    assert third.status_code == 200
+    assert abs(third.get_json()["distance"] - 60.0) < 2.0
@@ -0,0 +1,50 @@
+# 초음파 엣지 콜백: 핀 레벨로 상승/하강을 구분하고 상승 없는 하강은 무시하는지
+import pytest
+
+from ultrasonic import SPEED_CM_PER_NS, UltrasonicSensor
+
+
+class Clock:
+    speed = 1.0
+
+    def __init__(self):
+        self.now = 0
+
+    def perf_counter_ns(self):
+        return self.now
+
+    def sleep(self, s):
+        pass
+
+
+class GPIO:
+    BOTH = 33
+
+    def __init__(self):
+        self.level = 0
+        self.callback = None
+
+    def add_event_detect(self, pin, edge, callback=None):
+        self.callback = callback
+
+    def output(self, pin, value):
+        pass
+
+    def input(self, pin):
+        return self.level
+
+    def edge(self, level, clock, at_ns):
+        clock.now, self.level = at_ns, level
+        self.callback(24)
+
+
+def test_fall_without_rise_is_ignored():
+    gpio, clock = GPIO(), Clock()
+    sonar = UltrasonicSensor(gpio, 23, 24, clock, timeout=10.0)
+    fut = sonar.measure()
+    gpio.edge(0, clock, 1_000)          # 이전 펄스의 하강이 측정 시작 뒤에 도착
+    assert not fut.done()
+    gpio.edge(1, clock, 500_000)
+    gpio.edge(0, clock, 500_000 + 5_831_000)
+    assert fut.result(1) == pytest.approx(5_831_000 * SPEED_CM_PER_NS, abs=0.01)
+    assert sonar.stats()["ok"] == 1
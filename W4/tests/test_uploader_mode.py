@@ -0,0 +1,46 @@
+# 업로드 모드(IOT_INGEST_URL): DB 없이 노드가 시작되고 히스토리는 링버퍼에서 나오는지
+# W4_shin 은 import 시점에 환경 변수를 읽으므로 별도 프로세스에서 실행
+import subprocess, sys, textwrap
+
+import pytest
+
+from conftest import W4, subprocess_env
+
+pytest.importorskip("flask")
+
+SCRIPT = textwrap.dedent("""
+    import json, time
+    import db_pool
+
+    def no_db(self, *a, **kw):
+        raise AssertionError("uploader mode touched the DB")
+    db_pool.ConnectionPool.acquire = no_db
+
+    import W4_shin as node
+    assert not node.USE_DB
+    node.start_node(run_sensors=False)
+    try:
+        c = node.app.test_client()
+        assert c.get("/status").status_code == 200
+        for i in range(3):
+            node.db_insert(20.0 + i, 40.0, 100.0)
+        r = c.get("/history_data/temp?n=10")
+        assert r.status_code == 200, r.status_code
+        assert [p["value"] for p in r.get_json()] == [22.0, 21.0, 20.0]
+        now = time.time()
+        r = c.get(f"/history_range?metric=temp&from={now - 60:.0f}&to={now + 60:.0f}")
+        assert r.status_code == 200, r.status_code
+        assert sum(p["count"] for p in r.get_json()["points"]) == 3
+        assert c.get("/history_data/dist?n=5").status_code == 200
+    finally:
+        node.stop_node()
+    print("ok")
+""")
+
+
+def test_node_starts_without_db():
+    env = subprocess_env(IOT_INGEST_URL="http://127.0.0.1:9/ingest")
+    proc = subprocess.run([sys.executable, "-c", SCRIPT], cwd=W4, env=env,
+                          capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip().endswith("ok")
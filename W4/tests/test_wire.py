@@ -0,0 +1,43 @@
+# 응답 인코딩: Accept 협상 규칙과 columnar 바이너리 왕복 (NaN = 값 없음)
+import math
+from array import array
+
+import pytest
+
+import wire
+from wire import COLUMNAR, HISTORY_TYPES, JSON, MSGPACK, negotiate
+
+
+def test_negotiate_prefers_json_and_honours_q():
+    assert negotiate(None, HISTORY_TYPES) == JSON
+    assert negotiate("text/html", HISTORY_TYPES) == JSON
+    assert negotiate("*/*", HISTORY_TYPES) == JSON
+    assert negotiate(f"{COLUMNAR}", HISTORY_TYPES) == COLUMNAR
+    assert negotiate(f"{JSON};q=0.5, {COLUMNAR}", HISTORY_TYPES) == COLUMNAR
+    assert negotiate(f"{COLUMNAR};q=0.2, application/*;q=0.9", HISTORY_TYPES) == JSON
+    assert negotiate(f"{COLUMNAR};q=bogus", HISTORY_TYPES) == JSON
+    assert negotiate(COLUMNAR, (JSON,)) == JSON                      # /status 는 columnar 없음
+
+
+def test_columnar_round_trip_keeps_missing_values():
+    ts = array("d", [1700000002.9, 1700000001.0])
+    body = wire.pack_history(COLUMNAR, "temp", ts, array("d", [21.5, math.nan]))
+    assert body[:4] == b"IOT1" and len(body) == 8 + 12 * 2
+    t, v = wire.unpack_columnar(body)
+    assert list(t) == [1700000002, 1700000001]
+    assert v[0] == 21.5 and math.isnan(v[1])
+    with pytest.raises(ValueError):
+        wire.unpack_columnar(b"XXXX" + body[4:])
+
+
+def test_numpy_and_array_columns_encode_the_same():
+    np = pytest.importorskip("numpy")
+    ts, vs = [1700000000.0, 1699999990.0], [40.25, 39.5]
+    plain = wire.pack_history(COLUMNAR, "humid", array("d", ts), array("d", vs))
+    assert wire.pack_history(COLUMNAR, "humid", np.array(ts), np.array(vs)) == plain
+
+
+def test_msgpack_history_uses_column_map():
+    msgpack = pytest.importorskip("msgpack")
+    body = wire.pack_history(MSGPACK, "dist", array("d", [1700000000.0]), array("d", [12.5]))
+    assert msgpack.unpackb(body) == {"metric": "dist", "t": [1700000000], "v": [12.5]}
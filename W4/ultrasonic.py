@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import Future
+
+# =========================
+# 초음파 센서 (HC-SR04) - 엣지 인터럽트 방식
+# =========================
+SPEED_CM_PER_NS = 17150 / 1e9   # 왕복 → 편도 (343 m/s / 2)
+
+
+class EchoTimeout(Exception):
+    """timeout 안에 ECHO 펄스가 끝나지 않음 (장애물 없음/배선 문제)"""
+
+
+class UltrasonicSensor:
+    """GPIO.add_event_detect 로 ECHO 상승/하강 엣지 시각을 perf_counter_ns 로 기록.
+
+    busy-wait 폴링이 없으므로 측정 중에도 CPU 를 쓰지 않음.
+    measure() 는 바로 Future 를 돌려주고, 결과(cm) 또는 EchoTimeout 으로 완료됨.
+    한 번에 하나의 측정만 진행하며, 진행 중에 다시 부르면 같은 Future 를 돌려줌.
+    """
+
+    def __init__(self, gpio, trig, echo, clock, timeout=0.04, max_cm=400.0):
+        self.gpio = gpio
+        self.trig = trig
+        self.echo = echo
+        self.clock = clock
+        self.timeout = timeout
+        self.max_cm = max_cm
+
+        self._cond = threading.Condition()
+        self._future = None
+        self._rise_ns = None
+        self._deadline_ns = None
+
+        self.ok = 0
+        self.timeouts = 0
+        self.last_error = None
+
+        gpio.add_event_detect(echo, gpio.BOTH, callback=self._on_edge)
+        threading.Thread(target=self._watchdog, name="sonar-watchdog", daemon=True).start()
+
+    # ---- 측정 요청 ----
+    def measure(self):
+        with self._cond:
+            if self._future is not None:
+                return self._future
+            fut = self._future = Future()
+            self._rise_ns = None
+            self._deadline_ns = self.clock.perf_counter_ns() + int(self.timeout * 2e9)
+            self._cond.notify()
+
+        # 10us 트리거 펄스
+        self.gpio.output(self.trig, True)
+        self.clock.sleep(0.00001)
+        self.gpio.output(self.trig, False)
+        return fut
+
+    def read(self):
+        """measure() 블로킹 버전. 거리(cm) 반환, 실패 시 EchoTimeout"""
+        return self.measure().result(self.timeout * 2 / self.clock.speed + 1.0)
+
+    # ---- 엣지 콜백 (GPIO 스레드) ----
+    def _on_edge(self, channel):
+        now = self.clock.perf_counter_ns()
+        level = self.gpio.input(channel)   # BOTH 감지라 콜백만으로는 상승/하강 구분 불가
+        with self._cond:
+            fut = self._future
+            if fut is None:
+                return
+            if level:
+                self._rise_ns = now
+                return
+            if self._rise_ns is None:
+                return                     # 상승 없는 하강 (측정 전 펄스의 끝, 놓친 상승) 무시
+            width = now - self._rise_ns
+            self._future = None
+        dist = width * SPEED_CM_PER_NS
+        if dist > self.max_cm:
+            self.timeouts += 1
+            fut.set_exception(EchoTimeout(f"out of range ({dist:.0f} cm)"))
+        else:
+            self.ok += 1
+            fut.set_result(round(dist, 2))
+
+    # ---- 타임아웃 감시 ----
+    def _watchdog(self):
+        while True:
+            with self._cond:
+                while self._future is None:
+                    self._cond.wait()
+                remaining = (self._deadline_ns - self.clock.perf_counter_ns()) / 1e9
+                if remaining > 0:
+                    self._cond.wait(remaining / self.clock.speed)
+                    continue
+                fut, self._future = self._future, None
+                stage = "rising" if self._rise_ns is None else "falling"
+            self.timeouts += 1
+            self.last_error = f"no {stage} edge within {self.timeout * 2:.3f}s"
+            fut.set_exception(EchoTimeout(self.last_error))
+
+    def stats(self):
+        return dict(ok=self.ok, timeouts=self.timeouts, last_error=self.last_error)
@@ -0,0 +1,91 @@
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask_cors import CORS
+import json, os, threading, time
+import iotlog
+import wire
+from push import Broadcaster
+from share import StateReader, OwnerClient, BadReply, FORWARD_HEADERS, DEFAULT_SHM, DEFAULT_SOCKET
+
+# =========================
+# HTTP 워커 (상태 없음, GPIO/DB 를 직접 만지지 않음)
+# =========================
+# /status 는 공유 메모리에서 바로 응답, 그 외 요청은 센서 소유 프로세스로 전달.
+# /events(SSE) 는 워커가 직접: 공유 메모리 버전을 지켜보다 바뀌면 이 워커의 구독자들에게 변경분 전송
+# serve.py web 또는 gunicorn -w 4 -b 0.0.0.0:8080 web:app 으로 실행
+iotlog.setup()
+reader = StateReader(os.environ.get("IOT_SHM", DEFAULT_SHM))
+owner = OwnerClient(os.environ.get("IOT_SOCKET", DEFAULT_SOCKET))
+
+# W4_shin.push_state 와 같은 키 (단일 프로세스 모드와 같은 이벤트)
+PUSH_KEYS = ("temperature", "humidity", "distance", "led_status", "auto_mode")
+WATCH_INTERVAL = 0.1
+broadcaster = Broadcaster(heartbeat=15.0, min_interval=0.1)
+_watcher = None
+_watcher_lock = threading.Lock()
+
+def _watch_status():
+    # 워커당 스레드 1개. 구독자 수와 관계없이 공유 메모리는 WATCH_INTERVAL 마다 한 번만 읽음
+    last = None
+    while True:
+        try:
+            version, _, body = reader.read()
+            if version != last:
+                last = version
+                payload = json.loads(body)
+                broadcaster.publish(**{k: payload.get(k) for k in PUSH_KEYS})
+        except (FileNotFoundError, TimeoutError):
+            pass   # 소유 프로세스 재시작 중 → 다음 회차에 다시
+        time.sleep(WATCH_INTERVAL)
+
+def _start_watcher():
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = threading.Thread(target=_watch_status, name="status-watch", daemon=True)
+            _watcher.start()
+
+app = Flask(__name__)
+CORS(app)
+
+@app.route("/status")
+def status():
+    # 소유 프로세스가 버전마다 미리 직렬화해 둔 JSON 본문 → 워커는 복사만
+    # 바이너리 인코딩(Accept: application/msgpack)은 소유 프로세스로 전달
+    if wire.negotiate(request.headers.get("Accept"), wire.STATUS_TYPES) != wire.JSON:
+        return forward("status")
+    try:
+        version, tag, body = reader.read()
+    except (FileNotFoundError, TimeoutError):
+        return jsonify({"error": "sensor owner not running"}), 503
+    if request.if_none_match.contains(tag):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, mimetype="application/json")
+    resp.set_etag(tag)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.vary.add("Accept")
+    return resp
+
+@app.route("/events")
+def events():
+    # 첫 이벤트는 전체 상태, 이후 변경분만 (W4_shin 과 같은 형식)
+    _start_watcher()
+    sub = broadcaster.subscribe()
+    if sub is None:
+        return jsonify({"error": "too many clients"}), 503
+    return Response(stream_with_context(broadcaster.stream(sub)),
+                    mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/", defaults={"path": ""})
+@app.route("/<path:path>")
+def forward(path):
+    headers = {h: request.headers[h] for h in FORWARD_HEADERS if h in request.headers}
+    try:
+        code, hdrs, body = owner.request(request.method, request.path,
+                                         request.query_string.decode(), headers)
+    except BadReply as e:
+        return jsonify({"error": str(e)}), 502
+    except OSError:
+        return jsonify({"error": "sensor owner not running"}), 503
+    return Response(body, status=code, headers=hdrs)
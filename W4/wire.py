@@ -0,0 +1,105 @@
+import struct, sys
+from array import array
+
+try:
+    import msgpack
+except ImportError:       # 없으면 MessagePack 은 협상 대상에서 빠짐 (JSON/columnar 만)
+    msgpack = None
+
+# =========================
+# /status, /history_data 응답 인코딩 (Accept 헤더로 협상, 기본은 JSON)
+# =========================
+# - application/json                : 기존 형식 그대로 (웹 페이지/기존 클라이언트)
+# - application/msgpack             : /status = 같은 키의 맵, /history_data = 아래 열 형식의 맵
+#                                     {"metric": m, "t": [epoch 초 int, ...], "v": [float32, ...]}
+# - application/vnd.iot.columnar    : /history_data 전용 바이너리 (Flutter 는 ByteData 로 바로 읽음)
+#       0      4s   magic b"IOT1"
+#       4      u32  n (행 수)
+#       8      i64  t[n]  epoch 초, 최신→과거 (JSON 과 같은 순서)
+#       8+8n   f32  v[n]  값, NaN = 값 없음 (JSON 의 null)
+#     전부 little-endian, 각 열은 자기 크기로 정렬되어 있음
+# 행마다 dict/문자열을 만들지 않고 array 열을 통째로 변환/복사
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+COLUMNAR = "application/vnd.iot.columnar"
+
+ALIASES = {"application/x-msgpack": MSGPACK}
+SUFFIX = {JSON: "", MSGPACK: ".mp", COLUMNAR: ".col"}    # 인코딩별로 ETag 구분
+
+STATUS_TYPES = (JSON, MSGPACK) if msgpack else (JSON,)
+HISTORY_TYPES = (JSON, COLUMNAR, MSGPACK) if msgpack else (JSON, COLUMNAR)
+
+MAGIC = b"IOT1"
+_HEADER = struct.Struct("<4sI")
+_SWAP = sys.byteorder != "little"
+
+
+def negotiate(accept, offered):
+    """Accept 헤더 → offered 중 하나. q 가 같으면 offered 순서(JSON 우선), 맞는 게 없으면 JSON"""
+    if not accept:
+        return JSON
+    best, best_q = JSON, 0.0
+    for item in accept.split(","):
+        mime, _, params = item.strip().partition(";")
+        mime = ALIASES.get(mime.strip().lower(), mime.strip().lower())
+        q = 1.0
+        for p in params.split(";"):
+            k, _, v = p.strip().partition("=")
+            if k == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        if mime in ("*/*", "application/*"):
+            cand = offered[0]
+        elif mime in offered:
+            cand = mime
+        else:
+            continue
+        if q > best_q or (q == best_q and offered.index(cand) < offered.index(best)):
+            best, best_q = cand, q
+    return best
+
+
+def etag(tag, mimetype):
+    return tag + SUFFIX[mimetype]
+
+
+def pack_status(payload):
+    return msgpack.packb(payload)
+
+
+def _columns(ts, values):
+    """(epoch 초 i64 열, float32 열). ts/values 는 array('d') 또는 float 시퀀스, 값 없음 = NaN"""
+    return array("q", map(int, ts)), array("f", values)
+
+
+def pack_history(mimetype, metric, ts, values):
+    if hasattr(ts, "astype"):         # NumPy 열 (columnar.py) → 변환만, 바이트 순서도 dtype 으로 고정
+        t, v = ts.astype("<i8"), values.astype("<f4")
+        if mimetype == COLUMNAR:
+            return _HEADER.pack(MAGIC, len(t)) + t.tobytes() + v.tobytes()
+        return msgpack.packb({"metric": metric, "t": t.tolist(), "v": v.tolist()}, use_single_float=True)
+    t, v = _columns(ts, values)
+    if mimetype == COLUMNAR:
+        if _SWAP:
+            t.byteswap()
+            v.byteswap()
+        return _HEADER.pack(MAGIC, len(t)) + t.tobytes() + v.tobytes()
+    # msgpack: float32 로 보내고 NaN 그대로 (클라이언트가 null 로 취급)
+    return msgpack.packb({"metric": metric, "t": t.tolist(), "v": v.tolist()}, use_single_float=True)
+
+
+def unpack_columnar(body):
+    """COLUMNAR 본문 → (t array('q'), v array('f')). 벤치/검증용"""
+    magic, n = _HEADER.unpack_from(body)
+    if magic != MAGIC:
+        raise ValueError("not an IOT1 payload")
+    t = array("q")
+    t.frombytes(body[8:8 + 8 * n])
+    v = array("f")
+    v.frombytes(body[8 + 8 * n:8 + 12 * n])
+    if _SWAP:
+        t.byteswap()
+        v.byteswap()
+    return t, v
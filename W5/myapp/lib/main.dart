@@ -63,13 +63,23 @@ class _DashboardPageState extends State<DashboardPage> {
   Future<void> _control(int id, int state) async {
     if (status?.autoMode == true) return;
     try {
-      await api.controlDevice(id, state);
+      final result = await api.controlDevice(id, state);
       await _refresh();
+      if (result == ControlResult.deferred) {
+        _notify('Will switch after the minimum on/off time');
+      } else if (result == ControlResult.rejected) {
+        _notify('Outputs are under AUTO control');
+      }
     } catch (e) {
       setState(() => error = e.toString());
     }
   }
 
+  void _notify(String message) {
+    if (!mounted) return;
+    ScaffoldMessenger.of(context).showSnackBar(SnackBar(content: Text(message)));
+  }
+
   @override
   Widget build(BuildContext context) {
     final s = status;
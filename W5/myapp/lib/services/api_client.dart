@@ -8,6 +8,13 @@ class ApiException implements Exception {
   String toString() => 'ApiException: $message';
 }
 
+// Outcome of GET /control/<id>/<state>
+enum ControlResult {
+  applied, // 204: switched (or already in that state)
+  deferred, // 202: switches once the output's minimum on/off time has passed
+  rejected, // 409: outputs are under AUTO control (mode changed elsewhere)
+}
+
 class Status {
   final double? temperature;
   final double? humidity;
@@ -65,10 +72,13 @@ class ApiClient {
     }
   }
 
-  Future<void> controlDevice(int id, int state) async {
+  Future<ControlResult> controlDevice(int id, int state) async {
     final res = await _http.get(Uri.parse('$baseUrl/control/$id/$state'));
+    if (res.statusCode == 202) return ControlResult.deferred;
+    if (res.statusCode == 409) return ControlResult.rejected;
     if (res.statusCode < 200 || res.statusCode >= 300) {
       throw ApiException('GET /control failed: ${res.statusCode}');
     }
+    return ControlResult.applied;
   }
 }
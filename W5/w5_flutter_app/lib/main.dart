@@ -1,3 +1,4 @@
+import 'dart:async';
 import 'package:flutter/material.dart';
 import 'services/api_client.dart';
 import 'pages/history_page.dart';
@@ -29,11 +30,36 @@ class _HomePageState extends State<HomePage> {
   Status? status;
   String? error;
   bool busy = false;
+  StreamSubscription<Status>? _events;
 
   @override
   void initState() {
     super.initState();
     _refresh();
+    _listen();
+  }
+
+  @override
+  void dispose() {
+    _events?.cancel();
+    super.dispose();
+  }
+
+  // Live updates pushed by the server (/events); reconnect after 3 s if it drops
+  void _listen() {
+    _events = api.statusStream().listen(
+      (s) => setState(() => status = s),
+      onError: (_) => _reconnect(),
+      onDone: _reconnect,
+      cancelOnError: true,
+    );
+  }
+
+  void _reconnect() {
+    if (!mounted) return;
+    Future.delayed(const Duration(seconds: 3), () {
+      if (mounted) _listen();
+    });
   }
 
   Future<void> _refresh() async {
@@ -63,13 +89,23 @@ class _HomePageState extends State<HomePage> {
   Future<void> _control(int id, int state) async {
     if (status?.autoMode == true) return;
     try {
-      await api.controlDevice(id, state);
+      final result = await api.controlDevice(id, state);
       await _refresh();
+      if (result == ControlResult.deferred) {
+        _notify('Will switch after the minimum on/off time');
+      } else if (result == ControlResult.rejected) {
+        _notify('Outputs are under AUTO control');
+      }
     } catch (e) {
       setState(() => error = e.toString());
     }
   }
 
+  void _notify(String message) {
+    if (!mounted) return;
+    ScaffoldMessenger.of(context).showSnackBar(SnackBar(content: Text(message)));
+  }
+
   @override
   Widget build(BuildContext context) {
     final s = status;
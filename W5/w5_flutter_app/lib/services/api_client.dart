@@ -8,6 +8,13 @@ class ApiException implements Exception {
   String toString() => 'ApiException: $message';
 }
 
+// Outcome of GET /control/<id>/<state>
+enum ControlResult {
+  applied, // 204: switched (or already in that state)
+  deferred, // 202: switches once the output's minimum on/off time has passed
+  rejected, // 409: outputs are under AUTO control (mode changed elsewhere)
+}
+
 class Status {
   final double? temperature;
   final double? humidity;
@@ -34,6 +41,18 @@ class Status {
       autoMode: j['auto_mode'] as bool? ?? true,
     );
   }
+
+  Map<String, dynamic> toJson() => {
+        'temperature': temperature,
+        'humidity': humidity,
+        'distance': distance,
+        'led_status': ledStatus,
+        'auto_mode': autoMode,
+      };
+
+  // Apply a partial update (only the changed keys) pushed by /events
+  Status merge(Map<String, dynamic> delta) =>
+      Status.fromJson({...toJson(), ...delta});
 }
 
 class ApiClient {
@@ -49,16 +68,52 @@ class ApiClient {
             ),
         _http = httpClient ?? http.Client();
 
+  // Last /status response and its ETag, reused when the server answers 304
+  String? _statusEtag;
+  Status? _lastStatus;
+
   Future<Status> fetchData() async {
     final uri = Uri.parse('$baseUrl/status');
-    final res = await _http.get(uri);
+    final etag = _statusEtag;
+    final res = await _http.get(uri,
+        headers: etag != null && _lastStatus != null ? {'If-None-Match': etag} : null);
+    if (res.statusCode == 304 && _lastStatus != null) {
+      return _lastStatus!;
+    }
     if (res.statusCode == 200) {
       final j = json.decode(res.body) as Map<String, dynamic>;
-      return Status.fromJson(j);
+      _statusEtag = res.headers['etag'];
+      return _lastStatus = Status.fromJson(j);
     }
     throw ApiException('GET /status failed: ${res.statusCode}');
   }
 
+  // Server-Sent Events from /events: first the full state, then only changed keys.
+  // Emits the merged Status after every event; the stream ends when the server closes.
+  Stream<Status> statusStream() async* {
+    final req = http.Request('GET', Uri.parse('$baseUrl/events'))
+      ..headers['Accept'] = 'text/event-stream';
+    final res = await _http.send(req);
+    if (res.statusCode != 200) {
+      throw ApiException('GET /events failed: ${res.statusCode}');
+    }
+    Status? current;
+    final data = StringBuffer();
+    await for (final line in res.stream
+        .transform(utf8.decoder)
+        .transform(const LineSplitter())) {
+      if (line.startsWith('data:')) {
+        data.write(line.substring(5).trimLeft());
+      } else if (line.isEmpty && data.isNotEmpty) {
+        final delta = json.decode(data.toString()) as Map<String, dynamic>;
+        data.clear();
+        current = current == null ? Status.fromJson(delta) : current.merge(delta);
+        yield current;
+      }
+      // ':' heartbeat, 'id:' and 'retry:' lines are ignored
+    }
+  }
+
   Future<void> setMode(bool auto) async {
     final res = await _http.get(Uri.parse('$baseUrl/set_mode/${auto ? 1 : 0}'));
     if (res.statusCode < 200 || res.statusCode >= 300) {
@@ -66,11 +121,14 @@ class ApiClient {
     }
   }
 
-  Future<void> controlDevice(int id, int state) async {
+  Future<ControlResult> controlDevice(int id, int state) async {
     final res = await _http.get(Uri.parse('$baseUrl/control/$id/$state'));
+    if (res.statusCode == 202) return ControlResult.deferred;
+    if (res.statusCode == 409) return ControlResult.rejected;
     if (res.statusCode < 200 || res.statusCode >= 300) {
       throw ApiException('GET /control failed: ${res.statusCode}');
     }
+    return ControlResult.applied;
   }
 
   Future<List<HistoryPoint>> fetchHistory(String metric) async {
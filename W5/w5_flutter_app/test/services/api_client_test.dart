@@ -40,5 +40,62 @@ void main() {
       // Assert
       expect(() => api.fetchData(), throwsA(isA<ApiException>()));
     });
+
+    test('should reuse the cached status on 304 Not Modified', () async {
+      // Arrange
+      final seen = <String?>[];
+      final mock = MockClient((req) async {
+        seen.add(req.headers['If-None-Match']);
+        if (req.headers['If-None-Match'] == '"abc-7"') {
+          return http.Response('', 304, headers: {'etag': '"abc-7"'});
+        }
+        return http.Response(
+            jsonEncode({
+              'temperature': 21.0,
+              'humidity': 45.0,
+              'distance': 12.0,
+              'led_status': [0, 1, 0],
+              'auto_mode': false,
+            }),
+            200,
+            headers: {'etag': '"abc-7"'});
+      });
+      final api = ApiClient(baseUrl: 'http://localhost:8080', httpClient: mock);
+
+      // Act
+      final first = await api.fetchData();
+      final second = await api.fetchData();
+
+      // Assert
+      expect(seen, [null, '"abc-7"']);
+      expect(second, same(first));
+    });
+
+    test('should merge pushed status deltas from /events', () async {
+      // Arrange
+      final mock = MockClient((req) async {
+        if (req.url.path.endsWith('/events')) {
+          return http.Response(
+              'retry: 3000\n\n'
+              'id: 1\ndata: {"temperature":24.5,"humidity":50.0,"distance":30.0,'
+              '"led_status":[1,0,1],"auto_mode":true}\n\n'
+              ': hb\n\n'
+              'id: 2\ndata: {"distance":8.5,"auto_mode":false}\n\n',
+              200);
+        }
+        return http.Response('Not found', 404);
+      });
+      final api = ApiClient(baseUrl: 'http://localhost:8080', httpClient: mock);
+
+      // Act
+      final events = await api.statusStream().toList();
+
+      // Assert
+      expect(events.length, 2);
+      expect(events.last.temperature, 24.5);
+      expect(events.last.distance, 8.5);
+      expect(events.last.autoMode, false);
+      expect(events.last.ledStatus, [1, 0, 1]);
+    });
   });
 }
\ No newline at end of file